@@ -1,9 +1,11 @@
 # blog/admin.py - Fixed to match actual model fields
 
 from django.contrib import admin
+from django.db.models import Count, Q
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
-from .models import BlogPost, BlogCategory
+from .models import BlogPost, BlogCategory, Tag
+from .view_counter import pending_views
 
 @admin.register(BlogCategory)
 class BlogCategoryAdmin(admin.ModelAdmin):
@@ -13,15 +15,35 @@ class BlogCategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
     list_editable = ['is_active']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            published_posts=Count('blogpost', filter=Q(blogpost__status='published'))
+        )
+    
     def post_count(self, obj):
-        return obj.blogpost_set.filter(status='published').count()
+        return obj.published_posts
     post_count.short_description = 'Published Posts'
+    post_count.admin_order_field = 'published_posts'
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug', 'post_count']
+    search_fields = ['name']
+    prepopulated_fields = {'slug': ('name',)}
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(post_count=Count('posts'))
+    
+    def post_count(self, obj):
+        return obj.post_count
+    post_count.short_description = 'Posts'
+    post_count.admin_order_field = 'post_count'
 
 @admin.register(BlogPost)
 class BlogPostAdmin(admin.ModelAdmin):
     list_display = [
         'title', 'author', 'category', 'status', 'is_featured', 
-        'published_at', 'view_count', 'reading_time', 'thumbnail'
+        'published_at', 'live_view_count', 'reading_time', 'thumbnail'
     ]
     list_filter = [
         'status', 'is_featured', 'category', 'created_at', 
@@ -47,12 +69,18 @@ class BlogPostAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Advanced', {
-            'fields': ('view_count',),
+            'fields': ('view_count', 'live_view_count'),
             'classes': ('collapse',)
         })
     )
     
-    readonly_fields = ['view_count', 'created_at', 'updated_at']
+    readonly_fields = ['view_count', 'live_view_count', 'created_at', 'updated_at']
+    
+    def live_view_count(self, obj):
+        """Stored views plus views still waiting in the buffer"""
+        return obj.view_count + pending_views(obj.pk)
+    live_view_count.short_description = 'Views'
+    live_view_count.admin_order_field = 'view_count'
     
     def thumbnail(self, obj):
         if obj.featured_image:
@@ -0,0 +1,81 @@
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+
+from core.feeds import AtomFeed, SiteFeed, absolute_url
+from .models import BlogCategory, BlogPost
+
+# Most recent posts listed in a feed
+FEED_ITEMS = 20
+
+
+class LatestPostsFeed(SiteFeed):
+    """Latest published blog posts"""
+
+    title = 'Fayvad Digital Blog'
+    description = 'Insights, tutorials and news on digital solutions for SMEs and SACCOs.'
+    models = (BlogPost, BlogCategory)
+    state_fields = ('category__name', 'category__slug')
+
+    def link(self):
+        return absolute_url(reverse('blog:list'))
+
+    def source(self, obj):
+        return BlogPost.objects.filter(status='published', published_at__lte=timezone.now())
+
+    def items(self, obj=None):
+        return (
+            self.source(obj)
+            .select_related('category', 'author')
+            .only(
+                'title', 'slug', 'excerpt', 'tag_list', 'published_at', 'updated_at',
+                'category__name', 'author__first_name', 'author__last_name', 'author__username',
+            )
+            .order_by(*BlogPost.PAGE_KEYS)[:FEED_ITEMS]
+        )
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_pubdate(self, item):
+        return item.published_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        categories = [item.category.name] if item.category else []
+        return categories + list(item.tag_list)
+
+
+class LatestPostsAtomFeed(AtomFeed, LatestPostsFeed):
+    pass
+
+
+class CategoryPostsFeed(LatestPostsFeed):
+    """Latest published posts in one category"""
+
+    def get_object(self, request, slug):
+        return get_object_or_404(BlogCategory, slug=slug, is_active=True)
+
+    def title(self, obj):
+        return f'{obj.name} - Fayvad Digital Blog'
+
+    def description(self, obj):
+        return obj.description or f'Articles about {obj.name} from Fayvad Digital.'
+
+    def link(self, obj):
+        return absolute_url(obj.get_absolute_url())
+
+    def source(self, obj):
+        return super().source(obj).filter(category=obj)
+
+
+class CategoryPostsAtomFeed(AtomFeed, CategoryPostsFeed):
+    pass
@@ -0,0 +1,33 @@
+# blog/management/commands/backfill_post_stats.py
+
+from django.core.management.base import BaseCommand
+from blog.models import BlogPost
+
+
+class Command(BaseCommand):
+    help = 'Computes stored word counts, reading times and tag lists for existing blog posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=100,
+            help='Number of posts loaded per batch',
+        )
+
+    def handle(self, *args, **options):
+        posts = BlogPost.objects.only(
+            'pk', 'content', 'content_html', 'tags', *BlogPost.STATS_FIELDS
+        ).order_by('pk')
+
+        updated = 0
+        for post in posts.iterator(chunk_size=options['chunk_size']):
+            before = [getattr(post, field) for field in BlogPost.STATS_FIELDS]
+            post.compute_stats()
+            if [getattr(post, field) for field in BlogPost.STATS_FIELDS] != before:
+                post.save(update_fields=BlogPost.STATS_FIELDS)
+                updated += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Updated stats for {updated} posts')
+        )
@@ -0,0 +1,28 @@
+# blog/management/commands/flush_view_counts.py
+
+from django.core.management.base import BaseCommand
+from blog.view_counter import claim_flush, flush_interval, flush_views
+
+
+class Command(BaseCommand):
+    help = 'Writes buffered blog post view counts to the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--post',
+            type=int,
+            action='append',
+            dest='post_ids',
+            help='Only flush the given post id (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        if not claim_flush():
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  Views were flushed within the last {flush_interval()}s; nothing to do'
+            ))
+            return
+        total = flush_views(options['post_ids'])
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Flushed {total} buffered views')
+        )
@@ -0,0 +1,37 @@
+# blog/management/commands/rerender_posts.py
+
+from django.core.management.base import BaseCommand
+from blog.models import BlogPost
+
+
+class Command(BaseCommand):
+    help = 'Re-renders stored blog post HTML whose source or renderer version changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-render every post even if it is up to date',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=100,
+            help='Number of posts loaded per batch',
+        )
+
+    def handle(self, *args, **options):
+        posts = BlogPost.objects.only(
+            'pk', 'content', 'tags', *BlogPost.RENDERED_FIELDS
+        ).order_by('pk')
+
+        rendered = 0
+        for post in posts.iterator(chunk_size=options['chunk_size']):
+            if post.render_content(force=options['force']):
+                post.compute_stats()
+                post.save(update_fields=BlogPost.RENDERED_FIELDS + BlogPost.STATS_FIELDS)
+                rendered += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Re-rendered {rendered} posts')
+        )
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:13
+
+import ckeditor.fields
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+from django.utils.html import strip_tags
+
+SEARCH_INDEX = django.contrib.postgres.indexes.GinIndex(
+    fields=["search_vector"], name="blog_post_search_gin"
+)
+
+
+def add_search_index(apps, schema_editor):
+    # GIN indexes and tsvector only exist on PostgreSQL
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    BlogPost = apps.get_model("blog", "BlogPost")
+    schema_editor.add_index(BlogPost, SEARCH_INDEX)
+
+
+def remove_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    BlogPost = apps.get_model("blog", "BlogPost")
+    schema_editor.remove_index(BlogPost, SEARCH_INDEX)
+
+
+def populate_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    from django.contrib.postgres.search import SearchVector
+    from django.db.models import Value
+
+    BlogPost = apps.get_model("blog", "BlogPost")
+    for post in BlogPost.objects.only("title", "excerpt", "tags", "content"):
+        BlogPost.objects.filter(pk=post.pk).update(
+            search_vector=(
+                SearchVector(Value(post.title), weight="A", config="english")
+                + SearchVector(Value(post.excerpt), weight="B", config="english")
+                + SearchVector(Value(post.tags), weight="B", config="english")
+                + SearchVector(
+                    Value(strip_tags(post.content)), weight="C", config="english"
+                )
+            )
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blogpost",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="blogpost",
+            name="content",
+            field=ckeditor.fields.RichTextField(),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name="blogpost", index=SEARCH_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(add_search_index, remove_search_index),
+            ],
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0003_blogpost_rendered_content"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blogpost",
+            name="reading_time",
+            field=models.PositiveSmallIntegerField(
+                db_index=True,
+                default=1,
+                editable=False,
+                help_text="Estimated minutes to read",
+            ),
+        ),
+        migrations.AddField(
+            model_name="blogpost",
+            name="tag_list",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                editable=False,
+                help_text="Parsed from tags on save",
+            ),
+        ),
+        migrations.AddField(
+            model_name="blogpost",
+            name="word_count",
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+    ]
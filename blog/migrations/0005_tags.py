@@ -0,0 +1,110 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def split_tags(apps, schema_editor):
+    """Create Tag rows and post links from the comma-separated tags field"""
+    BlogPost = apps.get_model("blog", "BlogPost")
+    Tag = apps.get_model("blog", "Tag")
+    PostTag = apps.get_model("blog", "PostTag")
+
+    post_slugs = {}
+    names = {}
+    for pk, tags in BlogPost.objects.values_list("pk", "tags"):
+        slugs = []
+        for name in tags.split(","):
+            slug = slugify(name)[:60]
+            if slug and slug not in slugs:
+                slugs.append(slug)
+                names.setdefault(slug, name.strip()[:50])
+        post_slugs[pk] = slugs
+
+    Tag.objects.bulk_create(
+        [Tag(name=name, slug=slug) for slug, name in names.items()],
+        batch_size=500,
+    )
+    tag_ids = dict(Tag.objects.values_list("slug", "pk"))
+    PostTag.objects.bulk_create(
+        [
+            PostTag(post_id=pk, tag_id=tag_ids[slug])
+            for pk, slugs in post_slugs.items()
+            for slug in slugs
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0004_blogpost_content_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50)),
+                ("slug", models.SlugField(max_length=60, unique=True)),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="PostTag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="blog.blogpost"
+                    ),
+                ),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="blog.tag"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="blogpost",
+            name="tag_set",
+            field=models.ManyToManyField(
+                blank=True,
+                editable=False,
+                related_name="posts",
+                through="blog.PostTag",
+                to="blog.tag",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="posttag",
+            constraint=models.UniqueConstraint(
+                fields=("tag", "post"), name="blog_posttag_unique"
+            ),
+        ),
+        migrations.RunPython(split_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+from core.migration_operations import AddIndexConcurrently
+
+# Listing indexes matching the filters and ordering the public views use
+INDEXES = [
+    models.Index(
+        condition=models.Q(("status", "published")),
+        fields=["-published_at", "-created_at", "-id"],
+        name="blog_post_published_idx",
+    ),
+    models.Index(
+        condition=models.Q(("status", "published")),
+        fields=["category", "-published_at", "-created_at", "-id"],
+        name="blog_post_category_pub_idx",
+    ),
+]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("blog", "0005_tags"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(model_name="blogpost", index=index)
+        for index in INDEXES
+    ]
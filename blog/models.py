@@ -1,9 +1,16 @@
 # apps/blog/models.py
 from django.db import models
+from django.db.models import Count, Q
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import strip_tags
 from django.utils.text import slugify
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from ckeditor.fields import RichTextField
+from .rendering import content_fingerprint, render_markdown
+from .search import update_search_vector
 
 class BlogCategory(models.Model):
     name = models.CharField(max_length=100)
@@ -20,22 +27,102 @@ class BlogCategory(models.Model):
     def __str__(self):
         return self.name
 
+    def get_absolute_url(self):
+        return reverse('blog:category', kwargs={'slug': self.slug})
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
 
+class TagQuerySet(models.QuerySet):
+    def for_names(self, names):
+        """Tags matching ``names`` by slug, creating any that don't exist yet"""
+        by_slug = {}
+        for name in names:
+            slug = slugify(name)[:60]
+            if slug and slug not in by_slug:
+                by_slug[slug] = name.strip()[:50]
+        if not by_slug:
+            return []
+        self.bulk_create(
+            [Tag(name=name, slug=slug) for slug, name in by_slug.items()],
+            ignore_conflicts=True,
+        )
+        return list(self.filter(slug__in=by_slug))
+
+    def with_post_counts(self):
+        """Annotate ``post_count`` (published posts) and drop unused tags"""
+        published = Q(posts__status='published', posts__published_at__lte=timezone.now())
+        return self.annotate(
+            post_count=Count('posts', filter=published)
+        ).filter(post_count__gt=0)
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=50)
+    slug = models.SlugField(max_length=60, unique=True)
+
+    objects = TagQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    def get_absolute_url(self):
+        return reverse('blog:tag', kwargs={'slug': self.slug})
+
+
+class BlogPostQuerySet(models.QuerySet):
+    """Querysets for listing posts without loading their large text columns"""
+
+    CARD_FIELDS = [
+        'title', 'slug', 'excerpt', 'featured_image', 'status', 'is_featured',
+        'published_at', 'created_at', 'view_count', 'reading_time',
+        'category', 'category__name', 'category__slug', 'category__color',
+        'author', 'author__username', 'author__first_name', 'author__last_name',
+    ]
+    HEADLINE_FIELDS = ['title', 'slug', 'published_at', 'created_at']
+
+    def cards(self):
+        """Columns needed by post cards (lists, related posts, homepage)"""
+        return self.select_related('category', 'author').only(*self.CARD_FIELDS)
+
+    def headlines(self):
+        """Title/link/date only, for sidebars and previous/next links"""
+        return self.only(*self.HEADLINE_FIELDS)
+
+    def with_tags(self):
+        """Load the tags of every post in one extra query"""
+        return self.prefetch_related('tag_set')
+
+
 class BlogPost(models.Model):
     STATUS_CHOICES = [
         ('draft', 'Draft'),
         ('published', 'Published'),
         ('archived', 'Archived'),
     ]
+    
+    SEARCH_FIELDS = {'title', 'excerpt', 'tags', 'content'}
+    RENDERED_FIELDS = ['content_html', 'content_toc', 'content_hash']
+    STATS_FIELDS = ['word_count', 'reading_time', 'tag_list']
+    # Unique ordering used for keyset pagination of published posts; it
+    # extends Meta.ordering so both are served by the same index
+    PAGE_KEYS = ['-published_at', '-created_at', '-id']
+    WORDS_PER_MINUTE = 200
 
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=100, unique=True, blank=True)
     excerpt = models.CharField(max_length=300, help_text="Brief description for previews")
     content = RichTextField()
+    
+    # Rendered once on save from ``content`` (see blog.rendering)
+    content_html = models.TextField(blank=True, editable=False)
+    content_toc = models.TextField(blank=True, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
     featured_image = models.ImageField(upload_to='blog/', blank=True, null=True)
     
     # SEO fields
@@ -47,6 +134,10 @@ class BlogPost(models.Model):
                                null=True, blank=True)
     tags = models.CharField(max_length=200, blank=True, 
                           help_text="Comma-separated tags")
+    tag_list = models.JSONField(default=list, blank=True, editable=False,
+                                help_text="Parsed from tags on save")
+    tag_set = models.ManyToManyField(Tag, through='PostTag', related_name='posts',
+                                     blank=True, editable=False)
     
     # Publishing
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
@@ -60,11 +151,34 @@ class BlogPost(models.Model):
     
     # Analytics
     view_count = models.PositiveIntegerField(default=0)
+    
+    # Content stats - computed on save from the rendered text
+    word_count = models.PositiveIntegerField(default=0, db_index=True, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=1, db_index=True, editable=False,
+                                                    help_text="Estimated minutes to read")
+    
+    # Search - weighted tsvector maintained on save (PostgreSQL only)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    objects = BlogPostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-published_at', '-created_at']
         verbose_name = "Blog Post"
         verbose_name_plural = "Blog Posts"
+        indexes = [
+            GinIndex(fields=['search_vector'], name='blog_post_search_gin'),
+            # Published archive, sidebars, counts and previous/next links
+            models.Index(
+                fields=['-published_at', '-created_at', '-id'],
+                condition=Q(status='published'), name='blog_post_published_idx',
+            ),
+            # Category pages
+            models.Index(
+                fields=['category', '-published_at', '-created_at', '-id'],
+                condition=Q(status='published'), name='blog_post_category_pub_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -76,20 +190,55 @@ class BlogPost(models.Model):
             self.meta_title = self.title[:60]
         if not self.meta_description:
             self.meta_description = self.excerpt[:160]
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'content', 'tags'} & set(update_fields):
+            changed = set(self.STATS_FIELDS)
+            if self.render_content():
+                changed |= set(self.RENDERED_FIELDS)
+            self.compute_stats()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | changed
         super().save(*args, **kwargs)
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'tags' in update_fields:
+            self.sync_tags()
+        if update_fields is None or self.SEARCH_FIELDS & set(update_fields):
+            update_search_vector(self)
 
     def get_absolute_url(self):
         return reverse('blog:detail', kwargs={'slug': self.slug})
 
-    @property
-    def reading_time(self):
-        """Estimate reading time in minutes"""
-        word_count = len(self.content.split())
-        return max(1, round(word_count / 200))  # 200 words per minute
-
-    @property
-    def tag_list(self):
-        """Return tags as a list"""
-        if self.tags:
-            return [tag.strip() for tag in self.tags.split(',')]
-        return []
\ No newline at end of file
+    def render_content(self, force=False):
+        """Re-render content_html/content_toc if the source or renderer changed"""
+        fingerprint = content_fingerprint(self.content)
+        if not force and fingerprint == self.content_hash:
+            return False
+        self.content_html, self.content_toc = render_markdown(self.content)
+        self.content_hash = fingerprint
+        return True
+
+    def compute_stats(self):
+        """Set word_count, reading_time and tag_list from content and tags"""
+        text = strip_tags(self.content_html or self.content)
+        self.word_count = len(text.split())
+        self.reading_time = max(1, round(self.word_count / self.WORDS_PER_MINUTE))
+        self.tag_list = [tag.strip() for tag in self.tags.split(',') if tag.strip()]
+
+    def sync_tags(self):
+        """Point the normalized tag relation at the names in ``tag_list``"""
+        self.tag_set.set(Tag.objects.for_names(self.tag_list))
+
+
+class PostTag(models.Model):
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tag', 'post'], name='blog_posttag_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.post} - {self.tag}"
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""
+Markdown rendering for blog post content.
+
+Posts are rendered once when saved and the HTML, table of contents and a
+fingerprint of the source are stored on the post. Bump ``RENDERER_VERSION``
+whenever the extensions or their configuration change, then run
+``rerender_posts`` to refresh the stored HTML.
+"""
+import hashlib
+
+import markdown
+
+RENDERER_VERSION = '1'
+
+EXTENSIONS = ['extra', 'codehilite', 'toc']
+
+
+def render_markdown(text):
+    """Return (html, toc_html) for a markdown source"""
+    if not text:
+        return '', ''
+    md = markdown.Markdown(extensions=EXTENSIONS)
+    html = md.convert(text)
+    # Posts without headings get an empty TOC container; don't store it
+    toc = md.toc if '<li' in md.toc else ''
+    return html, toc
+
+
+def content_fingerprint(text):
+    """Hash of the source and renderer version, used to skip unchanged posts"""
+    source = f'{RENDERER_VERSION}\n{text or ""}'
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
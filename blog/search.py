@@ -0,0 +1,144 @@
+"""
+Full-text search for blog posts.
+
+On PostgreSQL every post carries a weighted ``search_vector`` (title >
+excerpt/tags > content) backed by a GIN index, and results are ordered by
+``SearchRank``. Other databases (SQLite in development) fall back to an
+in-memory inverted index built from the same fields and weights.
+"""
+import math
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import Case, Count, F, FloatField, Max, Value, When
+from django.utils.html import strip_tags
+
+from search.text import highlight, tokenize
+
+SEARCH_CONFIG = 'english'
+
+# Same relative weights PostgreSQL uses for the A/B/C labels
+WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2}
+
+
+def uses_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def weighted_fields(post):
+    """(text, weight) pairs that make up a post's searchable document"""
+    return [
+        (post.title, 'A'),
+        (post.excerpt, 'B'),
+        (post.tags, 'B'),
+        (strip_tags(post.content), 'C'),
+    ]
+
+
+def update_search_vector(post):
+    """Recompute the stored search vector for a saved post (PostgreSQL only)"""
+    if not uses_postgres():
+        return
+    from django.contrib.postgres.search import SearchVector
+
+    vector = None
+    for text, weight in weighted_fields(post):
+        part = SearchVector(Value(text or ''), weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    type(post).objects.filter(pk=post.pk).update(search_vector=vector)
+
+
+class PostIndex:
+    """In-memory inverted index: term -> {post id: weighted term frequency}"""
+
+    def __init__(self, posts):
+        self.postings = defaultdict(lambda: defaultdict(float))
+        self.lengths = {}
+        for post in posts:
+            length = 0
+            for text, weight in weighted_fields(post):
+                tokens = tokenize(text)
+                length += len(tokens)
+                for token in tokens:
+                    self.postings[token][post.pk] += WEIGHTS[weight]
+            self.lengths[post.pk] = length or 1
+        self.size = len(self.lengths)
+
+    def search(self, query):
+        """Return [(post id, score)] for posts containing every query term"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        matches = None
+        for term in terms:
+            ids = set(self.postings.get(term, ()))
+            matches = ids if matches is None else matches & ids
+            if not matches:
+                return []
+
+        scores = {}
+        for pk in matches:
+            score = 0.0
+            for term in terms:
+                postings = self.postings[term]
+                idf = math.log(1 + self.size / len(postings))
+                score += postings[pk] * idf
+            # Damp long documents the way ts_rank's length normalisation does
+            scores[pk] = score / math.log(2 + self.lengths[pk])
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+_index_cache = {'signature': None, 'index': None}
+
+
+def get_index():
+    """Return the fallback index, rebuilding it when any post has changed"""
+    from .models import BlogPost
+
+    signature = tuple(BlogPost.objects.aggregate(
+        count=Count('pk'), latest=Max('updated_at')
+    ).values())
+    if _index_cache['signature'] != signature:
+        posts = BlogPost.objects.only('pk', 'title', 'excerpt', 'tags', 'content')
+        _index_cache['index'] = PostIndex(posts)
+        _index_cache['signature'] = signature
+    return _index_cache['index']
+
+
+def search_posts(queryset, query):
+    """Filter ``queryset`` to posts matching ``query``, best matches first"""
+    if uses_postgres():
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-search_rank', '-published_at')
+
+    ranked = get_index().search(query)
+    if not ranked:
+        return queryset.none()
+    return queryset.filter(pk__in=[pk for pk, _ in ranked]).annotate(
+        search_rank=Case(
+            *[When(pk=pk, then=Value(score)) for pk, score in ranked],
+            output_field=FloatField(),
+        )
+    ).order_by('-search_rank', '-published_at')
+
+
+def attach_snippets(posts, query):
+    """Set ``search_snippet`` on each post, preferring a match in the content"""
+    from .models import BlogPost
+
+    terms = set(tokenize(query))
+    # List querysets defer content, so fetch it for the whole page at once
+    contents = dict(BlogPost.objects.filter(
+        pk__in=[post.pk for post in posts]
+    ).values_list('pk', 'content'))
+    for post in posts:
+        source = contents.get(post.pk, '')
+        if not terms & set(tokenize(strip_tags(source))):
+            source = post.excerpt
+        post.search_snippet = highlight(source, query)
+    return posts
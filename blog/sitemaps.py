@@ -2,7 +2,13 @@
 Sitemaps for blog application.
 """
 from django.contrib.sitemaps import Sitemap
-from .models import BlogPost, BlogCategory
+from django.db.models import Max, Q
+from django.utils import timezone
+from .models import BlogPost, BlogCategory, Tag
+
+
+def published_posts():
+    return Q(status='published', published_at__lte=timezone.now())
 
 
 class BlogSitemap(Sitemap):
@@ -11,7 +17,10 @@ class BlogSitemap(Sitemap):
     priority = 0.8
     
     def items(self):
-        return BlogPost.objects.filter(status='published')
+        # Oldest first, so new posts only change the last shard
+        return BlogPost.objects.filter(published_posts()).only(
+            'slug', 'updated_at'
+        ).order_by('pk')
     
     def lastmod(self, obj):
         return obj.updated_at
@@ -21,15 +30,40 @@ class BlogSitemap(Sitemap):
 
 
 class BlogCategorySitemap(Sitemap):
-    """Sitemap for blog categories."""
-    changefreq = 'monthly'
+    """Sitemap for blog categories with published posts."""
+    changefreq = 'weekly'
     priority = 0.6
     
     def items(self):
-        return BlogCategory.objects.filter(is_active=True)
+        return BlogCategory.objects.filter(is_active=True).annotate(
+            last_post_update=Max(
+                'blogpost__updated_at',
+                filter=Q(blogpost__status='published', blogpost__published_at__lte=timezone.now()),
+            )
+        ).filter(last_post_update__isnull=False).order_by('pk')
+    
+    def lastmod(self, obj):
+        return obj.last_post_update
+    
+    def location(self, obj):
+        return obj.get_absolute_url()
+
+
+class BlogTagSitemap(Sitemap):
+    """Sitemap for tags used by published posts."""
+    changefreq = 'weekly'
+    priority = 0.4
+    
+    def items(self):
+        return Tag.objects.with_post_counts().annotate(
+            last_post_update=Max(
+                'posts__updated_at',
+                filter=Q(posts__status='published', posts__published_at__lte=timezone.now()),
+            )
+        ).order_by('pk')
     
     def lastmod(self, obj):
-        return obj.created_at
+        return obj.last_post_update
     
     def location(self, obj):
-        return obj.get_absolute_url()
\ No newline at end of file
+        return obj.get_absolute_url()
@@ -1,5 +1,5 @@
 from django import template
-import markdown
+from blog.rendering import render_markdown
 
 register = template.Library()
 
@@ -8,7 +8,5 @@ def markdown_to_html(value):
     """Convert markdown text to HTML"""
     if not value:
         return ""
-    return markdown.markdown(
-        value, 
-        extensions=['extra', 'codehilite', 'toc']
-    )
\ No newline at end of file
+    html, toc = render_markdown(value)
+    return html
\ No newline at end of file
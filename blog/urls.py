@@ -1,14 +1,22 @@
 # Create blog/urls.py
 
 from django.urls import path
-from . import views
+from core.async_views import variant
+from core.feeds import feed_view
+from . import feeds, views
 
 app_name = 'blog'
 
 urlpatterns = [
-    path('', views.blog_list, name='list'),
+    path('', variant(views.blog_list, views.ablog_list), name='list'),
+    path('feed/', feed_view(feeds.LatestPostsFeed()), name='feed'),
+    path('feed/atom/', feed_view(feeds.LatestPostsAtomFeed()), name='feed_atom'),
     path('category/<slug:slug>/', views.category_detail, name='category'),
-    path('<slug:slug>/', views.blog_detail, name='detail'),
+    path('category/<slug:slug>/feed/', feed_view(feeds.CategoryPostsFeed()), name='category_feed'),
+    path('category/<slug:slug>/feed/atom/', feed_view(feeds.CategoryPostsAtomFeed()),
+         name='category_feed_atom'),
+    path('tag/<slug:slug>/', views.tag_detail, name='tag'),
+    path('<slug:slug>/', variant(views.blog_detail, views.ablog_detail), name='detail'),
 ]
 
 # Add to your main urls.py:
@@ -0,0 +1,107 @@
+"""
+Buffered view counter for blog posts.
+
+Page views are accumulated in the cache with atomic ``incr`` calls and
+written to ``BlogPost.view_count`` in bulk with ``F()`` updates, so the
+detail view never issues a per-hit UPDATE and concurrent workers never
+lose increments.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from core.query_budget import budget_exempt
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'blog:views:'
+FLUSH_LOCK_KEY = 'blog:views:flush-lock'
+
+
+def _key(post_id):
+    return f'{KEY_PREFIX}{post_id}'
+
+
+def flush_interval():
+    """Seconds between automatic flushes of the buffer"""
+    return getattr(settings, 'BLOG_VIEW_COUNT_FLUSH_INTERVAL', 60)
+
+
+def record_view(post_id):
+    """Buffer a single view and return the number of unflushed views"""
+    from .models import BlogPost
+
+    key = _key(post_id)
+    cache.add(key, 0, timeout=None)
+    try:
+        pending = cache.incr(key)
+    except ValueError:
+        # Key was evicted between add() and incr(); write straight through
+        BlogPost.objects.filter(pk=post_id).update(view_count=F('view_count') + 1)
+        pending = 0
+
+    maybe_flush()
+    return max(pending, 0)
+
+
+def pending_views(post_id):
+    """Views recorded for a post that have not been written to the database yet"""
+    # A counter drained twice by racing flushes can drop below zero
+    return max(cache.get(_key(post_id), 0), 0)
+
+
+def pending_views_many(post_ids):
+    """Map post id -> buffered views for several posts in one cache round trip"""
+    keys = {_key(pk): pk for pk in post_ids}
+    found = cache.get_many(keys.keys())
+    return {keys[key]: value for key, value in found.items() if value > 0}
+
+
+def claim_flush():
+    """
+    Claim the flush for this interval; False if another worker (or the
+    ``flush_view_counts`` command) already has. Two flushes running at once
+    would both write the same buffered views.
+    """
+    interval = flush_interval()
+    # cache.add() is atomic, so only one worker per interval wins the flush
+    return interval <= 0 or cache.add(FLUSH_LOCK_KEY, 1, timeout=interval)
+
+
+def maybe_flush():
+    """Flush the buffer if no worker has done so within the flush interval"""
+    if claim_flush():
+        # Not part of the page that happened to trigger it
+        with budget_exempt():
+            return flush_views()
+    return 0
+
+
+def flush_views(post_ids=None):
+    """
+    Write buffered views to the database.
+
+    Each buffered counter is drained with ``decr`` by exactly the amount that
+    is written, so hits recorded while the flush is running stay in the buffer
+    for the next flush. Returns the total number of views written.
+    """
+    from .models import BlogPost
+
+    if post_ids is None:
+        post_ids = BlogPost.objects.order_by().values_list('pk', flat=True)
+
+    total = 0
+    for post_id, count in pending_views_many(post_ids).items():
+        try:
+            cache.decr(_key(post_id), count)
+        except ValueError:
+            # Counter disappeared (evicted or flushed elsewhere); nothing to drain
+            continue
+        BlogPost.objects.filter(pk=post_id).update(view_count=F('view_count') + count)
+        total += count
+
+    if total:
+        logger.debug('Flushed %s buffered blog views', total)
+    return total
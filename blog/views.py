@@ -1,71 +1,165 @@
 # Create blog/views.py
 
-from django.shortcuts import render, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, get_object_or_404, aget_object_or_404
 from django.core.paginator import Paginator
-from django.db.models import Q, Count
+from django.db.models import Q, Count, OuterRef, Subquery
 from django.utils import timezone
-from .models import BlogPost, BlogCategory
+from core.async_views import alist, arender, gather
+from core.conditional import conditional_page, single_row
+from core.page_cache import cached_page, depends_on, is_internal_render, remember
+from core.query_budget import query_budget
+from core.pagination import KeysetPaginator
+from search.related import neighbour_ids, neighbours_updated, related_to
+from .models import BlogPost, BlogCategory, Tag
+from .search import attach_snippets, search_posts
+from .view_counter import record_view
 
-def blog_list(request):
-    """Display all published blog posts with filtering"""
-    
-    # Get filter parameters
-    category_slug = request.GET.get('category')
-    search_query = request.GET.get('q')
+def listed_posts(category_slug, search_query):
+    """Published posts for blog_list, filtered and, for a search, ranked"""
     
     # Base queryset - only published posts
-    posts = BlogPost.objects.filter(
+    posts = BlogPost.objects.cards().with_tags().filter(
         status='published',
         published_at__lte=timezone.now()
-    ).select_related('category', 'author')
+    )
     
     # Apply filters
     if category_slug:
         posts = posts.filter(category__slug=category_slug)
     
     if search_query:
-        posts = posts.filter(
-            Q(title__icontains=search_query) |
-            Q(content__icontains=search_query) |
-            Q(excerpt__icontains=search_query) |
-            Q(tags__icontains=search_query)
-        )
-    
-    # Pagination
-    paginator = Paginator(posts, 9)  # 9 posts per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        # Ranked full-text search (GIN-indexed on PostgreSQL)
+        posts = search_posts(posts, search_query)
     
-    # Get categories for filter dropdown
-    categories = BlogCategory.objects.filter(is_active=True).annotate(
-        post_count=Count('blogpost', filter=Q(blogpost__status='published'))
-    )
+    return posts
+
+def search_page(category_slug, search_query, number):
+    """Numbered page of ranked search results, with snippets, and the total"""
+    paginator = Paginator(listed_posts(category_slug, search_query), 9)  # 9 posts per page
+    page_obj = paginator.get_page(number)
+    attach_snippets(page_obj.object_list, search_query)
+    return page_obj, paginator.count
+
+def list_sidebar(page_obj):
+    """The sidebar querysets of blog_list, unevaluated"""
+    return {
+        # Get categories for filter dropdown
+        'categories': BlogCategory.objects.filter(is_active=True).annotate(
+            post_count=Count('blogpost', filter=Q(blogpost__status='published'))
+        ),
+        # Featured/Recent posts for sidebar
+        'featured_posts': BlogPost.objects.headlines().filter(
+            status='published',
+            is_featured=True,
+            published_at__lte=timezone.now()
+        )[:3],
+        'recent_posts': BlogPost.objects.headlines().filter(
+            status='published',
+            published_at__lte=timezone.now()
+        ).exclude(id__in=[p.id for p in page_obj.object_list])[:5],
+        # Most used tags, counted in a single grouped query
+        'popular_tags': Tag.objects.with_post_counts().order_by('-post_count', 'name')[:20],
+    }
+
+@query_budget(12)
+@cached_page
+def blog_list(request):
+    """Display all published blog posts with filtering"""
     
-    # Featured/Recent posts for sidebar
-    featured_posts = BlogPost.objects.filter(
-        status='published',
-        is_featured=True,
-        published_at__lte=timezone.now()
-    )[:3]
+    # Get filter parameters
+    category_slug = request.GET.get('category')
+    search_query = request.GET.get('q')
     
-    recent_posts = BlogPost.objects.filter(
-        status='published',
-        published_at__lte=timezone.now()
-    ).exclude(id__in=[p.id for p in page_obj.object_list])[:5]
+    # Pagination: ranked search results are numbered pages, the archive
+    # itself is paged by (published_at, id) cursors
+    if search_query:
+        page_obj, total_count = search_page(category_slug, search_query, request.GET.get('page'))
+    else:
+        posts = listed_posts(category_slug, search_query)
+        paginator = KeysetPaginator(posts, 9, BlogPost.PAGE_KEYS,
+                                    count_key=f'blog:list:{category_slug or ""}')
+        page_obj = paginator.page(request.GET.get('cursor'))
+        total_count = paginator.count
     
     context = {
         'page_obj': page_obj,
         'posts': page_obj.object_list,
-        'categories': categories,
-        'featured_posts': featured_posts,
-        'recent_posts': recent_posts,
+        **list_sidebar(page_obj),
         'current_category': category_slug,
         'search_query': search_query,
-        'total_count': posts.count(),
+        'total_count': total_count,
     }
     
+    depends_on(request, BlogPost, BlogCategory, Tag)
+    
     return render(request, 'blog/blog_list.html', context)
 
+@query_budget(12)
+@cached_page
+async def ablog_list(request):
+    """``blog_list`` for ASGI (see core.async_views)"""
+    
+    category_slug = request.GET.get('category')
+    search_query = request.GET.get('q')
+    
+    if search_query:
+        # The search index may reload from the database
+        page_obj, total_count = await sync_to_async(search_page)(
+            category_slug, search_query, request.GET.get('page')
+        )
+    else:
+        posts = listed_posts(category_slug, search_query)
+        paginator = KeysetPaginator(posts, 9, BlogPost.PAGE_KEYS,
+                                    count_key=f'blog:list:{category_slug or ""}')
+        page_obj = await paginator.apage(request.GET.get('cursor'))
+        total_count = await paginator.acount()
+    
+    sidebar = await gather(**{
+        name: alist(queryset) for name, queryset in list_sidebar(page_obj).items()
+    })
+    context = {
+        'page_obj': page_obj,
+        'posts': page_obj.object_list,
+        **sidebar,
+        'current_category': category_slug,
+        'search_query': search_query,
+        'total_count': total_count,
+    }
+    
+    depends_on(request, BlogPost, BlogCategory, Tag)
+    
+    return await arender(request, 'blog/blog_list.html', context)
+
+def count_cached_view(request, meta):
+    """Record the view for blog detail pages served from the page cache or as a 304"""
+    record_view(meta['post_id'])
+
+def post_state(request, slug):
+    """What a post's page is built from, in one query (see core.conditional)"""
+    published = BlogPost.objects.filter(status='published')
+    visible = published.filter(published_at__lte=timezone.now())
+    # The previous/next links, chosen as in blog_detail
+    previous_post = published.filter(published_at__lt=OuterRef('published_at')).order_by('-published_at')
+    next_post = visible.filter(published_at__gt=OuterRef('published_at')).order_by('published_at')
+    row = single_row(visible.filter(slug=slug).annotate(
+        related_updated=neighbours_updated(BlogPost, visible),
+        related_ids=neighbour_ids(BlogPost, visible),
+        previous_updated=Subquery(previous_post.values('updated_at')[:1]),
+        next_updated=Subquery(next_post.values('updated_at')[:1]),
+    ).values(
+        # Categories have no updated_at, so the page's category fields stand
+        # in; rerender_posts changes the HTML without touching updated_at
+        'pk', 'updated_at', 'content_hash', 'category__name', 'category__slug',
+        'related_updated', 'related_ids', 'previous_updated', 'next_updated',
+    ))
+    if row is not None:
+        row['post_id'] = row.pop('pk')
+    return row
+
+@query_budget(10)
+@cached_page(on_hit=count_cached_view)
+@conditional_page(post_state, on_not_modified=count_cached_view)
 def blog_detail(request, slug):
     """Display individual blog post"""
     
@@ -76,53 +170,97 @@ def blog_detail(request, slug):
         published_at__lte=timezone.now()
     )
     
-    # Increment view count
-    post.view_count += 1
-    post.save(update_fields=['view_count'])
+    # Buffer the view; the counter is written to the database in batches.
+    # Renders for freeze_site are not visits.
+    if not is_internal_render(request):
+        post.view_count += record_view(post.pk)
+    
+    rows = {name: list(queryset) for name, queryset in detail_querysets(post).items()}
+    context = detail_context(request, post, rows)
+    
+    return render(request, 'blog/blog_detail.html', context)
+
+@query_budget(10)
+@cached_page(on_hit=count_cached_view)
+@conditional_page(post_state, on_not_modified=count_cached_view)
+async def ablog_detail(request, slug):
+    """``blog_detail`` for ASGI (see core.async_views)"""
     
-    # Get related posts (same category, excluding current)
-    related_posts = BlogPost.objects.filter(
-        category=post.category,
+    post = await aget_object_or_404(
+        BlogPost.objects.select_related('category', 'author'),
+        slug=slug,
         status='published',
         published_at__lte=timezone.now()
-    ).exclude(id=post.id)[:3]
+    )
     
-    # Get previous and next posts
-    previous_post = BlogPost.objects.filter(
-        status='published',
-        published_at__lt=post.published_at
-    ).order_by('-published_at').first()
+    if not is_internal_render(request):
+        post.view_count += await sync_to_async(record_view)(post.pk)
     
-    next_post = BlogPost.objects.filter(
-        status='published',
-        published_at__gt=post.published_at
-    ).order_by('published_at').first()
+    # related_to() may look up the post's content type
+    querysets = await sync_to_async(detail_querysets)(post)
+    rows = await gather(**{name: alist(queryset) for name, queryset in querysets.items()})
+    context = detail_context(request, post, rows)
+    
+    return await arender(request, 'blog/blog_detail.html', context)
+
+def detail_querysets(post):
+    """The querysets blog_detail shows around ``post``, unevaluated"""
+    return {
+        'tags': post.tag_set.all(),
+        # Precomputed related posts (tags, category and title/excerpt similarity)
+        'related_posts': related_to(post, BlogPost.objects.cards().filter(
+            status='published',
+            published_at__lte=timezone.now()
+        ))[:3],
+        # Get previous and next posts
+        'previous_post': BlogPost.objects.headlines().filter(
+            status='published',
+            published_at__lt=post.published_at
+        ).order_by('-published_at')[:1],
+        'next_post': BlogPost.objects.headlines().filter(
+            status='published',
+            published_at__gt=post.published_at,
+            published_at__lte=timezone.now()
+        ).order_by('published_at')[:1],
+    }
+
+def detail_context(request, post, rows):
+    """blog_detail's context from the evaluated ``detail_querysets(post)``"""
     
     context = {
         'post': post,
-        'related_posts': related_posts,
-        'previous_post': previous_post,
-        'next_post': next_post,
+        'tags': rows['tags'],
+        'related_posts': rows['related_posts'],
+        'previous_post': rows['previous_post'][0] if rows['previous_post'] else None,
+        'next_post': rows['next_post'][0] if rows['next_post'] else None,
         'absolute_image_url': request.build_absolute_uri(post.featured_image.url) if post.featured_image else None, 
     }
     
-    return render(request, 'blog/blog_detail.html', context)
+    # Any post can become the previous or next one (a newly published post
+    # fills an empty "next" link), so the page depends on every post
+    depends_on(request, post, post.category, context['tags'], context['related_posts'],
+               BlogPost)
+    remember(request, post_id=post.pk)
+    
+    return context
 
+@query_budget(6)
+@cached_page
 def category_detail(request, slug):
     """Display posts from a specific category"""
     
     category = get_object_or_404(BlogCategory, slug=slug, is_active=True)
     
-    posts = BlogPost.objects.filter(
+    posts = BlogPost.objects.cards().with_tags().filter(
         category=category,
         status='published',
         published_at__lte=timezone.now()
-    ).select_related('author')
+    )
     
     # Pagination
-    paginator = Paginator(posts, 9)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(posts, 9, BlogPost.PAGE_KEYS,
+                                count_key=f'blog:category:{category.pk}')
+    page_obj = paginator.page(request.GET.get('cursor'))
     
     context = {
         'category': category,
@@ -130,12 +268,41 @@ def category_detail(request, slug):
         'posts': page_obj.object_list,
     }
     
+    depends_on(request, category, BlogPost)
+    
     return render(request, 'blog/category_detail.html', context)
 
+@query_budget(6)
+@cached_page
+def tag_detail(request, slug):
+    """Display posts with a specific tag"""
+    
+    tag = get_object_or_404(Tag, slug=slug)
+    
+    posts = tag.posts.cards().with_tags().filter(
+        status='published',
+        published_at__lte=timezone.now()
+    )
+    
+    # Pagination
+    paginator = KeysetPaginator(posts, 9, BlogPost.PAGE_KEYS,
+                                count_key=f'blog:tag:{tag.pk}')
+    page_obj = paginator.page(request.GET.get('cursor'))
+    
+    context = {
+        'tag': tag,
+        'page_obj': page_obj,
+        'posts': page_obj.object_list,
+    }
+    
+    depends_on(request, tag, BlogPost, Tag)
+    
+    return render(request, 'blog/tag_detail.html', context)
+
 def featured_posts_context(request):
     """Context processor for featured posts (for homepage)"""
     
-    featured_posts = BlogPost.objects.filter(
+    featured_posts = BlogPost.objects.cards().filter(
         status='published',
         is_featured=True,
         published_at__lte=timezone.now()
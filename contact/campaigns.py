@@ -0,0 +1,194 @@
+"""
+Newsletter campaigns.
+
+``build_digest`` renders the blog posts published since the previous
+campaign into a ``Campaign`` once; ``send_campaign`` then streams active
+subscribers in chunks and sends the same message to each of them from a
+small thread pool. Every worker thread keeps one open connection for the
+whole run and all of them share a throttle, so the mail server sees at most
+NEWSLETTER_RATE messages a second.
+
+Each chunk's outcomes are stored as ``CampaignDelivery`` rows. Sending again
+skips subscribers that already have a successful delivery, so a crashed run
+resumes where it stopped and a finished one only retries failures. A crash
+between sending and recording a chunk can repeat those messages, never lose
+them.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Exists, OuterRef
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Campaign, CampaignDelivery, Newsletter
+
+# Window of the first digest, when there is no earlier campaign to follow on from
+FIRST_DIGEST_DAYS = 30
+
+
+def build_digest(since=None):
+    """Create a campaign listing posts published after ``since``, or None"""
+    from blog.models import BlogPost
+
+    if since is None:
+        previous = Campaign.objects.values_list('created_at', flat=True).first()
+        since = previous or timezone.now() - timedelta(days=FIRST_DIGEST_DAYS)
+
+    posts = list(
+        BlogPost.objects.cards()
+        .filter(status='published', published_at__gt=since, published_at__lte=timezone.now())
+        .order_by(*BlogPost.PAGE_KEYS)
+    )
+    if not posts:
+        return None
+
+    context = {
+        'posts': posts,
+        'since': since,
+        'site_url': settings.SITE_URL,
+    }
+    count = len(posts)
+    return Campaign.objects.create(
+        subject=f"New from Fayvad Digital: {count} article{'s' if count != 1 else ''}",
+        body=render_to_string('contact/emails/digest.txt', context),
+        html_body=render_to_string('contact/emails/digest.html', context),
+        since=since,
+    )
+
+
+class Throttle:
+    """Spaces calls from any number of threads at least 1/rate seconds apart"""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SenderPool:
+    """One reusable mail connection per worker thread"""
+
+    def __init__(self, campaign, rate):
+        self.campaign = campaign
+        self.throttle = Throttle(rate)
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = get_connection()
+            connection.open()
+            self.local.connection = connection
+            with self.lock:
+                self.connections.append(connection)
+        return connection
+
+    def send(self, subscriber):
+        """Send to one subscriber; returns (subscriber id, error or '')"""
+        self.throttle.wait()
+        try:
+            message = EmailMultiAlternatives(
+                subject=self.campaign.subject,
+                body=self.campaign.body,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[subscriber.email],
+                connection=self.connection(),
+            )
+            if self.campaign.html_body:
+                message.attach_alternative(self.campaign.html_body, 'text/html')
+            message.send()
+        except Exception as e:
+            # The connection may be broken; the next send opens a fresh one
+            self.reset()
+            return subscriber.pk, str(e) or e.__class__.__name__
+        return subscriber.pk, ''
+
+    def reset(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            self.local.connection = None
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def close(self):
+        for connection in self.connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+def pending_recipients(campaign):
+    """Active subscribers without a successful delivery of ``campaign``"""
+    delivered = CampaignDelivery.objects.filter(
+        campaign=campaign, subscriber=OuterRef('pk'), sent=True
+    )
+    return (
+        Newsletter.objects.filter(is_active=True)
+        .exclude(Exists(delivered))
+        .only('pk', 'email')
+        .order_by('pk')
+    )
+
+
+def send_campaign(campaign, workers=None, rate=None, chunk_size=None, stdout=None):
+    """Send ``campaign`` to every pending recipient; returns (sent, failed)"""
+    workers = workers or settings.NEWSLETTER_WORKERS
+    rate = settings.NEWSLETTER_RATE if rate is None else rate
+    chunk_size = chunk_size or settings.NEWSLETTER_CHUNK_SIZE
+
+    if campaign.status != 'sending':
+        campaign.status = 'sending'
+        campaign.started_at = campaign.started_at or timezone.now()
+        campaign.save(update_fields=['status', 'started_at'])
+
+    sent = failed = 0
+    recipients = pending_recipients(campaign).iterator(chunk_size=chunk_size)
+    pool = SenderPool(campaign, rate)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while chunk := list(islice(recipients, chunk_size)):
+                results = list(executor.map(pool.send, chunk))
+                CampaignDelivery.objects.bulk_create(
+                    [
+                        CampaignDelivery(
+                            campaign=campaign, subscriber_id=pk, sent=not error, error=error
+                        )
+                        for pk, error in results
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['campaign', 'subscriber'],
+                    update_fields=['sent', 'error'],
+                )
+                chunk_failed = sum(1 for _, error in results if error)
+                sent += len(results) - chunk_failed
+                failed += chunk_failed
+                if stdout:
+                    stdout.write(f'📨 {sent} sent, {failed} failed')
+    finally:
+        pool.close()
+
+    campaign.status = 'sent'
+    campaign.finished_at = timezone.now()
+    campaign.save(update_fields=['status', 'finished_at'])
+    return sent, failed
@@ -1,8 +1,13 @@
 # apps/contact/forms.py
+import logging
+
 from django import forms
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
 from .models import ContactSubmission 
+from .outbox import enqueue
+
+logger = logging.getLogger(__name__)
 
 class ContactForm(forms.ModelForm):
     class Meta:
@@ -90,15 +95,13 @@ class ContactForm(forms.ModelForm):
         return phone
 
     def save(self, commit=True):
-        instance = super().save(commit=commit)
-        if commit:
-            # Send notification emails
-            try:
-                instance.send_notification_email()
-                instance.send_confirmation_email()
-            except Exception as e:
-                # Log error but don't fail the form submission
-                print(f"Email sending failed: {e}")
+        if not commit:
+            return super().save(commit=False)
+        # The submission and its emails are stored together; the outbox
+        # worker sends them, so a slow mail server never holds up the response
+        with transaction.atomic():
+            instance = super().save()
+            instance.queue_emails()
         return instance
 
 
@@ -140,7 +143,7 @@ class QuickContactForm(forms.Form):
     )
 
     def send_email(self):
-        """Send the quick contact email"""
+        """Queue the quick contact email for the outbox worker"""
         try:
             subject = f"Quick Contact: {self.cleaned_data['name']} - {self.cleaned_data['service']}"
             message = f"""
@@ -155,14 +158,8 @@ class QuickContactForm(forms.Form):
             {self.cleaned_data['message']}
             """
             
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[settings.CONTACT_EMAIL],
-                fail_silently=False,
-            )
+            enqueue(subject=subject, body=message, to=[settings.CONTACT_EMAIL])
             return True
-        except Exception as e:
-            print(f"Failed to send quick contact email: {e}")
+        except Exception:
+            logger.exception('Failed to queue quick contact email')
             return False
\ No newline at end of file
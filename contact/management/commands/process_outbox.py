@@ -0,0 +1,46 @@
+# contact/management/commands/process_outbox.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from contact.outbox import process_batch
+
+
+class Command(BaseCommand):
+    help = 'Sends queued emails from the outbox, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Emails sent per SMTP connection (default: OUTBOX_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, polling for new emails',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between polls when the outbox is empty',
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = process_batch(options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f'📨 Sent {sent}, failed {failed}')
+                # A full batch may mean more is waiting
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Sent {total_sent} emails ({total_failed} failed attempts)')
+        )
@@ -0,0 +1,62 @@
+# contact/management/commands/send_newsletter.py
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from contact.campaigns import build_digest, send_campaign
+from contact.models import Campaign
+
+
+class Command(BaseCommand):
+    help = 'Sends a digest of new blog posts to newsletter subscribers, resuming unfinished campaigns'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--campaign',
+            type=int,
+            help='Send (or resume) this campaign instead of building a new digest',
+        )
+        parser.add_argument(
+            '--since',
+            help='Include posts published after this date (YYYY-MM-DD); defaults to the last campaign',
+        )
+        parser.add_argument('--workers', type=int, help='Parallel SMTP connections')
+        parser.add_argument('--rate', type=float, help='Messages per second (0 for no limit)')
+        parser.add_argument('--chunk-size', type=int, help='Subscribers loaded per batch')
+
+    def handle(self, *args, **options):
+        if options['campaign']:
+            try:
+                campaign = Campaign.objects.get(pk=options['campaign'])
+            except Campaign.DoesNotExist:
+                raise CommandError(f"Campaign {options['campaign']} does not exist")
+        else:
+            # A run that crashed takes priority over a new digest
+            campaign = Campaign.objects.filter(status='sending').first()
+            if campaign:
+                self.stdout.write(f'↻ Resuming campaign {campaign.pk}: {campaign.subject}')
+
+        if campaign is None:
+            since = None
+            if options['since']:
+                try:
+                    since = timezone.make_aware(datetime.strptime(options['since'], '%Y-%m-%d'))
+                except ValueError:
+                    raise CommandError('--since must be a date in YYYY-MM-DD format')
+            campaign = build_digest(since)
+            if campaign is None:
+                self.stdout.write(self.style.WARNING('⚠️ No new posts to send'))
+                return
+            self.stdout.write(f'📝 Created campaign {campaign.pk}: {campaign.subject}')
+
+        sent, failed = send_campaign(
+            campaign,
+            workers=options['workers'],
+            rate=options['rate'],
+            chunk_size=options['chunk_size'],
+            stdout=self.stdout,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Campaign {campaign.pk}: {sent} sent, {failed} failed')
+        )
@@ -1,8 +1,9 @@
 # contact/models.py
 
 from django.db import models
-from django.core.mail import send_mail
+from django.db.models import Q
 from django.conf import settings
+from django.utils import timezone
 
 class ContactSubmission(models.Model):
     """Contact form submissions"""
@@ -43,9 +44,24 @@ class ContactSubmission(models.Model):
     def __str__(self):
         return f"{self.name} - {self.subject}"
     
-    def send_notification_email(self):
-        """Send notification email to business"""
-        message = f"""
+    def queue_emails(self):
+        """Queue the business notification and the client confirmation"""
+        from .outbox import enqueue
+
+        enqueue(
+            subject=f'New Contact: {self.subject}',
+            body=self.notification_message(),
+            to=[settings.DEFAULT_FROM_EMAIL],
+        )
+        enqueue(
+            subject='Thank you for contacting Fayvad Digital',
+            body=self.confirmation_message(),
+            to=[self.email],
+        )
+
+    def notification_message(self):
+        """Notification email body for the business"""
+        return f"""
 New contact form submission from {self.name}
 
 Contact Information:
@@ -65,23 +81,10 @@ Message:
 
 Submitted: {self.created_at}
         """
-        
-        try:
-            send_mail(
-                subject=f'New Contact: {self.subject}',
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[settings.DEFAULT_FROM_EMAIL],
-                fail_silently=False,
-            )
-            return True
-        except Exception as e:
-            print(f"Error sending notification email: {e}")
-            return False
     
-    def send_confirmation_email(self):
-        """Send confirmation email to client"""
-        confirmation_message = f"""
+    def confirmation_message(self):
+        """Confirmation email body for the client"""
+        return f"""
 Hello {self.name},
 
 Thank you for contacting Fayvad Digital! We have received your message and will get back to you within 24 hours.
@@ -104,19 +107,6 @@ www.digital.fayvad.com
 ---
 This is an automated confirmation. Please do not reply to this email.
         """
-        
-        try:
-            send_mail(
-                subject='Thank you for contacting Fayvad Digital',
-                message=confirmation_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[self.email],
-                fail_silently=True,
-            )
-            return True
-        except Exception as e:
-            print(f"Error sending confirmation email: {e}")
-            return False
 
 class Newsletter(models.Model):
     """Newsletter subscription"""
@@ -130,4 +120,89 @@ class Newsletter(models.Model):
         ordering = ['-subscribed_at']
     
     def __str__(self):
-        return f"{self.email} - {self.name}"
\ No newline at end of file
+        return f"{self.email} - {self.name}"
+
+class OutboxEmail(models.Model):
+    """Email waiting to be sent by the process_outbox worker"""
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(help_text="List of recipient addresses")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Outbox Email"
+        verbose_name_plural = "Outbox Emails"
+        indexes = [
+            # The worker's "what is due" query
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=Q(status='pending'),
+                name='contact_outbox_due_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+class Campaign(models.Model):
+    """Newsletter email rendered once and sent to every active subscriber"""
+
+    STATUS_CHOICES = [
+        ('draft', 'Draft'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    # Digest window: posts published after this were included
+    since = models.DateTimeField(null=True, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.subject} ({self.status})"
+
+
+class CampaignDelivery(models.Model):
+    """Outcome of sending a campaign to one subscriber"""
+
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='deliveries')
+    subscriber = models.ForeignKey(Newsletter, on_delete=models.CASCADE, related_name='deliveries')
+    sent = models.BooleanField(default=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['campaign', 'subscriber'], name='contact_delivery_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.campaign_id} -> {self.subscriber_id}"
@@ -0,0 +1,142 @@
+"""
+Database-backed outbox for transactional email.
+
+Views never talk to the mail server. ``enqueue`` writes an ``OutboxEmail``
+row, normally in the same transaction as the record it belongs to, and the
+``process_outbox`` command sends due rows in batches over one SMTP
+connection. Each email's lease is renewed just before it is sent, so a
+slow batch never sends an email whose lease ran out and another worker
+claimed. A failed send is retried with exponential backoff until
+OUTBOX_MAX_ATTEMPTS is reached, so nothing is lost while the server is down.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed row stays invisible to other workers; renewed for each
+# email before it is sent, so it only has to outlast one send (EMAIL_TIMEOUT)
+CLAIM_SECONDS = 300
+
+
+def enqueue(subject, body, to, from_email=None):
+    """Queue an email for the outbox worker"""
+    return OutboxEmail.objects.create(
+        subject=subject[:255],
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+    )
+
+
+def retry_delay(attempts):
+    """Seconds to wait after the ``attempts``-th failure"""
+    delay = settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return min(delay, settings.OUTBOX_MAX_RETRY_DELAY)
+
+
+def claim(batch_size):
+    """
+    Lease up to ``batch_size`` due emails to this worker. Rows locked by
+    another worker are skipped, and the lease pushes ``next_attempt_at``
+    forward so a crashed worker's rows are picked up again later.
+    """
+    now = timezone.now()
+    lease = now + timedelta(seconds=CLAIM_SECONDS)
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if emails:
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+                next_attempt_at=lease
+            )
+    for email in emails:
+        email.next_attempt_at = lease
+    return emails
+
+
+def renew(email):
+    """
+    Extend this worker's lease on ``email`` before sending it. False if the
+    lease ran out and another worker has claimed (or sent) the email since.
+    """
+    lease = timezone.now() + timedelta(seconds=CLAIM_SECONDS)
+    # Another worker's claim moved next_attempt_at, so this matches no row
+    renewed = OutboxEmail.objects.filter(
+        pk=email.pk, status='pending', next_attempt_at=email.next_attempt_at
+    ).update(next_attempt_at=lease)
+    if renewed:
+        email.next_attempt_at = lease
+    return bool(renewed)
+
+
+def process_batch(batch_size=None):
+    """Send one batch of due emails; returns (sent, failed) counts"""
+    emails = claim(batch_size or settings.OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0, 0
+    return send_claimed(emails)
+
+
+def send_claimed(emails):
+    """Send ``emails``, claimed by this worker; returns (sent, failed) counts"""
+
+    sent = failed = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        # Server unreachable: every claimed email counts as one failed attempt
+        for email in emails:
+            record_failure(email, e)
+        return 0, len(emails)
+
+    try:
+        for email in emails:
+            if not renew(email):
+                continue
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email,
+                to=email.to,
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as e:
+                record_failure(email, e)
+                failed += 1
+            else:
+                email.status = 'sent'
+                email.sent_at = timezone.now()
+                email.attempts += 1
+                email.last_error = ''
+                email.save(update_fields=['status', 'sent_at', 'attempts', 'last_error'])
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def record_failure(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.status = 'failed'
+        logger.error('Giving up on outbox email %s after %s attempts: %s',
+                     email.pk, email.attempts, error)
+    else:
+        email.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(email.attempts))
+        logger.warning('Outbox email %s failed (attempt %s): %s', email.pk, email.attempts, error)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
@@ -1,3 +1,37 @@
+"""
+Tests for the email outbox's leases.
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
 from django.test import TestCase
+from django.utils import timezone
+
+from .models import OutboxEmail
+from .outbox import CLAIM_SECONDS, claim, enqueue, send_claimed
+
+
+class OutboxTests(TestCase):
+
+    def test_expired_lease_is_not_sent_twice(self):
+        for number in range(2):
+            enqueue(f'Message {number}', 'Hello', ['team@example.com'])
+        slow_worker = claim(10)
+
+        # The slow worker's lease runs out and another worker claims the rows
+        later = timezone.now() + timedelta(seconds=CLAIM_SECONDS + 1)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(send_claimed(claim(10)), (2, 0))
+
+        self.assertEqual(send_claimed(slow_worker), (0, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(OutboxEmail.objects.filter(status='pending').exists())
 
-# Create your tests here.
+    def test_lease_nobody_else_claimed_is_sent(self):
+        enqueue('Message', 'Hello', ['team@example.com'])
+        slow_worker = claim(10)
+        later = timezone.now() + timedelta(seconds=CLAIM_SECONDS + 1)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(send_claimed(slow_worker), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
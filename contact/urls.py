@@ -1,12 +1,15 @@
 # contact/urls.py
 from django.urls import path
+from core.async_views import variant
 from . import views
 
 app_name = 'contact'
 
 urlpatterns = [
-    path('', views.ContactFormView.as_view(), name='form'),
+    path('', variant(views.ContactFormView.as_view(), views.AsyncContactFormView.as_view()),
+         name='form'),
     path('success/', views.contact_success, name='success'),
     path('info/', views.contact_info, name='info'),
-    path('quick-contact/', views.quick_contact_ajax, name='quick_contact_ajax'),
+    path('quick-contact/', variant(views.quick_contact_ajax, views.aquick_contact_ajax),
+         name='quick_contact_ajax'),
 ]
\ No newline at end of file
@@ -1,12 +1,17 @@
 # apps/contact/views.py
 from django.shortcuts import render, redirect
+from django.http import JsonResponse
 from django.contrib import messages
 from django.views.generic import FormView
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 import json
+from asgiref.sync import sync_to_async
+from core.ratelimit import ratelimit
 from .forms import ContactForm, QuickContactForm
 from .models import ContactSubmission
 
+@method_decorator(ratelimit('contact_form'), name='post')
 class ContactFormView(FormView):
     template_name = 'contact/contact_form.html'
     form_class = ContactForm
@@ -78,6 +83,29 @@ class ContactFormView(FormView):
         return super().form_invalid(form)
 
 
+@method_decorator(ratelimit('contact_form'), name='post')
+class AsyncContactFormView(ContactFormView):
+    """ContactFormView for ASGI; saving the submission runs off the event loop"""
+    
+    async def get(self, request, *args, **kwargs):
+        return self.render_to_response(self.get_context_data())
+    
+    async def post(self, request, *args, **kwargs):
+        form = self.get_form()
+        if form.is_valid():
+            # The submission and its queued emails are written in one transaction
+            await sync_to_async(form.save)()
+            messages.success(
+                self.request, 
+                'Thank you for contacting us! We\'ll get back to you within 2-6 hours during business hours.'
+            )
+            return redirect(self.get_success_url())
+        return self.form_invalid(form)
+    
+    async def put(self, request, *args, **kwargs):
+        return await self.post(request, *args, **kwargs)
+
+
 def contact_success(request):
     """Success page after form submission"""
     return render(request, 'contact/success.html', {
@@ -85,8 +113,20 @@ def contact_success(request):
     })
 
 
+@ratelimit('quick_contact')
 def quick_contact_ajax(request):
     """Handle AJAX quick contact form submissions"""
+    return handle_quick_contact(request)
+
+
+@ratelimit('quick_contact')
+async def aquick_contact_ajax(request):
+    """``quick_contact_ajax`` for ASGI; queueing the email runs off the event loop"""
+    return await sync_to_async(handle_quick_contact)(request)
+
+
+def handle_quick_contact(request):
+    """Validate a quick contact submission and queue its email"""
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
@@ -0,0 +1,30 @@
+from django.contrib import admin
+from django.db.models import Sum
+from .models import ImageOptimization
+
+@admin.register(ImageOptimization)
+class ImageOptimizationAdmin(admin.ModelAdmin):
+    list_display = ['name', 'source', 'original_size', 'optimized_size', 'saved_display', 'width', 'height', 'created_at']
+    list_filter = ['source', 'created_at']
+    search_fields = ['name']
+    readonly_fields = [field.name for field in ImageOptimization._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def saved_display(self, obj):
+        if not obj.original_size:
+            return '-'
+        return f"{obj.saved_bytes / 1024:.0f} KB ({obj.saved_bytes * 100 / obj.original_size:.0f}%)"
+    saved_display.short_description = 'Saved'
+
+    def changelist_view(self, request, extra_context=None):
+        totals = ImageOptimization.objects.aggregate(
+            original=Sum('original_size'), optimized=Sum('optimized_size')
+        )
+        extra_context = extra_context or {}
+        if totals['original']:
+            extra_context['title'] = (
+                f"Image optimizations - {(totals['original'] - totals['optimized']) / 1048576:.1f} MB saved"
+            )
+        return super().changelist_view(request, extra_context=extra_context)
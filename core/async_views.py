@@ -0,0 +1,75 @@
+"""
+Async variants of the public views, for serving under ASGI.
+
+With ASYNC_VIEWS on (the ``asgi`` profile in docker-compose.yml), the
+URLconfs route home, blog_list, blog_detail, service_list, portfolio_list
+and the contact submissions to their ``a``-prefixed async variants. The page
+cache, conditional GET, rate limits, query budgets and frozen pages wrap
+them exactly as they wrap the sync views, and all middleware is async
+capable, so a request only leaves the event loop for work that blocks.
+
+Django runs a request's async ORM calls one at a time on the request's own
+sync thread. Querysets that do not depend on each other go through
+``alist`` and ``gather`` instead: each runs on a thread of a pool of
+ASYNC_QUERY_WORKERS threads, which keep their own database connections, so
+the sidebar and related-item queries of a page run at the same time and the
+event loop serves other requests meanwhile. That shortens a page by its
+database round trips; a worker already saturated by rendering gains
+nothing. Pool queries run outside the request's transaction; only
+read-only views use them. ``manage.py benchmark_servers`` compares the ASGI
+and WSGI deployments.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.shortcuts import render
+
+from .query_budget import active_inspectors, record_queries
+
+_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.ASYNC_QUERY_WORKERS), thread_name_prefix='async-query'
+)
+
+
+def variant(sync_view, async_view):
+    """The view to route: ``async_view`` when ASYNC_VIEWS is on"""
+    return async_view if settings.ASYNC_VIEWS else sync_view
+
+
+def _run_pooled(func, inspectors):
+    # Drops a pool thread's connection once it is broken or past CONN_MAX_AGE
+    close_old_connections()
+    with record_queries(inspectors):
+        return func()
+
+
+async def run_query(func):
+    """
+    Call ``func``, which queries the database, on the query pool (or on the
+    request's sync thread when ASYNC_QUERY_WORKERS is 0)
+    """
+    if not settings.ASYNC_QUERY_WORKERS:
+        return await sync_to_async(func)()
+    # The request's query budget counts pooled queries too
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor, _run_pooled, func, active_inspectors()
+    )
+
+
+async def alist(queryset):
+    """Evaluate ``queryset``, prefetches included, without blocking the event loop"""
+    return await run_query(lambda: list(queryset))
+
+
+async def gather(**awaitables):
+    """Await the keyword arguments together; returns a dict of their results"""
+    results = await asyncio.gather(*awaitables.values())
+    return dict(zip(awaitables, results))
+
+
+# Templates can still touch a lazy attribute, so they render in the
+# request's sync thread
+arender = sync_to_async(render)
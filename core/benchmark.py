@@ -0,0 +1,72 @@
+"""
+HTTP load generation for comparing deployments.
+
+``run(urls, concurrency, requests)`` requests ``urls`` round-robin from
+``concurrency`` threads and returns one ``Sample`` per response;
+``summarize`` turns them into throughput and latency percentiles (and query
+counts, for samples measured in-process by ``core.load_test``). Only the
+standard library is used, so the commands built on this module can be run
+from any checkout against any server.
+"""
+import math
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+# ``queries`` is only known for requests handled in-process
+Sample = namedtuple('Sample', 'url status seconds size headers queries', defaults=(None,))
+
+# A messages cookie makes the page cache step aside (see core.page_cache),
+# so every response is rendered by the view
+BYPASS_PAGE_CACHE = {'Cookie': 'messages='}
+
+
+def fetch(url, headers=None, timeout=30):
+    """GET ``url``; errors are samples with status 0 (or the HTTP error code)"""
+    request = urllib.request.Request(url, headers=headers or {})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            status, response_headers = response.status, dict(response.headers)
+    except urllib.error.HTTPError as error:
+        body, status, response_headers = error.read(), error.code, dict(error.headers)
+    except (urllib.error.URLError, OSError):
+        body, status, response_headers = b'', 0, {}
+    return Sample(url, status, time.perf_counter() - start, len(body), response_headers)
+
+
+def run(urls, concurrency, requests, headers=None):
+    """Request ``urls`` round-robin, ``requests`` times in all; returns (samples, seconds)"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(lambda url: fetch(url, headers), islice(cycle(urls), requests)))
+    return samples, time.perf_counter() - start
+
+
+def percentile(values, p):
+    """Nearest-rank ``p``th percentile of ``values`` (None when empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(samples, seconds):
+    """Throughput, error count, latency percentiles (in milliseconds) and queries"""
+    latencies = [sample.seconds * 1000 for sample in samples]
+    queries = [sample.queries for sample in samples if sample.queries is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if not 200 <= sample.status < 400),
+        'throughput': round(len(samples) / seconds, 1) if seconds else None,
+        **{
+            f'p{p}': round(percentile(latencies, p), 1) if latencies else None
+            for p in (50, 95, 99)
+        },
+        'queries': round(sum(queries) / len(queries), 1) if queries else None,
+        'max_queries': max(queries) if queries else None,
+    }
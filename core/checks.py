@@ -0,0 +1,24 @@
+# core/checks.py
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Written by `npm run build`; base.html loads both
+FRONTEND_ASSETS = ['dist/app.css', 'dist/alpine.min.js']
+
+
+@register(Tags.staticfiles)
+def check_frontend_assets(app_configs, **kwargs):
+    static_dir = Path(settings.BASE_DIR) / 'static'
+    missing = [name for name in FRONTEND_ASSETS if not (static_dir / name).exists()]
+    if not missing:
+        return []
+    return [
+        Warning(
+            f"Front-end assets not built: {', '.join(missing)}",
+            hint='Run `npm install && npm run build` (the Docker image builds them automatically).',
+            id='core.W001',
+        )
+    ]
@@ -0,0 +1,93 @@
+"""
+Conditional GET for detail pages.
+
+``@conditional_page(state)`` goes beneath ``@cached_page``. ``state(request,
+*args, **kwargs)`` is a cheap lookup (one query of ``updated_at`` columns)
+returning a dict of everything the page is built from, or None when the
+object does not exist. The dict gives the response its ETag, and its newest
+datetime its Last-Modified, so a client that already has the current
+version gets a 304 before the view runs its querysets or renders the
+template. Text values (names, slugs, hashes) change without any timestamp
+moving, so a state that has them gives no Last-Modified, and only the ETag
+is validated. ``on_not_modified(request, state)`` keeps side effects such as
+view counting.
+
+Rendered responses carry the validators into the page cache, which answers
+later conditional requests from the stored headers (see ``cached_page``).
+"""
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def single_row(queryset):
+    """
+    The row of a ``values()`` queryset filtered on a unique key, or None.
+    Unlike first() it adds no ORDER BY, so the lookup needs no sort.
+    """
+    try:
+        return queryset.get()
+    except queryset.model.DoesNotExist:
+        return None
+
+
+def validators(state):
+    """(Last-Modified timestamp or None, ETag) for a page's state dict"""
+    stamps = [value for value in state.values() if isinstance(value, datetime)]
+    if stamps and not any(isinstance(value, str) for value in state.values()):
+        last_modified = int(max(stamps).timestamp())
+    else:
+        last_modified = None
+    key = ';'.join(
+        f'{name}={value.isoformat() if isinstance(value, datetime) else value}'
+        for name, value in sorted(state.items())
+    )
+    return last_modified, f'"{hashlib.md5(key.encode()).hexdigest()}"'
+
+
+def conditional_page(state, on_not_modified=None):
+    """Answer If-None-Match/If-Modified-Since from ``state`` before the view runs"""
+    def check(request, *args, **kwargs):
+        """(response to send without running the view or None, validators)"""
+        if request.method not in ('GET', 'HEAD'):
+            return None, None
+        current = state(request, *args, **kwargs)
+        if current is None:
+            # Let the view raise its 404
+            return None, None
+
+        last_modified, etag = validators(current)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None and on_not_modified is not None and response.status_code == 304:
+            on_not_modified(request, current)
+        return response, (last_modified, etag)
+
+    def annotate(response, checked):
+        if checked is not None and response.status_code == 200:
+            last_modified, etag = checked
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                response, checked = await sync_to_async(check)(request, *args, **kwargs)
+                if response is not None:
+                    return response
+                return annotate(await view_func(request, *args, **kwargs), checked)
+        else:
+            @wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                response, checked = check(request, *args, **kwargs)
+                if response is not None:
+                    return response
+                return annotate(view_func(request, *args, **kwargs), checked)
+        return wrapper
+    return decorator
@@ -0,0 +1,15 @@
+import os
+import tempfile
+
+
+def write_atomic(path, content):
+    """Replace ``path`` with ``content`` atomically unless it already holds it"""
+    if path.exists() and path.read_bytes() == content:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as file:
+        file.write(content)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+    return True
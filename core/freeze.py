@@ -0,0 +1,335 @@
+"""
+Static export of the public pages.
+
+``freeze_site`` renders every URL listed in the sitemaps through the normal
+middleware and view stack and writes the HTML under FREEZE_ROOT, following
+``?cursor=`` links so paginated listings are exported too. Pages the page
+cache would not store (the contact form, which renders a CSRF token) are
+left to Django.
+
+``.manifest.json`` keeps each page's page-cache dependency tags (see
+``core.page_cache``). With FREEZE_PAGES on, saving or deleting an object
+re-renders only the pages built from it, plus any new URLs, on a background
+thread after the transaction commits, and removes pages that disappeared.
+
+Frozen pages are served to anonymous visitors by ``FrozenPageMiddleware``,
+ahead of sessions and the database, or by nginx directly::
+
+    map "$args|$cookie_sessionid$cookie_messages" $frozen_page {
+        "|"                                  index.html;
+        "~^cursor=(?<token>[A-Za-z0-9_-]+)\\|$"  cursor.$token.html;
+        default                              "-";
+    }
+    location / {
+        root /app/frozen;
+        try_files $uri$frozen_page @django;
+    }
+
+Blog posts count views when served by the middleware; nginx serving them
+itself skips the count.
+"""
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.core.handlers.base import BaseHandler
+from django.db import connection, transaction
+from django.http import FileResponse
+from django.http.request import split_domain_port, validate_host
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.module_loading import import_string
+
+from .files import write_atomic
+from .page_cache import (
+    RENDER_ENVIRON, TRACKED_APPS, instance_tag, is_cacheable_request,
+    is_cacheable_response, model_tag,
+)
+from .sitemaps import SITEMAPS
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = '.manifest.json'
+INDEX_NAME = 'index.html'
+CURSOR_QUERY_RE = re.compile(r'^cursor=([A-Za-z0-9_-]+)$')
+CURSOR_LINK_RE = re.compile(r'href="\?cursor=([A-Za-z0-9_-]+)"')
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='freeze')
+_handler = None
+
+
+def _root():
+    return Path(settings.FREEZE_ROOT)
+
+
+def public_paths():
+    """Path of every URL in the sitemaps"""
+    paths = []
+    for dotted in SITEMAPS.values():
+        sitemap = import_string(dotted)()
+        paths.extend(sitemap.location(item) for item in sitemap.items())
+    return list(dict.fromkeys(paths))
+
+
+def file_for(url):
+    """File holding the frozen ``url``, or None for URLs that are never frozen"""
+    path, _, query = url.partition('?')
+    if not path.endswith('/'):
+        return None
+    if query:
+        match = CURSOR_QUERY_RE.match(query)
+        if not match:
+            return None
+        name = f'cursor.{match.group(1)}.html'
+    else:
+        name = INDEX_NAME
+    try:
+        return Path(safe_join(settings.FREEZE_ROOT, path.lstrip('/'), name))
+    except SuspiciousFileOperation:
+        return None
+
+
+def request_host():
+    """
+    The Host header for internal requests: SITE_URL's host when ALLOWED_HOSTS
+    accepts it, so absolute URLs in the pages point at the site, or else the
+    first host ALLOWED_HOSTS names (development settings rarely list the
+    production domain)
+    """
+    netloc = urlsplit(settings.SITE_URL).netloc
+    allowed = settings.ALLOWED_HOSTS
+    if settings.DEBUG and not allowed:
+        # What Django itself accepts in that case
+        allowed = ['.localhost', '127.0.0.1', '[::1]']
+    if validate_host(split_domain_port(netloc)[0], allowed):
+        return netloc
+    for host in allowed:
+        host = host.lstrip('.')
+        if host and host != '*':
+            return host
+    return 'testserver'
+
+
+def site_request(url, **extra):
+    """A GET request for ``url`` as sent to SITE_URL, with the environ in ``extra``"""
+    return RequestFactory().get(
+        url, secure=urlsplit(settings.SITE_URL).scheme == 'https',
+        **{'HTTP_HOST': request_host(), **extra},
+    )
+
+
+def render_page(url):
+    """
+    Render ``url`` as an anonymous visitor would see it. Returns a manifest
+    entry plus the HTML under 'content' (None if the page cannot be frozen).
+    """
+    global _handler
+    if _handler is None:
+        # The full middleware stack, without the request signals a WSGI
+        # handler (or the test client) would send
+        _handler = BaseHandler()
+        _handler.load_middleware()
+
+    request = site_request(url, **{RENDER_ENVIRON: True})
+    response = _handler.get_response(request)
+    response.close()
+    frozen = response.status_code == 200 and is_cacheable_response(request, response)
+    path = url.partition('?')[0]
+    return {
+        'content': response.content if frozen else None,
+        'tags': sorted(getattr(request, '_page_cache_tags', ())),
+        'meta': getattr(request, '_page_cache_meta', {}),
+        'links': [
+            f'{path}?cursor={token}'
+            for token in dict.fromkeys(CURSOR_LINK_RE.findall(response.content.decode()))
+        ] if frozen else [],
+    }
+
+
+def load_manifest():
+    try:
+        return json.loads((_root() / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _remove(url):
+    file = file_for(url)
+    if file is not None:
+        file.unlink(missing_ok=True)
+        try:
+            # The directory of a page that no longer exists
+            file.parent.rmdir()
+        except OSError:
+            pass
+
+
+def freeze(urls, manifest, render_many, known=()):
+    """
+    Render ``urls`` and, wave by wave, the pagination pages they link to
+    that are not in ``known``; write them and update ``manifest`` in place.
+    Returns (frozen, skipped).
+    """
+    frozen = skipped = 0
+    done = set(known)
+    wave = list(dict.fromkeys(urls))
+    while wave:
+        done.update(wave)
+        links = []
+        for url, page in zip(wave, render_many(wave)):
+            content = page.pop('content')
+            file = file_for(url)
+            if content is None or file is None:
+                _remove(url)
+                skipped += 1
+            else:
+                write_atomic(file, content)
+                frozen += 1
+            manifest[url] = {**page, 'frozen': content is not None and file is not None}
+            links.extend(page['links'])
+        wave = [link for link in dict.fromkeys(links) if link not in done]
+    return frozen, skipped
+
+
+def prune(manifest, roots):
+    """Drop pages no longer reachable from ``roots``; returns how many"""
+    reachable = set()
+    stack = [url for url in roots if url in manifest]
+    while stack:
+        url = stack.pop()
+        if url not in reachable:
+            reachable.add(url)
+            stack.extend(link for link in manifest[url]['links'] if link in manifest)
+    removed = [url for url in manifest if url not in reachable]
+    for url in removed:
+        _remove(url)
+        del manifest[url]
+    return len(removed)
+
+
+def save_manifest(manifest):
+    write_atomic(_root() / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode())
+
+
+def freeze_site(render_many=None):
+    """Re-render every public page; returns (frozen, skipped, removed)"""
+    render_many = render_many or (lambda urls: map(render_page, urls))
+    manifest = load_manifest()
+    roots = public_paths()
+    frozen, skipped = freeze(roots, manifest, render_many)
+    removed = prune(manifest, roots)
+    save_manifest(manifest)
+    return frozen, skipped, removed
+
+
+def refreeze(tags):
+    """Re-render the pages built from ``tags`` and any new public URLs"""
+    manifest = load_manifest()
+    roots = public_paths()
+    # Pages that are no longer public are pruned, not rendered
+    stale = [
+        url for url, entry in manifest.items()
+        if tags.intersection(entry['tags']) and (url in roots or '?' in url)
+    ]
+    new = [url for url in roots if url not in manifest]
+    freeze(stale + new, manifest, lambda urls: map(render_page, urls),
+           known=set(manifest) - set(stale))
+    prune(manifest, roots)
+    save_manifest(manifest)
+
+
+def _refreeze_logged(tags):
+    try:
+        refreeze(tags)
+    except Exception:
+        logger.exception('Re-freezing pages failed for %s', ', '.join(sorted(tags)))
+    finally:
+        # The worker thread has its own database connection
+        connection.close()
+
+
+def schedule(instance):
+    """Re-freeze the pages built from ``instance`` after commit"""
+    if not settings.FREEZE_PAGES or instance._meta.app_label not in TRACKED_APPS:
+        return
+    tags = {instance_tag(instance), model_tag(type(instance))}
+    transaction.on_commit(lambda: _executor.submit(_refreeze_logged, tags))
+
+
+class FrozenPageMiddleware:
+    """
+    Serve frozen pages to anonymous GET/HEAD requests before sessions, URL
+    resolution or the database are involved. Goes right after WhiteNoise.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.FREEZE_PAGES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.manifest = {}
+        self.manifest_mtime = None
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def entry(self, url):
+        """Manifest entry for ``url``, re-reading the manifest when it changes"""
+        try:
+            mtime = (_root() / MANIFEST_NAME).stat().st_mtime
+        except OSError:
+            return None
+        if mtime != self.manifest_mtime:
+            self.manifest, self.manifest_mtime = load_manifest(), mtime
+        return self.manifest.get(url)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.frozen_response(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        if not is_cacheable_request(request):
+            return await self.get_response(request)
+        # File access and on_hit stay off the event loop
+        response = await sync_to_async(self.frozen_response)(request)
+        return response or await self.get_response(request)
+
+    def frozen_response(self, request):
+        """Response from the frozen page for ``request``, or None"""
+        if not is_cacheable_request(request):
+            return None
+        url = request.get_full_path()
+        entry = self.entry(url)
+        file = file_for(url) if entry and entry['frozen'] else None
+        try:
+            stat = file.stat() if file else None
+        except OSError:
+            stat = None
+        if stat is None:
+            return None
+
+        if entry['meta']:
+            # Side effects of the view, e.g. counting blog post views
+            try:
+                on_hit = getattr(resolve(request.path_info).func, 'page_cache_on_hit', None)
+            except Resolver404:
+                on_hit = None
+            if on_hit is not None:
+                on_hit(request, entry['meta'])
+
+        response = get_conditional_response(request, last_modified=int(stat.st_mtime))
+        if response is None:
+            response = FileResponse(file.open('rb'), content_type='text/html; charset=utf-8')
+            response['Last-Modified'] = http_date(stat.st_mtime)
+        response['X-Page-Cache'] = 'frozen'
+        return response
@@ -0,0 +1,234 @@
+"""
+Responsive renditions of uploaded images.
+
+Every image in IMAGE_FIELDS gets WebP (and, where Pillow can write it,
+AVIF) copies at each IMAGE_RENDITION_WIDTHS width narrower than the original,
+stored next to a JSON manifest under ``renditions/``. The manifest records
+the source file's name, size and modification time; renditions are only
+regenerated when those change. Saving an instance queues generation on a
+background thread once the transaction commits, so the admin request never
+waits for Pillow, then expires the instance's cached and frozen pages so
+they pick the renditions up. Replacing an image deletes the old file's
+renditions. ``generate_renditions`` backfills existing media with a process
+pool.
+
+``{% responsive_image %}`` (core/templatetags/images.py) reads the manifest,
+cached in the default cache, and falls back to the original file until the
+renditions exist.
+"""
+import json
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+try:
+    # AVIF support for Pillow versions that do not bundle it
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+from . import freeze
+from .page_cache import invalidate
+
+logger = logging.getLogger(__name__)
+
+# Uploaded image fields, by model label: normalized on upload (see
+# core.optimize) and given renditions
+IMAGE_FIELDS = {
+    'blog.BlogPost': ['featured_image'],
+    'portfolio.Portfolio': ['featured_image', 'client_logo'],
+    'pages.TeamMember': ['photo'],
+}
+
+RENDITION_DIR = 'renditions'
+MANIFEST_PREFIX = 'renditions:manifest:'
+# How long "no renditions yet" is cached before the manifest is looked up again
+MISSING_TIMEOUT = 300
+
+FORMATS = {'webp': 'WEBP', 'avif': 'AVIF'}
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='renditions')
+
+
+def available_formats():
+    """Configured formats this Pillow build can encode, preferred first"""
+    Image.init()
+    return [
+        fmt for fmt in settings.IMAGE_RENDITION_FORMATS
+        if FORMATS.get(fmt) in Image.SAVE
+    ]
+
+
+def manifest_name(name):
+    return posixpath.join(RENDITION_DIR, f'{name}.json')
+
+
+def rendition_name(name, width, fmt):
+    return posixpath.join(RENDITION_DIR, f'{name}.{width}w.{fmt}')
+
+
+def target_widths(original_width):
+    """Bucket widths narrower than the original, plus the original if smaller than the top bucket"""
+    widths = [width for width in settings.IMAGE_RENDITION_WIDTHS if width < original_width]
+    if original_width < max(settings.IMAGE_RENDITION_WIDTHS):
+        widths.append(original_width)
+    return widths
+
+
+def _save(storage, name, content):
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(content))
+
+
+def source_stamp(name, storage=None):
+    """Name, size and modification time of the stored image ``name``"""
+    storage = storage or default_storage
+    try:
+        modified = storage.get_modified_time(name).timestamp()
+    except NotImplementedError:
+        modified = None
+    return {'name': name, 'size': storage.size(name), 'modified': modified}
+
+
+def is_current(name, storage=None):
+    """Whether ``name`` has renditions made from the file stored now"""
+    storage = storage or default_storage
+    if not name or not storage.exists(name):
+        return False
+    manifest = read_manifest(name, storage)
+    return bool(manifest) and manifest.get('source') == source_stamp(name, storage)
+
+
+def generate(name, storage=None, force=False):
+    """
+    Write the renditions and manifest for the stored image ``name``. Returns
+    the manifest, or None if the file is missing or not an image.
+    """
+    storage = storage or default_storage
+    if not name or not storage.exists(name):
+        return None
+    stamp = source_stamp(name, storage)
+
+    if not force:
+        current = read_manifest(name, storage)
+        if current and current.get('source') == stamp:
+            return current
+
+    try:
+        with storage.open(name) as source:
+            image = ImageOps.exif_transpose(Image.open(source))
+            image.load()
+    except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+        logger.warning('Cannot make renditions of %s: %s', name, e)
+        return None
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    manifest = {
+        'width': image.width,
+        'height': image.height,
+        'source': stamp,
+        'sources': {},
+    }
+    for fmt in available_formats():
+        variants = []
+        for width in target_widths(image.width):
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            buffer = BytesIO()
+            resized.save(buffer, FORMATS[fmt], quality=settings.IMAGE_RENDITION_QUALITY)
+            variant = rendition_name(name, width, fmt)
+            _save(storage, variant, buffer.getvalue())
+            variants.append([width, variant])
+        manifest['sources'][fmt] = variants
+
+    _save(storage, manifest_name(name), json.dumps(manifest).encode())
+    cache.set(MANIFEST_PREFIX + name, manifest, None)
+    return manifest
+
+
+def read_manifest(name, storage=None):
+    storage = storage or default_storage
+    try:
+        with storage.open(manifest_name(name)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def get_manifest(name):
+    """Manifest for ``name`` from the cache, else storage; {} if there is none yet"""
+    key = MANIFEST_PREFIX + name
+    manifest = cache.get(key)
+    if manifest is None:
+        manifest = read_manifest(name) or {}
+        cache.set(key, manifest, None if manifest else MISSING_TIMEOUT)
+    return manifest
+
+
+def delete_renditions(name, storage=None):
+    storage = storage or default_storage
+    manifest = read_manifest(name, storage) or {}
+    for variants in manifest.get('sources', {}).values():
+        for _, variant in variants:
+            storage.delete(variant)
+    storage.delete(manifest_name(name))
+    cache.delete(MANIFEST_PREFIX + name)
+
+
+def image_names(instance):
+    """Stored file names of ``instance``'s rendition fields"""
+    names = []
+    for field in IMAGE_FIELDS.get(instance._meta.label, []):
+        file = getattr(instance, field)
+        if file:
+            names.append(file.name)
+    return names
+
+
+def stored_image_names(instance):
+    """File names of ``instance``'s rendition fields as saved in the database"""
+    fields = IMAGE_FIELDS.get(instance._meta.label, [])
+    if not fields or instance.pk is None:
+        return []
+    row = type(instance)._default_manager.filter(pk=instance.pk).values_list(*fields).first()
+    return [name for name in row or () if name]
+
+
+def refresh_pages(instance):
+    """Expire the cached and frozen pages showing ``instance``'s images"""
+    invalidate(instance)
+    freeze.schedule(instance)
+
+
+def _generate_logged(instance, names):
+    written = []
+    for name in names:
+        try:
+            if not is_current(name) and generate(name, force=True):
+                written.append(name)
+        except Exception:
+            logger.exception('Rendition generation failed for %s', name)
+    if written:
+        # Pages rendered meanwhile fell back to the original files
+        refresh_pages(instance)
+
+
+def schedule(instance):
+    """Generate renditions for ``instance``'s images in the background after commit"""
+    names = image_names(instance)
+    if not names:
+        return
+    if settings.IMAGE_RENDITIONS_ASYNC:
+        transaction.on_commit(lambda: _executor.submit(_generate_logged, instance, names))
+    else:
+        transaction.on_commit(lambda: _generate_logged(instance, names))
@@ -0,0 +1,252 @@
+"""
+In-process load testing of the public URLs.
+
+``endpoints()`` builds one URL for every named pattern of the public apps,
+filled in with objects from the database, plus the search, filter and
+pagination variants of the listings. ``load_test`` drives concurrent GETs
+at each endpoint in turn through the full middleware stack and records the
+latency and query count of every request (see ``core.query_budget``), or
+over HTTP against a running server when given a base URL (no query counts
+then). Results are plain dicts, saved as JSON by the ``load_test`` command
+and compared with ``compare``.
+"""
+import queue
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.db import connection
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from blog.models import BlogCategory, BlogPost, Tag
+from portfolio.models import Portfolio, PortfolioCategory
+from services.models import Service, ServiceCategory
+
+from .benchmark import BYPASS_PAGE_CACHE, Sample, fetch, summarize
+from .freeze import site_request
+from .pagination import KeysetPaginator
+from .query_budget import inspect_queries
+
+# URL namespaces served to visitors
+PUBLIC_NAMESPACES = ('pages', 'services', 'contact', 'blog', 'portfolio', 'search')
+
+# Patterns that only answer POSTs, left out of the GET load test
+POST_ONLY = {'contact:quick_contact_ajax'}
+
+# Compared between runs, with the relative change that counts as a
+# regression: 10% less throughput, a 10% slower p95, or any extra query
+COMPARED = {'throughput': -0.1, 'p95': 0.1, 'queries': 0}
+
+_handler = None
+
+
+def public_patterns():
+    """Names ("blog:detail") of every URL pattern in the public namespaces"""
+    names = []
+    for resolver in get_resolver().url_patterns:
+        if isinstance(resolver, URLResolver) and resolver.namespace in PUBLIC_NAMESPACES:
+            names.extend(
+                f'{resolver.namespace}:{pattern.name}' for pattern in resolver.url_patterns
+                if isinstance(pattern, URLPattern) and pattern.name
+            )
+    return names
+
+
+def _url(path, **query):
+    query = {name: value for name, value in query.items() if value}
+    return f'{path}?{urlencode(query)}' if query else path
+
+
+def _next_cursor(queryset, per_page, keys):
+    return KeysetPaginator(queryset, per_page, keys).page().next_cursor
+
+
+def endpoints(search_query='web'):
+    """{label: URL} for each public pattern and its search/filter variants"""
+    now = timezone.now()
+    posts = BlogPost.objects.filter(status='published', published_at__lte=now)
+    post = posts.select_related('category').order_by('-published_at').first()
+    blog_category = BlogCategory.objects.filter(is_active=True, blogpost__in=posts).first()
+    tag = Tag.objects.with_post_counts().order_by('-post_count').first()
+    services = Service.objects.filter(is_active=True)
+    service = services.first()
+    service_category = ServiceCategory.objects.filter(is_active=True).first()
+    portfolios = Portfolio.objects.filter(show_in_portfolio=True)
+    portfolio = portfolios.first()
+    portfolio_category = PortfolioCategory.objects.filter(is_active=True).first()
+
+    found = {
+        'pages:home': reverse('pages:home'),
+        'pages:about': reverse('pages:about'),
+        'pages:privacy': reverse('pages:privacy'),
+        'pages:terms': reverse('pages:terms'),
+        'services:list': reverse('services:list'),
+        'services:list?q': _url(reverse('services:list'), q=search_query),
+        'contact:form': reverse('contact:form'),
+        'contact:success': reverse('contact:success'),
+        'contact:info': reverse('contact:info'),
+        'blog:list': reverse('blog:list'),
+        'blog:list?q': _url(reverse('blog:list'), q=search_query),
+        'blog:list?cursor': _url(
+            reverse('blog:list'), cursor=_next_cursor(posts, 9, BlogPost.PAGE_KEYS)
+        ),
+        'blog:feed': reverse('blog:feed'),
+        'blog:feed_atom': reverse('blog:feed_atom'),
+        'portfolio:list': reverse('portfolio:list'),
+        'portfolio:list?q': _url(reverse('portfolio:list'), q=search_query),
+        'portfolio:list?service': _url(
+            reverse('portfolio:list'), service=Portfolio.SERVICE_TYPES[0][0]
+        ),
+        'portfolio:list?cursor': _url(
+            reverse('portfolio:list'), cursor=_next_cursor(portfolios, 12, Portfolio.PAGE_KEYS)
+        ),
+        'portfolio:feed': reverse('portfolio:feed'),
+        'portfolio:feed_atom': reverse('portfolio:feed_atom'),
+        'search:results': _url(reverse('search:results'), q=search_query),
+        'search:results?page': _url(reverse('search:results'), q=search_query, page=2),
+    }
+    if post:
+        found['blog:detail'] = post.get_absolute_url()
+    if blog_category:
+        slug = {'slug': blog_category.slug}
+        found['blog:list?category'] = _url(reverse('blog:list'), category=blog_category.slug)
+        found['blog:category'] = reverse('blog:category', kwargs=slug)
+        found['blog:category?cursor'] = _url(
+            reverse('blog:category', kwargs=slug),
+            cursor=_next_cursor(posts.filter(category=blog_category), 9, BlogPost.PAGE_KEYS),
+        )
+        found['blog:category_feed'] = reverse('blog:category_feed', kwargs=slug)
+        found['blog:category_feed_atom'] = reverse('blog:category_feed_atom', kwargs=slug)
+    if tag:
+        found['blog:tag'] = tag.get_absolute_url()
+    if service:
+        found['services:detail'] = service.get_absolute_url()
+    if service_category:
+        found['services:category'] = service_category.get_absolute_url()
+        found['services:list?category'] = _url(
+            reverse('services:list'), category=service_category.slug
+        )
+    if portfolio:
+        found['portfolio:detail'] = portfolio.get_absolute_url()
+    if portfolio_category:
+        found['portfolio:list?category'] = _url(
+            reverse('portfolio:list'), category=portfolio_category.slug
+        )
+    # Pagination variants of listings with a single page are left out
+    return {label: url for label, url in found.items() if '?' not in label or '?' in url}
+
+
+def missing_patterns(found):
+    """Public patterns ``found`` has no URL for (no objects to fill them in)"""
+    covered = {label.partition('?')[0] for label in found}
+    return [name for name in public_patterns() if name not in covered | POST_ONLY]
+
+
+def request_in_process(url, headers=None):
+    """GET ``url`` through the middleware stack, counting its queries"""
+    global _handler
+    if _handler is None:
+        _handler = BaseHandler()
+        _handler.load_middleware()
+
+    extra = {f'HTTP_{name.upper().replace("-", "_")}': value for name, value in (headers or {}).items()}
+    request = site_request(url, **extra)
+    start = time.perf_counter()
+    with inspect_queries() as inspector:
+        response = _handler.get_response(request)
+        content = b''.join(response) if response.streaming else response.content
+    seconds = time.perf_counter() - start
+    response.close()
+    return Sample(url, response.status_code, seconds, len(content), dict(response.items()),
+                  inspector.count)
+
+
+def drive(url, concurrency, requests, base_url=None, headers=None):
+    """
+    ``requests`` GETs of ``url`` from ``concurrency`` clients; returns
+    (samples, seconds). A single client runs in this thread.
+    """
+    if base_url:
+        send = lambda: fetch(base_url.rstrip('/') + url, headers)
+    else:
+        send = lambda: request_in_process(url, headers)
+    jobs = queue.SimpleQueue()
+    for _ in range(requests):
+        jobs.put(None)
+    samples = []
+
+    def client():
+        try:
+            while True:
+                try:
+                    jobs.get_nowait()
+                except queue.Empty:
+                    return
+                samples.append(send())
+        finally:
+            if concurrency > 1 and not base_url:
+                # Each client thread has its own database connection
+                connection.close()
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    else:
+        client()
+    return samples, time.perf_counter() - start
+
+
+def load_test(urls, concurrency=10, requests=100, base_url=None, page_cache=False, warmup=1):
+    """Drive each of ``urls`` ({label: URL}) in turn; returns the report dict"""
+    headers = None if page_cache else BYPASS_PAGE_CACHE
+    report = {
+        'started': timezone.now().isoformat(),
+        'options': {
+            'concurrency': concurrency,
+            'requests': requests,
+            'base_url': base_url,
+            'page_cache': page_cache,
+            'async_views': settings.ASYNC_VIEWS,
+        },
+        'endpoints': {},
+    }
+    total_requests = total_seconds = 0
+    for label, url in urls.items():
+        # Templates, connections and caches are set up outside the measurement
+        drive(url, 1, warmup, base_url, headers)
+        samples, seconds = drive(url, concurrency, requests, base_url, headers)
+        report['endpoints'][label] = {'url': url, **summarize(samples, seconds)}
+        total_requests += len(samples)
+        total_seconds += seconds
+    report['throughput'] = round(total_requests / total_seconds, 1) if total_seconds else None
+    return report
+
+
+def compare(baseline, report):
+    """
+    [(label, metric, before, after, regressed)] for the endpoints in both
+    reports; ``regressed`` is True past the thresholds in COMPARED
+    """
+    rows = []
+    for label, after in report['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(label)
+        if before is None:
+            continue
+        for metric, threshold in COMPARED.items():
+            old, new = before.get(metric), after.get(metric)
+            if old is None or new is None:
+                continue
+            if old:
+                change = (new - old) / old
+            else:
+                change = float('inf') if new > old else 0
+            regressed = change < threshold if threshold < 0 else change > threshold
+            rows.append((label, metric, old, new, regressed))
+    return rows
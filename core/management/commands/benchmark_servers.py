@@ -0,0 +1,74 @@
+# core/management/commands/benchmark_servers.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import BlogPost
+from core.benchmark import BYPASS_PAGE_CACHE, run, summarize
+
+
+class Command(BaseCommand):
+    help = 'Compares throughput and latency of running servers, e.g. WSGI against ASGI'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            action='append',
+            required=True,
+            help='name=base URL of a server to benchmark, e.g. asgi=http://localhost:8004 (repeatable)',
+        )
+        parser.add_argument(
+            '--path',
+            action='append',
+            help='Path to request (repeatable); defaults to the pages with async variants',
+        )
+        parser.add_argument('--concurrency', type=int, default=20, help='Simultaneous clients')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per target')
+        parser.add_argument(
+            '--page-cache',
+            action='store_true',
+            help='Let the page cache answer instead of rendering every response',
+        )
+
+    def default_paths(self):
+        paths = [
+            reverse('pages:home'),
+            reverse('blog:list'),
+            reverse('services:list'),
+            reverse('portfolio:list'),
+        ]
+        post = BlogPost.objects.filter(
+            status='published', published_at__lte=timezone.now()
+        ).order_by('-published_at').only('slug').first()
+        if post:
+            paths.append(post.get_absolute_url())
+        return paths
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            name, _, base = target.partition('=')
+            if not base:
+                raise CommandError(f'Expected name=URL, got {target!r}')
+            targets.append((name, base.rstrip('/')))
+        paths = options['path'] or self.default_paths()
+        headers = None if options['page_cache'] else BYPASS_PAGE_CACHE
+
+        self.stdout.write(
+            f"🚀 {options['requests']} requests per target over {len(paths)} paths, "
+            f"{options['concurrency']} at a time"
+        )
+        self.stdout.write(f"{'target':<12} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for name, base in targets:
+            # One pass to warm connections, templates and the homepage context
+            run([base + path for path in paths], 1, len(paths), headers)
+            samples, seconds = run(
+                [base + path for path in paths], options['concurrency'], options['requests'], headers
+            )
+            summary = summarize(samples, seconds)
+            self.stdout.write(
+                f"{name:<12} {summary['throughput']:>8} {summary['p50']:>8} "
+                f"{summary['p95']:>8} {summary['p99']:>8} {summary['errors']:>7}"
+            )
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark complete'))
@@ -0,0 +1,40 @@
+# core/management/commands/freeze_site.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from core.freeze import freeze_site, render_page
+
+
+class Command(BaseCommand):
+    help = 'Renders every public page to static HTML files under FREEZE_ROOT'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Number of worker processes',
+        )
+
+    def handle(self, *args, **options):
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            def render_many(urls):
+                # Workers are forked on first use; they must not share this
+                # process's DB connections
+                connections.close_all()
+                return executor.map(render_page, urls, chunksize=4)
+
+            frozen, skipped, removed = freeze_site(render_many)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'🧊 Froze {frozen} pages to {settings.FREEZE_ROOT} '
+            f'({skipped} left to Django, {removed} removed)'
+        ))
+        if not settings.FREEZE_PAGES:
+            self.stdout.write(self.style.WARNING(
+                '⚠️  FREEZE_PAGES is off: the files are not served and not kept up to date'
+            ))
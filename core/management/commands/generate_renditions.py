@@ -0,0 +1,72 @@
+# core/management/commands/generate_renditions.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connections
+from core.images import MANIFEST_PREFIX, IMAGE_FIELDS, generate, is_current, refresh_pages
+
+
+def _generate(job):
+    name, force = job
+    stale = force or not is_current(name)
+    return name, generate(name, force=stale) is not None, stale
+
+
+class Command(BaseCommand):
+    help = 'Generates responsive WebP/AVIF renditions for existing uploaded images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Number of worker processes',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate renditions that are already up to date',
+        )
+
+    def handle(self, *args, **options):
+        # Stored name -> the instances showing it
+        names = {}
+        for label, fields in IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            for field in fields:
+                for pk, name in (
+                    model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                    .values_list('pk', field)
+                ):
+                    names.setdefault(name, []).append(model(pk=pk))
+        if not names:
+            self.stdout.write('No uploaded images found')
+            return
+
+        # Workers are forked; they must not share this process's DB connections
+        connections.close_all()
+        done = failed = 0
+        refreshed = set()
+        jobs = [(name, options['force']) for name in sorted(names)]
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            for name, ok, written in executor.map(_generate, jobs):
+                if ok:
+                    done += 1
+                    if written:
+                        refreshed.update(names[name])
+                else:
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(f'⚠️  Skipped {name} (missing or unreadable)'))
+        # Workers cached the new manifests in their own process when the cache is local
+        cache.delete_many([MANIFEST_PREFIX + name for name in names])
+        # Pages rendered before now fell back to the original files
+        for instance in refreshed:
+            refresh_pages(instance)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Renditions ready for {done} images ({failed} skipped)')
+        )
@@ -0,0 +1,25 @@
+# core/management/commands/generate_sitemaps.py
+
+from django.core.management.base import BaseCommand, CommandError
+from core.sitemaps import SITEMAPS, generate
+
+
+class Command(BaseCommand):
+    help = 'Writes the gzipped, sharded sitemap files and the sitemap.xml index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'sections',
+            nargs='*',
+            help=f"Sections to regenerate (default: all of {', '.join(SITEMAPS)})",
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['sections']) - set(SITEMAPS)
+        if unknown:
+            raise CommandError(f"Unknown sitemap sections: {', '.join(sorted(unknown))}")
+
+        state = generate(options['sections'] or None)
+        for section, shards in state.items():
+            self.stdout.write(f'🗺️  {section}: {len(shards)} shard(s)')
+        self.stdout.write(self.style.SUCCESS('✅ Sitemaps written'))
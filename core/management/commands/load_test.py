@@ -0,0 +1,132 @@
+# core/management/commands/load_test.py
+
+import json
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.load_test import compare, endpoints, load_test, missing_patterns
+
+SEED_COMMANDS = (
+    'setup_services_data', 'setup_portfolio_data', 'setup_blog_data',
+    'rebuild_related', 'rebuild_search_index',
+)
+
+
+class Command(BaseCommand):
+    help = 'Load-tests every public URL and reports throughput, latency percentiles and queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            action='store_true',
+            help='Load the starter services, portfolio and blog data first',
+        )
+        parser.add_argument('--concurrency', type=int, default=10, help='Simultaneous clients')
+        parser.add_argument('--requests', type=int, default=100, help='Requests per endpoint')
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            help='Only endpoints whose label contains this, e.g. "blog:" (repeatable)',
+        )
+        parser.add_argument('--query', default='web', help='Search term for the search variants')
+        parser.add_argument(
+            '--base-url',
+            help='Send the requests to a running server instead (no query counts)',
+        )
+        parser.add_argument(
+            '--page-cache',
+            action='store_true',
+            help='Let the page cache answer instead of rendering every response',
+        )
+        parser.add_argument(
+            '--output',
+            help='JSON report path (default: loadtest/<timestamp>.json)',
+        )
+        parser.add_argument('--compare', help='Earlier JSON report to compare with')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = json.loads(Path(options['compare']).read_text())
+            except (OSError, ValueError) as error:
+                raise CommandError(f"Cannot read {options['compare']}: {error}")
+
+        if options['seed']:
+            self.stdout.write('🌱 Seeding data...')
+            for command in SEED_COMMANDS:
+                call_command(command, stdout=StringIO())
+
+        urls = endpoints(options['query'])
+        for name in missing_patterns(urls):
+            self.stdout.write(self.style.WARNING(f'⚠️  No objects to test {name} with'))
+        if options['endpoint']:
+            urls = {
+                label: url for label, url in urls.items()
+                if any(part in label for part in options['endpoint'])
+            }
+        if not urls:
+            raise CommandError('No endpoints to test')
+
+        self.stdout.write(
+            f"🚀 {options['requests']} requests to each of {len(urls)} endpoints, "
+            f"{options['concurrency']} at a time"
+        )
+        report = load_test(
+            urls,
+            concurrency=options['concurrency'],
+            requests=options['requests'],
+            base_url=options['base_url'],
+            page_cache=options['page_cache'],
+        )
+        self.write_table(report)
+
+        path = Path(options['output'] or settings.BASE_DIR / 'loadtest'
+                    / f"{timezone.now():%Y%m%d-%H%M%S}.json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+
+        failed = [
+            label for label, result in report['endpoints'].items()
+            if result['errors'] == result['requests']
+        ]
+        for label in failed:
+            self.stdout.write(self.style.ERROR(
+                f"❌ Every request to {label} failed ({report['endpoints'][label]['url']})"
+            ))
+        if not failed:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {report['throughput']} requests/s overall; report saved to {path}"
+            ))
+
+        if baseline is not None:
+            self.write_comparison(compare(baseline, report))
+        if failed:
+            raise CommandError(f'{len(failed)} endpoints answered only errors; report saved to {path}')
+
+    def write_table(self, report):
+        self.stdout.write(
+            f"{'endpoint':<28} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'queries':>8} {'errors':>7}"
+        )
+        for label, result in report['endpoints'].items():
+            line = (
+                f"{label:<28} {result['throughput']:>8} {result['p50']:>8} {result['p95']:>8} "
+                f"{result['p99']:>8} {result['queries'] if result['queries'] is not None else '-':>8} "
+                f"{result['errors']:>7}"
+            )
+            self.stdout.write(self.style.ERROR(line) if result['errors'] else line)
+
+    def write_comparison(self, rows):
+        regressions = [row for row in rows if row[4]]
+        for label, metric, before, after, _ in regressions:
+            self.stdout.write(self.style.ERROR(f'📉 {label} {metric}: {before} -> {after}'))
+        if regressions:
+            self.stdout.write(self.style.WARNING(f'⚠️  {len(regressions)} regressions against the baseline'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✅ No regressions against the baseline'))
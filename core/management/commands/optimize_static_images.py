@@ -0,0 +1,71 @@
+# core/management/commands/optimize_static_images.py
+
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.models import ImageOptimization
+from core.optimize import optimize_image
+
+EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+# Sizes of files already optimized, so re-runs do not re-encode them again
+MANIFEST = '.optimized.json'
+
+
+class Command(BaseCommand):
+    help = 'Downscales, strips metadata from and re-encodes the images in static/images (run before collectstatic)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=str(Path(settings.BASE_DIR) / 'static' / 'images'),
+            help='Directory to optimize in place',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the savings without writing any files',
+        )
+
+    def handle(self, *args, **options):
+        directory = Path(options['path'])
+        manifest_path = directory / MANIFEST
+        manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+        total_before = total_after = 0
+        for path in sorted(directory.rglob('*')):
+            if path.suffix.lower() not in EXTENSIONS or not path.is_file():
+                continue
+            name = path.relative_to(directory).as_posix()
+            size = path.stat().st_size
+            if manifest.get(name) == size:
+                continue
+
+            with path.open('rb') as file:
+                result = optimize_image(file, keep_format=True)
+            # File names are referenced from templates, so only ever shrink in place
+            if result is None or len(result.content) >= size:
+                manifest[name] = size
+                continue
+
+            after = len(result.content)
+            total_before += size
+            total_after += after
+            self.stdout.write(
+                f'🖼️  {name}: {size // 1024} KB -> {after // 1024} KB ({result.width}x{result.height})'
+            )
+            if not options['dry_run']:
+                path.write_bytes(result.content)
+                manifest[name] = after
+                ImageOptimization.objects.create(
+                    name=f'static/{name}', source='static', original_size=size,
+                    optimized_size=after, width=result.width, height=result.height,
+                )
+
+        if not options['dry_run']:
+            manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+        saved = (total_before - total_after) / 1048576
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Saved {saved:.1f} MB across optimized images')
+        )
@@ -0,0 +1,25 @@
+# core/management/commands/ratelimit_stats.py
+
+from django.core.management.base import BaseCommand
+from core.ratelimit import rejection_counts
+
+
+class Command(BaseCommand):
+    help = 'Shows how many requests each rate limit rejected recently'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help='Number of past hours to include',
+        )
+
+    def handle(self, *args, **options):
+        counts = rejection_counts(options['hours'])
+        for (scope, kind), rejected in sorted(counts.items()):
+            self.stdout.write(f'{scope:<20} {kind:<8} {rejected:>8}')
+        total = sum(counts.values())
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ {total} requests rejected in the last {options['hours']} hours")
+        )
@@ -0,0 +1,36 @@
+"""
+Migration operations shared by the apps' migrations.
+"""
+from django.db import NotSupportedError, migrations
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    ``AddIndex`` that builds the index without blocking writes on PostgreSQL
+    (CREATE INDEX CONCURRENTLY, so the migration needs ``atomic = False``)
+    and as a plain index elsewhere. Unlike
+    ``django.contrib.postgres.operations.AddIndexConcurrently`` it also runs
+    on the SQLite development database.
+    """
+
+    def describe(self):
+        return f'{super().describe()} (concurrently on PostgreSQL)'
+
+    def _concurrently(self, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return {}
+        if schema_editor.connection.in_atomic_block:
+            raise NotSupportedError(
+                'Building an index concurrently needs a migration with atomic = False'
+            )
+        return {'concurrently': True}
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, **self._concurrently(schema_editor))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, **self._concurrently(schema_editor))
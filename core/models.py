@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class ImageOptimization(models.Model):
+    """Byte savings from optimizing one uploaded or static image"""
+
+    SOURCE_CHOICES = [
+        ('upload', 'Upload'),
+        ('static', 'Static file'),
+    ]
+
+    name = models.CharField(max_length=255)
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES, default='upload')
+    original_size = models.PositiveIntegerField()
+    optimized_size = models.PositiveIntegerField()
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.name} ({self.saved_bytes} bytes saved)"
+
+    @property
+    def saved_bytes(self):
+        return self.original_size - self.optimized_size
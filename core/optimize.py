@@ -0,0 +1,107 @@
+"""
+Image optimization for uploads and for the site's own static images.
+
+``optimize_image`` downscales to IMAGE_MAX_DIMENSION, drops EXIF (camera
+details, GPS position) while keeping the colour profile, and re-encodes at
+IMAGE_QUALITY: progressive JPEG, or WebP for images with transparency or
+when IMAGE_UPLOAD_FORMAT is 'webp'. Uploads to the IMAGE_FIELDS of
+``core.images`` are replaced before they reach storage (see
+``core.signals``) and each one is recorded as an ``ImageOptimization``.
+"""
+import os
+from collections import namedtuple
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .models import ImageOptimization
+
+Optimized = namedtuple('Optimized', 'content extension width height changed')
+
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp'}
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+
+
+def optimize_image(file, keep_format=False):
+    """
+    Optimized copy of the image in ``file``, or None for files this does not
+    handle (animations, icons). ``keep_format`` keeps the original format and
+    extension, for files that are referenced by name.
+    """
+    image = Image.open(file)
+    if getattr(image, 'is_animated', False):
+        return None
+    source_format = image.format
+    had_exif = bool(image.getexif())
+
+    if keep_format:
+        target = source_format
+    elif _has_alpha(image) or settings.IMAGE_UPLOAD_FORMAT == 'webp':
+        target = 'WEBP'
+    else:
+        target = 'JPEG'
+    if target not in EXTENSIONS:
+        return None
+
+    icc_profile = image.info.get('icc_profile')
+    image = ImageOps.exif_transpose(image)
+    size = image.size
+    limit = settings.IMAGE_MAX_DIMENSION
+    image.thumbnail((limit, limit), Image.LANCZOS)
+
+    buffer = BytesIO()
+    options = {'icc_profile': icc_profile} if icc_profile else {}
+    if target == 'JPEG':
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        image.save(buffer, 'JPEG', quality=settings.IMAGE_QUALITY,
+                   optimize=True, progressive=True, **options)
+    elif target == 'WEBP':
+        image.save(buffer, 'WEBP', quality=settings.IMAGE_QUALITY, method=6, **options)
+    else:
+        image.save(buffer, 'PNG', optimize=True, **options)
+
+    changed = had_exif or image.size != size or target != source_format
+    return Optimized(buffer.getvalue(), EXTENSIONS[target], image.width, image.height, changed)
+
+
+def normalize_upload(field_file):
+    """Replace a not yet saved upload on ``field_file`` with its optimized copy"""
+    upload = field_file.file
+    upload.seek(0)
+    original_size = upload.size
+    try:
+        result = optimize_image(upload)
+    except (OSError, Image.DecompressionBombError):
+        # Left for the form's own validation to report
+        upload.seek(0)
+        return
+    upload.seek(0)
+    # Re-encoding an already small file can grow it; keep the original then
+    # unless it had to change (resized, EXIF removed, new format)
+    if result is None or (len(result.content) >= original_size and not result.changed):
+        return
+
+    name = f'{os.path.splitext(os.path.basename(field_file.name))[0]}.{result.extension}'
+    field_file.file = ContentFile(result.content, name=name)
+    field_file.name = name
+    # Recorded under the final storage name once the instance is saved
+    pending = field_file.instance.__dict__.setdefault('_image_optimizations', {})
+    pending[field_file.field.name] = (original_size, len(result.content), result.width, result.height)
+
+
+def record_optimizations(instance):
+    """Store the savings of uploads normalized while saving ``instance``"""
+    pending = instance.__dict__.pop('_image_optimizations', {})
+    ImageOptimization.objects.bulk_create([
+        ImageOptimization(
+            name=getattr(instance, field).name, original_size=original_size,
+            optimized_size=optimized_size, width=width, height=height,
+        )
+        for field, (original_size, optimized_size, width, height) in pending.items()
+    ])
@@ -0,0 +1,237 @@
+"""
+Full-page cache for anonymous traffic with per-object dependency tracking.
+
+A cached view records what its response was built from with
+``depends_on(request, post, post.category, related_posts, BlogPost)``.
+Instances become instance tags ("blog.blogpost:12") and model classes become
+model tags ("blog.blogpost"). Each tag has a version token in the cache and
+saving or deleting an object replaces the tokens of the instance and its
+model once the transaction commits (see ``core.signals``), so only entries
+built from that object (or listing its model) stop matching.
+"""
+import hashlib
+from functools import wraps
+from uuid import uuid4
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Model
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+ENTRY_PREFIX = 'pagecache:page:'
+TAG_PREFIX = 'pagecache:tag:'
+
+# Apps whose models feed the public pages
+TRACKED_APPS = {'pages', 'services', 'blog', 'portfolio'}
+
+# WSGI environ key marking internal renders (see core.freeze). Clients cannot
+# send it, so it cannot be used to get around the cache from outside.
+RENDER_ENVIRON = 'pagecache.render'
+
+
+def model_tag(model):
+    return model._meta.label_lower
+
+
+def instance_tag(obj):
+    return f'{model_tag(type(obj))}:{obj.pk}'
+
+
+def _tags_for(item):
+    if item is None:
+        return []
+    if isinstance(item, type) and issubclass(item, Model):
+        return [model_tag(item)]
+    if isinstance(item, Model):
+        return [instance_tag(item)]
+    # Querysets, lists and other iterables of instances
+    return [tag for obj in item for tag in _tags_for(obj)]
+
+
+def depends_on(request, *items):
+    """Record that the response to ``request`` is built from ``items``"""
+    tags = getattr(request, '_page_cache_tags', None)
+    if tags is not None:
+        for item in items:
+            tags.update(_tags_for(item))
+
+
+def remember(request, **meta):
+    """Store values on the cache entry, handed to ``on_hit`` when it is served"""
+    stored = getattr(request, '_page_cache_meta', None)
+    if stored is not None:
+        stored.update(meta)
+
+
+def _expire(tags):
+    token = uuid4().hex
+    cache.set_many({TAG_PREFIX + tag: token for tag in tags}, None)
+
+
+def invalidate(obj):
+    """Expire every cached page that depends on ``obj`` or lists its model"""
+    if obj._meta.app_label not in TRACKED_APPS:
+        return
+    _expire([instance_tag(obj), model_tag(type(obj))])
+
+
+def invalidate_on_commit(obj):
+    """
+    ``invalidate(obj)`` once the current transaction commits. Expiring the
+    pages earlier would let a request still reading the old rows store them
+    under the new versions.
+    """
+    if obj._meta.app_label not in TRACKED_APPS:
+        return
+    # Deleted instances lose their pk once the post_delete signals are sent
+    tags = [instance_tag(obj), model_tag(type(obj))]
+    transaction.on_commit(lambda: _expire(tags))
+
+
+def _current_versions(keys):
+    """Map tag keys to their version tokens, creating missing tokens"""
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    for key, token in missing.items():
+        # add() keeps a token another worker may have just written
+        if not cache.add(key, token, None):
+            token = cache.get(key)
+        versions[key] = token
+    return versions
+
+
+def model_version(model):
+    """Current version token of a model tag; changes whenever a row is saved"""
+    key = TAG_PREFIX + model_tag(model)
+    return _current_versions([key])[key]
+
+
+def _entry_key(request):
+    url = request.build_absolute_uri()
+    return ENTRY_PREFIX + hashlib.md5(url.encode()).hexdigest()
+
+
+def is_internal_render(request):
+    return bool(request.META.get(RENDER_ENVIRON))
+
+
+def is_cacheable_request(request):
+    """Only anonymous GET/HEAD requests without a session or pending messages"""
+    if request.method not in ('GET', 'HEAD') or is_internal_render(request):
+        return False
+    # A session cookie means a logged-in user or stored messages; a messages
+    # cookie means flash messages waiting to be shown on this page
+    if settings.SESSION_COOKIE_NAME in request.COOKIES or 'messages' in request.COOKIES:
+        return False
+    return True
+
+
+def is_cacheable_response(request, response):
+    if response.status_code != 200 or response.streaming:
+        return False
+    if response.cookies:
+        return False
+    if 'private' in response.get('Cache-Control', ''):
+        return False
+    # The page rendered {% csrf_token %}; every visitor needs their own token
+    if request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+        return False
+    messages = getattr(request, '_messages', None)
+    if messages is not None and getattr(messages, '_queued_messages', None):
+        return False
+    return True
+
+
+def _from_cache(request, entry_timeout, on_hit):
+    """
+    The cached response to ``request``, or None after setting the request up
+    to record what the view builds its response from
+    """
+    if not entry_timeout or not is_cacheable_request(request):
+        if is_internal_render(request):
+            # Rendered fresh, but still report what the page is built from
+            request._page_cache_tags = set()
+            request._page_cache_meta = {}
+        return None
+
+    entry = cache.get(_entry_key(request))
+    if entry is not None and _current_versions(entry['versions']) == entry['versions']:
+        if on_hit is not None:
+            on_hit(request, entry['meta'])
+        response = HttpResponse(entry['content'], status=entry['status'])
+        for header, value in entry['headers']:
+            response[header] = value
+        response['X-Page-Cache'] = 'hit'
+        return get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(response.get('Last-Modified', '')),
+            response=response,
+        )
+
+    request._page_cache_tags = set()
+    request._page_cache_meta = {}
+    return None
+
+
+def _store(request, response, entry_timeout):
+    """Cache the view's response to ``request`` if it can be shared"""
+    if not entry_timeout or not is_cacheable_request(request):
+        return response
+    if hasattr(response, 'render') and callable(response.render):
+        response = response.render()
+    if is_cacheable_response(request, response):
+        cache.set(_entry_key(request), {
+            'content': response.content,
+            'status': response.status_code,
+            'headers': list(response.items()),
+            'versions': _current_versions(
+                [TAG_PREFIX + tag for tag in request._page_cache_tags]
+            ),
+            'meta': request._page_cache_meta,
+        }, entry_timeout)
+        response['X-Page-Cache'] = 'miss'
+    return response
+
+
+def cached_page(view=None, *, on_hit=None, timeout=None):
+    """
+    Cache a view's responses for anonymous visitors until one of the objects
+    it declared with ``depends_on`` changes.
+
+    ``on_hit(request, meta)`` runs for responses served from the cache, so
+    side effects such as view counting still happen. A cached response that
+    carries an ETag or Last-Modified (see ``core.conditional``) answers a
+    matching conditional request with 304.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                entry_timeout = settings.PAGE_CACHE_TIMEOUT if timeout is None else timeout
+                # Cache lookups and on_hit may touch the database
+                response = await sync_to_async(_from_cache)(request, entry_timeout, on_hit)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                    response = await sync_to_async(_store)(request, response, entry_timeout)
+                return response
+        else:
+            @wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                entry_timeout = settings.PAGE_CACHE_TIMEOUT if timeout is None else timeout
+                response = _from_cache(request, entry_timeout, on_hit)
+                if response is None:
+                    response = _store(request, view_func(request, *args, **kwargs), entry_timeout)
+                return response
+
+        # Lets pages served from elsewhere (see core.freeze) run the side effects
+        wrapper.page_cache_on_hit = on_hit
+        return wrapper
+
+    if view is not None:
+        return decorator(view)
+    return decorator
@@ -0,0 +1,178 @@
+"""
+Keyset (cursor) pagination for long, date-ordered listings.
+
+A page is fetched with a WHERE clause on the ordering key of the row it
+continues from instead of an OFFSET, so page 50 costs the same as page 1.
+Cursors are opaque URL-safe tokens holding that key and a direction, and
+can be handed to templates or returned from JSON endpoints as they are.
+Totals come from ``cached_count``, which only re-counts after the model
+changes or PAGINATION_COUNT_TIMEOUT passes.
+"""
+import base64
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db.models import Q
+
+from .async_views import alist, run_query
+from .page_cache import model_version
+
+COUNT_PREFIX = 'pagination:count:'
+NEXT, PREVIOUS = 'n', 'p'
+
+
+def cached_count(queryset, key=None):
+    """
+    ``queryset.count()``, cached until a row of its model is saved or deleted.
+
+    The cache key is the query's SQL unless ``key`` is given; pass one for
+    querysets whose SQL changes on every request (e.g. ``published_at__lte=now``).
+    """
+    if key is None:
+        try:
+            key = str(queryset.query)
+        except EmptyResultSet:
+            return 0
+    digest = hashlib.md5(f'{model_version(queryset.model)}:{key}'.encode()).hexdigest()
+    cache_key = COUNT_PREFIX + digest
+    count = cache.get(cache_key)
+    if count is None:
+        count = queryset.count()
+        cache.set(cache_key, count, settings.PAGINATION_COUNT_TIMEOUT)
+    return count
+
+
+def encode_cursor(values, direction):
+    payload = json.dumps([direction, values], separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (direction, raw values), or None for a missing or garbled token"""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or not isinstance(values, list):
+        return None
+    return direction, values
+
+
+class KeysetPage:
+    """One page of results and the cursors of its neighbouring pages"""
+
+    def __init__(self, paginator, object_list, has_next, has_previous):
+        self.paginator = paginator
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return encode_cursor(self.paginator.key_of(self.object_list[-1]), NEXT)
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return encode_cursor(self.paginator.key_of(self.object_list[0]), PREVIOUS)
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` by ``keys``, a unique ordering such as
+    ``['-published_at', '-id']`` (end with the primary key to break ties).
+    ``count_key`` is passed on to ``cached_count``.
+    """
+
+    def __init__(self, queryset, per_page, keys, count_key=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.keys = keys
+        self.count_key = count_key
+        self.fields = [
+            (key.lstrip('-'), key.startswith('-'), queryset.model._meta.get_field(key.lstrip('-')))
+            for key in keys
+        ]
+
+    @property
+    def count(self):
+        return cached_count(self.queryset, self.count_key)
+
+    async def acount(self):
+        """``count`` for async views"""
+        return await run_query(lambda: cached_count(self.queryset, self.count_key))
+
+    def key_of(self, obj):
+        return [field.value_to_string(obj) for _, _, field in self.fields]
+
+    def _position(self, values):
+        if len(values) != len(self.fields):
+            raise ValidationError('Cursor does not match the ordering')
+        return [field.to_python(value) for (_, _, field), value in zip(self.fields, values)]
+
+    def _seek(self, position, forward):
+        """Rows strictly after (forward) or before ``position`` in key order"""
+        condition = Q()
+        for i, (name, descending, _) in enumerate(self.fields):
+            lookup = 'lt' if descending == forward else 'gt'
+            ties = {self.fields[j][0]: position[j] for j in range(i)}
+            condition |= Q(**ties, **{f'{name}__{lookup}': position[i]})
+        return condition
+
+    def _plan(self, cursor):
+        """(queryset of up to per_page + 1 rows, direction or None)"""
+        decoded = decode_cursor(cursor)
+        position = None
+        if decoded is not None:
+            try:
+                position = self._position(decoded[1])
+            except ValidationError:
+                position = None
+
+        limit = self.per_page + 1
+        if position is None:
+            return self.queryset.order_by(*self.keys)[:limit], None
+        if decoded[0] == NEXT:
+            return self.queryset.filter(self._seek(position, True)).order_by(*self.keys)[:limit], NEXT
+        reverse = [key[1:] if key.startswith('-') else f'-{key}' for key in self.keys]
+        return self.queryset.filter(self._seek(position, False)).order_by(*reverse)[:limit], PREVIOUS
+
+    def _page(self, rows, direction):
+        more = len(rows) > self.per_page
+        if direction == PREVIOUS:
+            return KeysetPage(self, rows[:self.per_page][::-1], True, more)
+        return KeysetPage(self, rows[:self.per_page], more, direction == NEXT)
+
+    def page(self, cursor=None):
+        """Return the page a cursor points at; invalid cursors give the first page"""
+        queryset, direction = self._plan(cursor)
+        return self._page(list(queryset), direction)
+
+    async def apage(self, cursor=None):
+        """``page()`` for async views"""
+        queryset, direction = self._plan(cursor)
+        return self._page(await alist(queryset), direction)
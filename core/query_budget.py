@@ -0,0 +1,227 @@
+"""
+Per-request query accounting with N+1 detection.
+
+``QueryBudgetMiddleware`` wraps the database connection for the request and
+records every query with its SQL shape (the statement without parameter
+values) and whether it was a lazy related-object or deferred-field load. A
+SELECT shape run QUERY_BUDGET_N_PLUS_ONE or more times is an N+1 pattern,
+e.g. a template reading ``post.author`` for each post in a list that was not
+fetched with ``select_related``.
+
+Views declare what they may cost with ``@query_budget(n)``. With
+QUERY_BUDGET_STRICT (on in DEBUG) every request is measured and a violation
+in a view that declares a budget raises ``QueryBudgetExceeded``; other
+views (the admin, third-party apps) only log it. Otherwise a sample of
+QUERY_BUDGET_SAMPLE_RATE requests is measured and logged, with violations
+at warning level. Tests use ``inspect_queries`` to check the same budgets.
+"""
+import logging
+import random
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(max_queries):
+    """Declare the most queries a view may run to render one response"""
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+def _lazy_source():
+    """'related' or 'deferred' if the current query comes from attribute access"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        # post.author / post.category on an instance loaded without select_related
+        if code.co_name == '__get__' and code.co_filename.endswith('related_descriptors.py'):
+            return 'related'
+        # A field left out by only()/defer()
+        if code.co_name == 'refresh_from_db':
+            return 'deferred'
+        frame = frame.f_back
+    return None
+
+
+class QueryInspector:
+    """``connection.execute_wrapper`` callable that records each query"""
+
+    def __init__(self):
+        self.queries = []
+        self.paused = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.paused:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'lazy': _lazy_source(),
+                'time': time.perf_counter() - start,
+            })
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    def duplicates(self):
+        """{sql shape: times run} for statements run more than once"""
+        shapes = Counter(query['sql'] for query in self.queries)
+        return {sql: times for sql, times in shapes.items() if times > 1}
+
+    def lazy_loads(self):
+        return [query for query in self.queries if query['lazy']]
+
+    def n_plus_one(self, threshold=None):
+        """{sql shape: times} for SELECTs run at least ``threshold`` times"""
+        if threshold is None:
+            threshold = settings.QUERY_BUDGET_N_PLUS_ONE
+        shapes = Counter(
+            query['sql'] for query in self.queries if query['sql'].startswith('SELECT')
+        )
+        return {sql: times for sql, times in shapes.items() if times >= threshold}
+
+    def problems(self, budget=None):
+        found = []
+        if budget is not None and self.count > budget:
+            found.append(f'{self.count} queries (budget {budget})')
+        lazy = {query['sql']: query['lazy'] for query in self.lazy_loads()}
+        for sql, times in self.n_plus_one().items():
+            source = f' ({lazy[sql]} load)' if sql in lazy else ''
+            found.append(f'N+1{source}: {times} x {sql[:200]}')
+        return found
+
+    def summary(self):
+        return {
+            'queries': self.count,
+            'time_ms': round(sum(query['time'] for query in self.queries) * 1000, 1),
+            'duplicates': sum(times - 1 for times in self.duplicates().values()),
+            'lazy_loads': len(self.lazy_loads()),
+        }
+
+
+# Inspectors of the current request, for queries it hands to other threads
+_active_inspectors = ContextVar('query_budget_inspectors', default=())
+
+
+@contextmanager
+def inspect_queries():
+    """Record the queries run on the default connection inside the block"""
+    inspector = QueryInspector()
+    active = _active_inspectors.get()
+    # Set and restored by value: an async request enters and leaves the
+    # block in different copies of its context
+    _active_inspectors.set(active + (inspector,))
+    try:
+        with connection.execute_wrapper(inspector):
+            yield inspector
+    finally:
+        _active_inspectors.set(active)
+
+
+def active_inspectors():
+    """The inspectors recording the current request's queries"""
+    return _active_inspectors.get()
+
+
+@contextmanager
+def record_queries(inspectors):
+    """Record queries run inside the block on this thread's connection with ``inspectors``"""
+    with ExitStack() as stack:
+        for inspector in inspectors:
+            stack.enter_context(connection.execute_wrapper(inspector))
+        yield
+
+
+@contextmanager
+def budget_exempt():
+    """
+    Leave queries run inside the block out of the current request's
+    accounting, for periodic background work that piggybacks on a request
+    """
+    inspectors = [
+        wrapper for wrapper in connection.execute_wrappers
+        if isinstance(wrapper, QueryInspector)
+    ]
+    for inspector in inspectors:
+        inspector.paused += 1
+    try:
+        yield
+    finally:
+        for inspector in inspectors:
+            inspector.paused -= 1
+
+
+class QueryBudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def measured(self):
+        return settings.QUERY_BUDGET_STRICT or random.random() < settings.QUERY_BUDGET_SAMPLE_RATE
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.measured():
+            return self.get_response(request)
+
+        with inspect_queries() as inspector:
+            response = self.get_response(request)
+        return self.check(request, response, inspector)
+
+    async def __acall__(self, request):
+        if not self.measured():
+            return await self.get_response(request)
+
+        # Connections belong to threads, and the request's queries run on its
+        # sync thread (see sync_to_async), not on the event loop
+        inspection = inspect_queries()
+        inspector = await sync_to_async(inspection.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(inspection.__exit__)(None, None, None)
+        return self.check(request, response, inspector)
+
+    def check(self, request, response, inspector):
+        strict = settings.QUERY_BUDGET_STRICT
+        view = getattr(request, '_query_budget_view', None)
+        budget = getattr(view, 'query_budget', None)
+        problems = inspector.problems(budget)
+        summary = inspector.summary()
+        name = getattr(view, '__qualname__', request.path)
+        # Only views that declare a budget have been written to meet it
+        if problems and strict and budget is not None:
+            raise QueryBudgetExceeded(f'{name}: ' + '; '.join(problems))
+        if problems:
+            logger.warning('Query budget exceeded in %s: %s %s', name, summary, problems)
+        else:
+            # Strict mode measures every request; only samples are worth a line
+            logger.log(logging.DEBUG if strict else logging.INFO,
+                       'Queries for %s: %s', name, summary)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget_view = view_func
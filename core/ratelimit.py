@@ -0,0 +1,189 @@
+"""
+Cache-backed token-bucket rate limiting for POST endpoints.
+
+``@ratelimit('contact_form')`` looks up RATELIMITS['contact_form'], e.g.
+``{'ip': '5/10m', 'email': '3/h', 'global': '60/m'}``: each entry is a
+bucket of N tokens refilled evenly over the period, kept per client IP, per
+submitted email address, or shared by everyone (``global``, which sheds load
+from floods spread over many addresses). A request needs a token from every
+bucket; otherwise it is answered with 429 before the view parses the form or
+touches the database.
+
+Buckets live in the default cache, so limits hold across workers when that
+is a shared backend. Updates are read-modify-write without a lock, so under
+heavy concurrency a bucket can overshoot by a request or two. Rejections
+are counted per scope, bucket and hour (see ``rejection_counts`` and the
+``ratelimit_stats`` command).
+"""
+import hashlib
+import json
+import logging
+import math
+import re
+import time
+from datetime import timedelta
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BUCKET_PREFIX = 'ratelimit:bucket:'
+COUNTER_PREFIX = 'ratelimit:rejected:'
+# Rejection counters are kept this long
+COUNTER_TIMEOUT = 7 * 24 * 3600
+
+RATE_RE = re.compile(r'^(\d+)/(\d*)([smhd])$')
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'5/10m' -> (5 tokens, 600 seconds)"""
+    match = RATE_RE.match(rate.replace(' ', ''))
+    if not match:
+        raise ValueError(f'Invalid rate {rate!r}; expected e.g. "5/m" or "20/10m"')
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * PERIODS[unit]
+
+
+def client_ip(request):
+    """
+    Address of the client. Behind a reverse proxy set RATELIMIT_IP_HEADER
+    (e.g. 'HTTP_X_FORWARDED_FOR'); the last entry is the one the proxy added.
+    """
+    header = settings.RATELIMIT_IP_HEADER
+    if header and request.META.get(header):
+        return request.META[header].split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def submitted_email(request):
+    """Email address posted as a form field or in a JSON body, lowercased"""
+    email = request.POST.get('email', '')
+    if not email and request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            email = str(data.get('email', ''))
+    return email.strip().lower()
+
+
+KEY_FUNCTIONS = {
+    'ip': client_ip,
+    'email': submitted_email,
+    'global': lambda request: 'all',
+}
+
+
+def _bucket_key(scope, kind, value):
+    digest = hashlib.md5(value.encode()).hexdigest()
+    return f'{BUCKET_PREFIX}{scope}:{kind}:{digest}'
+
+
+def check(scope, request):
+    """
+    Take a token from each of the scope's buckets that applies to
+    ``request``. Returns None if allowed, else (bucket kind, seconds until a
+    token is available); a rejected request consumes nothing.
+    """
+    limits = settings.RATELIMITS.get(scope, {})
+    buckets = {}
+    for kind, rate in limits.items():
+        value = KEY_FUNCTIONS[kind](request)
+        # No address submitted means nothing to key on
+        if value:
+            buckets[_bucket_key(scope, kind, value)] = (kind, *parse_rate(rate))
+    if not buckets:
+        return None
+
+    now = time.time()
+    stored = cache.get_many(list(buckets))
+    updated = {}
+    for key, (kind, capacity, period) in buckets.items():
+        tokens, updated_at = stored.get(key, (capacity, now))
+        refill = capacity / period
+        tokens = min(capacity, tokens + (now - updated_at) * refill)
+        if tokens < 1:
+            return kind, math.ceil((1 - tokens) / refill)
+        updated[key] = (tokens - 1, now, period)
+
+    for key, (tokens, updated_at, period) in updated.items():
+        # An untouched bucket is full again after one period
+        cache.set(key, (tokens, updated_at), period)
+    return None
+
+
+def _counter_key(scope, kind, hour):
+    return f'{COUNTER_PREFIX}{scope}:{kind}:{hour:%Y%m%d%H}'
+
+
+def record_rejection(scope, kind):
+    key = _counter_key(scope, kind, timezone.now())
+    cache.add(key, 0, COUNTER_TIMEOUT)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, COUNTER_TIMEOUT)
+
+
+def rejection_counts(hours=24):
+    """{(scope, bucket kind): rejected requests} over the last ``hours`` hours"""
+    now = timezone.now()
+    keys = {}
+    for scope, limits in settings.RATELIMITS.items():
+        for kind in limits:
+            for offset in range(hours):
+                hour = now - timedelta(hours=offset)
+                keys[_counter_key(scope, kind, hour)] = (scope, kind)
+    counts = {pair: 0 for pair in keys.values()}
+    for key, value in cache.get_many(list(keys)).items():
+        counts[keys[key]] += value
+    return counts
+
+
+def rejected_response(request, retry_after):
+    minutes = max(1, math.ceil(retry_after / 60))
+    message = f'Too many requests. Please try again in {minutes} minute{"s" if minutes != 1 else ""}.'
+    if request.content_type == 'application/json':
+        response = JsonResponse({'success': False, 'message': message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def ratelimit(scope, methods=('POST',)):
+    """Limit a view's ``methods`` requests by the buckets in RATELIMITS[scope]"""
+    def reject(request):
+        """The 429 response if ``request`` is over a limit, else None"""
+        if not settings.RATELIMIT_ENABLED or request.method not in methods:
+            return None
+        rejected = check(scope, request)
+        if rejected is None:
+            return None
+        kind, retry_after = rejected
+        record_rejection(scope, kind)
+        logger.warning('Rate limited %s by %s bucket (ip %s)',
+                       scope, kind, client_ip(request))
+        return rejected_response(request, retry_after)
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                # Cache round trips and reading the body stay off the event loop
+                response = await sync_to_async(reject)(request)
+                return response or await view_func(request, *args, **kwargs)
+        else:
+            @wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                return reject(request) or view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
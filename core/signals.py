@@ -0,0 +1,81 @@
+# core/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .freeze import schedule as schedule_refreeze
+from .images import (
+    IMAGE_FIELDS, delete_renditions, image_names, schedule, stored_image_names,
+)
+from .optimize import normalize_upload, record_optimizations
+from .page_cache import invalidate_on_commit
+from .sitemaps import schedule as schedule_sitemaps
+
+
+@receiver(post_save, dispatch_uid='page_cache_save')
+@receiver(post_delete, dispatch_uid='page_cache_delete')
+def invalidate_cached_pages(sender, instance, raw=False, **kwargs):
+    if raw:  # loaddata
+        return
+    invalidate_on_commit(instance)
+
+
+@receiver(post_save, dispatch_uid='sitemaps_save')
+@receiver(post_delete, dispatch_uid='sitemaps_delete')
+def regenerate_sitemaps(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    schedule_sitemaps(instance)
+
+
+@receiver(post_save, dispatch_uid='freeze_save')
+@receiver(post_delete, dispatch_uid='freeze_delete')
+def refreeze_pages(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    schedule_refreeze(instance)
+
+
+@receiver(pre_save, dispatch_uid='normalize_uploads')
+def normalize_uploads(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    for field in IMAGE_FIELDS.get(instance._meta.label, []):
+        file = getattr(instance, field)
+        # A new upload that has not been written to storage yet
+        if file and not file._committed:
+            normalize_upload(file)
+
+
+@receiver(pre_save, dispatch_uid='replaced_images')
+def remember_stored_images(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Compared with the saved names to find replaced images
+    instance._stored_images = stored_image_names(instance)
+
+
+@receiver(post_save, dispatch_uid='optimization_records')
+def record_image_savings(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    record_optimizations(instance)
+
+
+@receiver(post_save, dispatch_uid='renditions_save')
+def queue_renditions(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Unchanged images are skipped by the worker, not here, so the save
+    # itself never touches storage
+    schedule(instance)
+    replaced = set(getattr(instance, '_stored_images', ())) - set(image_names(instance))
+    for name in replaced:
+        transaction.on_commit(lambda name=name: delete_renditions(name))
+
+
+@receiver(post_delete, dispatch_uid='renditions_delete')
+def remove_renditions(sender, instance, **kwargs):
+    for name in image_names(instance):
+        delete_renditions(name)
@@ -0,0 +1,151 @@
+"""
+Pre-generated sitemap files.
+
+Each section's ``Sitemap`` is written as gzipped shards of at most
+SITEMAP_SHARD_SIZE URLs (``sitemaps/sitemap-blog-1.xml.gz``, ...) under
+SITEMAP_ROOT, with a ``sitemap.xml`` index listing them. SITEMAP_ROOT is
+WHITENOISE_ROOT, so WhiteNoise serves the files from the site root and
+crawlers never reach Django or the database.
+
+Saving or deleting a model regenerates only the sections listed for it in
+SECTION_MODELS, on a background thread after the transaction commits.
+Shards whose content did not change are left alone, and every file is
+replaced atomically. ``generate_sitemaps`` rewrites everything.
+"""
+import gzip
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.template.loader import render_to_string
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+
+from .files import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Section name -> Sitemap class
+SITEMAPS = {
+    'pages': 'pages.sitemaps.PagesSitemap',
+    'blog': 'blog.sitemaps.BlogSitemap',
+    'blog-categories': 'blog.sitemaps.BlogCategorySitemap',
+    'blog-tags': 'blog.sitemaps.BlogTagSitemap',
+    'services': 'services.sitemaps.ServiceSitemap',
+    'service-categories': 'services.sitemaps.ServiceCategorySitemap',
+    'portfolio': 'portfolio.sitemaps.PortfolioSitemap',
+}
+
+# Sections to regenerate when an instance of the model changes
+SECTION_MODELS = {
+    'blog.BlogPost': ['blog', 'blog-categories', 'blog-tags'],
+    'blog.BlogCategory': ['blog-categories'],
+    'blog.Tag': ['blog-tags'],
+    'services.Service': ['services'],
+    'services.ServiceCategory': ['service-categories'],
+    'portfolio.Portfolio': ['portfolio'],
+}
+
+SHARD_DIR = 'sitemaps'
+INDEX_NAME = 'sitemap.xml'
+# Shards and last modification times of every section, for the index
+STATE_NAME = 'sitemaps/sections.json'
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sitemaps')
+
+
+def _root():
+    return Path(settings.SITEMAP_ROOT)
+
+
+def _site():
+    url = urlsplit(settings.SITE_URL)
+    return url.scheme, SimpleNamespace(domain=url.netloc)
+
+
+def _gzip(text):
+    # A fixed mtime keeps unchanged shards byte-for-byte identical
+    return gzip.compress(text.encode(), mtime=0)
+
+
+def _load_state():
+    try:
+        return json.loads((_root() / STATE_NAME).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def write_section(section):
+    """Write the shards of one section; returns [(shard name, lastmod iso)]"""
+    sitemap = import_string(SITEMAPS[section])()
+    sitemap.limit = settings.SITEMAP_SHARD_SIZE
+    protocol, site = _site()
+    directory = _root() / SHARD_DIR
+
+    shards = []
+    for page in sitemap.paginator.page_range:
+        urls = sitemap.get_urls(page=page, site=site, protocol=protocol)
+        name = f'sitemap-{section}-{page}.xml.gz'
+        write_atomic(directory / name, _gzip(render_to_string('sitemap.xml', {'urlset': urls})))
+        lastmod = max((url['lastmod'] for url in urls if url.get('lastmod')), default=None)
+        shards.append((name, lastmod.isoformat() if lastmod else None))
+
+    # Shards left over from when the section was larger
+    current = {name for name, _ in shards}
+    for path in directory.glob(f'sitemap-{section}-*.xml.gz'):
+        if path.name not in current:
+            path.unlink()
+    return shards
+
+
+def write_index(state):
+    protocol, site = _site()
+    entries = [
+        {
+            'location': f'{protocol}://{site.domain}/{SHARD_DIR}/{name}',
+            'last_mod': parse_datetime(lastmod) if lastmod else None,
+        }
+        for section in SITEMAPS
+        for name, lastmod in state.get(section, [])
+    ]
+    xml = render_to_string('sitemap_index.xml', {'sitemaps': entries})
+    write_atomic(_root() / INDEX_NAME, xml.encode())
+    # Served to clients that accept gzip
+    write_atomic(_root() / f'{INDEX_NAME}.gz', _gzip(xml))
+
+
+def generate(sections=None):
+    """Regenerate ``sections`` (default: all) and the index"""
+    state = {section: shards for section, shards in _load_state().items() if section in SITEMAPS}
+    for section in sections or SITEMAPS:
+        state[section] = write_section(section)
+    # A section never written before (e.g. first run after adding one)
+    for section in SITEMAPS:
+        if section not in state:
+            state[section] = write_section(section)
+    write_atomic(_root() / STATE_NAME, json.dumps(state, indent=2).encode())
+    write_index(state)
+    return state
+
+
+def _generate_logged(sections):
+    try:
+        generate(sections)
+    except Exception:
+        logger.exception('Sitemap generation failed for %s', ', '.join(sections))
+    finally:
+        # The worker thread has its own database connection
+        connection.close()
+
+
+def schedule(instance):
+    """Regenerate the sections that list ``instance``'s model after commit"""
+    sections = SECTION_MODELS.get(instance._meta.label)
+    if not sections or not settings.SITEMAP_AUTO_REGENERATE:
+        return
+    transaction.on_commit(lambda: _executor.submit(_generate_logged, sections))
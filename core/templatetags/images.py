@@ -0,0 +1,49 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+
+from core.images import get_manifest
+
+register = template.Library()
+
+MIME_TYPES = {'webp': 'image/webp', 'avif': 'image/avif'}
+
+
+@register.simple_tag
+def responsive_image(image, alt='', sizes='100vw', loading='lazy', **attrs):
+    """
+    <picture> with AVIF/WebP srcsets for an uploaded image, falling back to
+    the original. Extra keyword arguments become <img> attributes, e.g.
+    {% responsive_image post.featured_image alt=post.title class="w-full h-48 object-cover" sizes="(min-width: 768px) 33vw, 100vw" %}
+    """
+    if not image:
+        return ''
+    manifest = get_manifest(image.name)
+
+    img_attrs = {'src': image.url, 'alt': alt, 'loading': loading, 'decoding': 'async'}
+    if manifest:
+        img_attrs['width'] = manifest['width']
+        img_attrs['height'] = manifest['height']
+    # Hero images above the fold pass loading="eager"
+    if loading == 'eager':
+        img_attrs['fetchpriority'] = 'high'
+    img_attrs.update({key.replace('_', '-'): value for key, value in attrs.items()})
+    img = format_html('<img{}>', flatatt(img_attrs))
+
+    sources = manifest.get('sources', {}) if manifest else {}
+    if not any(sources.values()):
+        return img
+    source_tags = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (
+                MIME_TYPES[fmt],
+                ', '.join(f'{default_storage.url(name)} {width}w' for width, name in variants),
+                sizes,
+            )
+            for fmt, variants in sources.items() if variants
+        ),
+    )
+    # display: contents keeps the <img> classes in charge of layout
+    return format_html('<picture style="display: contents">{}{}</picture>', source_tags, img)
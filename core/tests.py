@@ -0,0 +1,688 @@
+"""
+Query-plan and query-budget regression tests for the public pages.
+
+Each test renders a page, EXPLAINs every SELECT it ran and fails if a
+listing table is read with a full table scan, or if a query on one of them
+sorts its rows instead of reading them in index order. SQLite plans come
+from EXPLAIN QUERY PLAN; on PostgreSQL sequential scans and sorts are
+disabled first, so the plan shows whether an index can serve the query at
+all rather than what is cheapest for a handful of seeded rows.
+
+The budget tests render the same pages uncached and fail if a view runs more
+queries than its ``@query_budget`` allows or repeats a query per row.
+The feed and detail-page tests check that a client with the current
+version gets a 304 without the page being rendered, and the freeze tests
+export the site to a temporary directory and serve it back. The sitemap
+test requests every location the sitemaps list, and the rendition tests
+upload and replace an image.
+"""
+import os
+import re
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from PIL import Image
+
+from blog.models import BlogCategory, BlogPost, Tag
+from portfolio.models import Portfolio
+from search.models import RelatedItem
+from services.models import Service
+
+from blog import views as blog_views
+from blog.view_counter import (
+    FLUSH_LOCK_KEY, KEY_PREFIX as VIEW_KEY_PREFIX, flush_views, pending_views,
+    pending_views_many, record_view,
+)
+from pages import views as pages_views
+from portfolio import views as portfolio_views
+from services import views as services_views
+
+from .async_views import alist
+from .freeze import file_for, freeze_site, load_manifest, refreeze, request_host
+from .images import is_current, manifest_name
+from .load_test import compare, endpoints, load_test, missing_patterns
+from .page_cache import RENDER_ENVIRON, TAG_PREFIX, instance_tag
+from .sitemaps import SITEMAPS, _site
+from .query_budget import QueryBudgetExceeded, QueryBudgetMiddleware, inspect_queries
+
+# Pages are rendered without running collectstatic first
+UNHASHED_STATIC = {
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Tables that grow with content; lookup tables (categories, pages) are tiny
+HOT_TABLES = {'blog_blogpost', 'services_service', 'portfolio_portfolio'}
+
+# Sorts that only ever see a small, index-selected set of rows
+EXEMPT_SORTS = [
+    # Related items ordered by precomputed rank (at most search.related.TOP_K)
+    'AS "related_rank"',
+    # Tag pages, which find the tag's posts through the (tag, post) index
+    '"blog_posttag"."tag_id" = ',
+]
+
+SQLITE_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+SQLITE_SORT_RE = re.compile(r'USE TEMP B-TREE FOR (?:.* )?ORDER BY')
+FROM_RE = re.compile(r'[()]|\bFROM "(\w+)"')
+
+
+def outer_table(sql):
+    """Table in the top-level FROM clause, ignoring subqueries"""
+    depth = 0
+    for match in FROM_RE.finditer(sql):
+        token = match.group(0)
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif depth == 0:
+            return match.group(1)
+    return None
+
+
+def sqlite_problems(sql):
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        details = [row[-1] for row in cursor.fetchall()]
+    problems = []
+    for detail in details:
+        scan = SQLITE_SCAN_RE.match(detail)
+        if scan and scan.group(1) in HOT_TABLES:
+            problems.append(detail)
+        if SQLITE_SORT_RE.search(detail):
+            problems.append(detail)
+    return problems
+
+
+def postgres_problems(sql):
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute('SET LOCAL enable_sort = off')
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql)
+        plan = cursor.fetchone()[0][0]['Plan']
+    problems = []
+    nodes = [plan]
+    while nodes:
+        node = nodes.pop()
+        nodes.extend(node.get('Plans', []))
+        if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in HOT_TABLES:
+            problems.append(f"Seq Scan on {node['Relation Name']}")
+        if node['Node Type'] in ('Sort', 'Incremental Sort'):
+            problems.append(f"{node['Node Type']} by {', '.join(node.get('Sort Key', []))}")
+    return problems
+
+
+def plan_problems(sql):
+    if connection.vendor == 'postgresql':
+        return postgres_problems(sql)
+    return sqlite_problems(sql)
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0, STORAGES=UNHASHED_STATIC)
+class QueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for command in ('setup_services_data', 'setup_portfolio_data', 'setup_blog_data'):
+            call_command(command, stdout=StringIO())
+        # Enough extra posts for a second page of every blog listing
+        first = BlogPost.objects.filter(status='published').first()
+        tag = first.tag_set.first()
+        for number in range(10):
+            BlogPost.objects.create(
+                title=f'Archive post {number}', excerpt='Archive', content='Archive post',
+                category=first.category, tags=tag.name, author=first.author,
+                status='published', published_at=first.published_at,
+            )
+        call_command('rebuild_related', stdout=StringIO())
+
+    def setUp(self):
+        # Rebuild the homepage context and pagination counts on every request
+        cache.clear()
+
+    def assertIndexedPlans(self, url):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+
+        failures = []
+        for query in captured.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            problems = plan_problems(sql)
+            # Sorts only matter on the listing tables themselves
+            if outer_table(sql) not in HOT_TABLES or any(marker in sql for marker in EXEMPT_SORTS):
+                problems = [problem for problem in problems if 'SORT' not in problem.upper()
+                            and 'ORDER BY' not in problem]
+            if problems:
+                failures.append(f"{sql}\n    -> {'; '.join(problems)}")
+        if failures:
+            self.fail(f"Unindexed queries on {url}:\n" + '\n'.join(failures))
+
+    def test_homepage(self):
+        self.assertIndexedPlans('/')
+
+    def test_about(self):
+        self.assertIndexedPlans('/about/')
+
+    def test_blog_list(self):
+        self.assertIndexedPlans('/blog/')
+
+    def test_blog_list_next_page(self):
+        response = self.client.get('/blog/')
+        cursor = response.context['page_obj'].next_cursor
+        self.assertIsNotNone(cursor)
+        self.assertIndexedPlans(f'/blog/?cursor={cursor}')
+
+    def test_blog_detail(self):
+        post = BlogPost.objects.filter(status='published').first()
+        self.assertIndexedPlans(post.get_absolute_url())
+
+    def test_blog_category(self):
+        category = BlogCategory.objects.filter(blogpost__status='published').first()
+        self.assertIndexedPlans(f'/blog/category/{category.slug}/')
+
+    def test_blog_tag(self):
+        tag = Tag.objects.with_post_counts().order_by('-post_count').first()
+        self.assertIndexedPlans(tag.get_absolute_url())
+
+    def test_blog_category_next_page(self):
+        category = BlogPost.objects.filter(title__startswith='Archive').first().category
+        response = self.client.get(f'/blog/category/{category.slug}/')
+        cursor = response.context['page_obj'].next_cursor
+        self.assertIsNotNone(cursor)
+        self.assertIndexedPlans(f'/blog/category/{category.slug}/?cursor={cursor}')
+
+    def test_service_list(self):
+        self.assertIndexedPlans('/services/')
+
+    def test_service_detail(self):
+        self.assertIndexedPlans(Service.objects.filter(is_active=True).first().get_absolute_url())
+
+    def test_portfolio_list(self):
+        self.assertIndexedPlans('/portfolio/')
+
+    def test_portfolio_detail(self):
+        self.assertIndexedPlans(Portfolio.objects.filter(show_in_portfolio=True).first().get_absolute_url())
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0, QUERY_BUDGET_STRICT=False, STORAGES=UNHASHED_STATIC)
+class QueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for command in ('setup_services_data', 'setup_portfolio_data', 'setup_blog_data',
+                        'rebuild_related'):
+            call_command(command, stdout=StringIO())
+
+    def setUp(self):
+        cache.clear()
+
+    def public_urls(self):
+        post = BlogPost.objects.filter(status='published').first()
+        return [
+            '/', '/about/', '/blog/', '/blog/?q=web',
+            post.get_absolute_url(),
+            f'/blog/category/{post.category.slug}/',
+            Tag.objects.with_post_counts().first().get_absolute_url(),
+            '/services/', '/services/?q=web',
+            Service.objects.filter(is_active=True).first().get_absolute_url(),
+            '/portfolio/', '/portfolio/?q=web',
+            Portfolio.objects.filter(show_in_portfolio=True).first().get_absolute_url(),
+            '/search/?q=web',
+            '/blog/feed/',
+            f'/blog/category/{post.category.slug}/feed/atom/',
+            '/portfolio/feed/',
+        ]
+
+    def test_public_pages_within_budget(self):
+        for url in self.public_urls():
+            with self.subTest(url=url):
+                view = resolve(url.split('?')[0]).func
+                self.assertIsNotNone(getattr(view, 'query_budget', None), url)
+                with inspect_queries() as inspector:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(inspector.problems(view.query_budget), [])
+
+    def test_detects_lazy_related_loads(self):
+        with inspect_queries() as inspector:
+            [post.author.username for post in BlogPost.objects.all()]
+        problems = inspector.problems()
+        self.assertEqual(len(problems), 1)
+        self.assertIn('(related load)', problems[0])
+
+    def test_select_related_is_clean(self):
+        with inspect_queries() as inspector:
+            [post.author.username for post in BlogPost.objects.select_related('author')]
+        self.assertEqual(inspector.count, 1)
+        self.assertEqual(inspector.problems(), [])
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_strict_mode_raises(self):
+        view = resolve('/services/').func
+        budget = view.query_budget
+        try:
+            view.query_budget = 1
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/services/')
+        finally:
+            view.query_budget = budget
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_strict_mode_only_warns_without_budget(self):
+        def unbudgeted(request):
+            [post.author.username for post in BlogPost.objects.all()]
+            return HttpResponse()
+
+        request = RequestFactory().get('/admin/')
+        middleware = QueryBudgetMiddleware(unbudgeted)
+        middleware.process_view(request, unbudgeted, (), {})
+        with self.assertLogs('core.query_budget', 'WARNING'):
+            self.assertEqual(middleware(request).status_code, 200)
+
+
+@override_settings(STORAGES=UNHASHED_STATIC, SITEMAP_AUTO_REGENERATE=False, RELATED_AUTO_UPDATE=False)
+class FeedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('setup_blog_data', stdout=StringIO())
+
+    def setUp(self):
+        cache.clear()
+
+    def test_conditional_get(self):
+        response = self.client.get('/blog/feed/atom/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/atom+xml; charset=utf-8')
+
+        for header, value in (('HTTP_IF_NONE_MATCH', response['ETag']),
+                              ('HTTP_IF_MODIFIED_SINCE', response['Last-Modified'])):
+            with self.subTest(header=header), self.assertNumQueries(0):
+                self.assertEqual(self.client.get('/blog/feed/atom/', **{header: value}).status_code, 304)
+
+    def test_category_rename_replaces_etag(self):
+        etag = self.client.get('/blog/feed/')['ETag']
+        category = BlogPost.objects.filter(status='published').first().category
+        BlogCategory.objects.filter(pk=category.pk).update(name='Renamed')
+        cache.clear()
+        response = self.client.get('/blog/feed/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Renamed')
+
+    def test_content_change_replaces_etag(self):
+        etag = self.client.get('/blog/feed/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            BlogPost.objects.filter(status='published').first().save()
+        response = self.client.get('/blog/feed/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+@override_settings(STORAGES=UNHASHED_STATIC, SITEMAP_AUTO_REGENERATE=False, RELATED_AUTO_UPDATE=False)
+class ConditionalDetailTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for command in ('setup_services_data', 'setup_portfolio_data', 'setup_blog_data',
+                        'rebuild_related'):
+            call_command(command, stdout=StringIO())
+
+    def setUp(self):
+        cache.clear()
+
+    def detail_urls(self):
+        return [
+            BlogPost.objects.filter(status='published').first().get_absolute_url(),
+            Service.objects.filter(is_active=True).first().get_absolute_url(),
+            Portfolio.objects.filter(show_in_portfolio=True).first().get_absolute_url(),
+        ]
+
+    def test_not_modified(self):
+        for url in self.detail_urls():
+            etag = self.client.get(url)['ETag']
+            # From the page cache, and from the state lookup without it
+            for timeout in (None, 0):
+                with self.subTest(url=url, timeout=timeout), \
+                        self.settings(PAGE_CACHE_TIMEOUT=timeout or settings.PAGE_CACHE_TIMEOUT), \
+                        self.assertTemplateNotUsed('base.html'):
+                    self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_related_change_replaces_etag(self):
+        post = BlogPost.objects.filter(status='published').first()
+        etag = self.client.get(post.get_absolute_url())['ETag']
+        category = post.category
+        category.name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            category.save()
+        response = self.client.get(post.get_absolute_url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Renamed')
+
+    @override_settings(PAGE_CACHE_TIMEOUT=0)
+    def test_rerender_replaces_etag(self):
+        post = BlogPost.objects.filter(status='published').first()
+        response = self.client.get(post.get_absolute_url())
+        # Category names are part of the state, which no timestamp covers
+        self.assertFalse(response.has_header('Last-Modified'))
+        # What rerender_posts writes, leaving updated_at alone
+        BlogPost.objects.filter(pk=post.pk).update(content_hash='rerendered')
+        response = self.client.get(post.get_absolute_url(), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_new_post_updates_cached_next_link(self):
+        latest = BlogPost.objects.filter(status='published').latest('published_at')
+        # Fill the latest post's related list, so the new post does not
+        # invalidate its page by joining it
+        for number in range(6):
+            BlogPost.objects.create(
+                title=f'{latest.title} {number}', excerpt=latest.excerpt, content=latest.content,
+                category=latest.category, tags=latest.tags, author=latest.author,
+                status='published', published_at=latest.published_at - timedelta(days=1),
+            )
+        call_command('rebuild_related', stdout=StringIO())
+        self.assertNotContains(self.client.get(latest.get_absolute_url()), '>Next</div>')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BlogPost.objects.create(
+                title='Office hours', excerpt='Closed', content='Closed on Monday',
+                category=BlogCategory.objects.exclude(pk=latest.category_id).first(),
+                author=latest.author, status='published', published_at=timezone.now(),
+            )
+        self.assertContains(self.client.get(latest.get_absolute_url()), '>Next</div>')
+
+    def test_pages_expire_after_commit(self):
+        post = BlogPost.objects.filter(status='published').first()
+        self.client.get(post.get_absolute_url())
+        key = TAG_PREFIX + instance_tag(post)
+        version = cache.get(key)
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            post.title = 'Renamed'
+            post.save()
+            # A request reading the old row meanwhile stores it under this version
+            self.assertEqual(cache.get(key), version)
+        self.assertNotEqual(cache.get(key), version)
+        self.assertContains(self.client.get(post.get_absolute_url()), 'Renamed')
+
+    def test_replaced_neighbour_changes_etag(self):
+        post = BlogPost.objects.filter(status='published').first()
+        url = post.get_absolute_url()
+        etag = self.client.get(url)['ETag']
+        neighbours = RelatedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(BlogPost), object_id=post.pk
+        )
+        # An older post takes the place of a neighbour that is not the newest
+        newest = BlogPost.objects.filter(pk__in=neighbours.values('related_object_id')).latest('updated_at')
+        dropped = neighbours.exclude(related_object_id=newest.pk).first()
+        older = BlogPost.objects.create(
+            title='Office hours', excerpt='Closed', content='Closed on Monday',
+            category=post.category, author=post.author, status='published',
+            # Before every other post, so the previous/next links stay the same
+            published_at=BlogPost.objects.earliest('published_at').published_at - timedelta(days=1),
+        )
+        BlogPost.objects.filter(pk=older.pk).update(updated_at=newest.updated_at - timedelta(days=1))
+        neighbours.filter(pk=dropped.pk).update(related_object_id=older.pk)
+
+        cache.clear()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_settings(BLOG_VIEW_COUNT_FLUSH_INTERVAL=3600)
+    def test_not_modified_counts_view(self):
+        post = BlogPost.objects.filter(status='published').first()
+        etag = self.client.get(post.get_absolute_url())['ETag']
+        before = pending_views(post.pk)
+        self.client.get(post.get_absolute_url(), HTTP_IF_NONE_MATCH=etag)
+        with self.settings(PAGE_CACHE_TIMEOUT=0):
+            self.client.get(post.get_absolute_url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(pending_views(post.pk), before + 2)
+
+    @override_settings(BLOG_VIEW_COUNT_FLUSH_INTERVAL=3600)
+    def test_flush_command_takes_the_flush_lock(self):
+        post = BlogPost.objects.filter(status='published').first()
+        record_view(post.pk)  # Flushes and takes the lock for the interval
+        record_view(post.pk)
+        call_command('flush_view_counts', stdout=StringIO())
+        self.assertEqual(pending_views(post.pk), 1)
+
+        cache.delete(FLUSH_LOCK_KEY)
+        call_command('flush_view_counts', stdout=StringIO())
+        self.assertEqual(pending_views(post.pk), 0)
+
+    def test_negative_view_counter_is_ignored(self):
+        post = BlogPost.objects.filter(status='published').first()
+        # What a counter drained by two racing flushes is left with
+        cache.set(f'{VIEW_KEY_PREFIX}{post.pk}', -2, None)
+        self.assertEqual(pending_views(post.pk), 0)
+        self.assertEqual(pending_views_many([post.pk]), {})
+        self.assertEqual(flush_views([post.pk]), 0)
+        self.assertEqual(BlogPost.objects.get(pk=post.pk).view_count, post.view_count)
+
+
+@override_settings(STORAGES=UNHASHED_STATIC, SITE_URL='http://testserver')
+class SitemapTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for command in ('setup_services_data', 'setup_portfolio_data', 'setup_blog_data'):
+            call_command(command, stdout=StringIO())
+
+    def test_every_location_renders(self):
+        protocol, site = _site()
+        for section, path in SITEMAPS.items():
+            for url in import_string(path)().get_urls(site=site, protocol=protocol):
+                location = urlsplit(url['location']).path
+                with self.subTest(section=section, location=location):
+                    self.assertEqual(self.client.get(location).status_code, 200)
+
+
+@override_settings(STORAGES=UNHASHED_STATIC, FREEZE_PAGES=True, SITE_URL='http://testserver')
+class FreezeTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for command in ('setup_services_data', 'setup_portfolio_data', 'setup_blog_data'):
+            call_command(command, stdout=StringIO())
+
+    def setUp(self):
+        cache.clear()
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.enterContext(self.settings(FREEZE_ROOT=root.name))
+
+    def test_freeze_and_serve(self):
+        freeze_site()
+        manifest = load_manifest()
+        post = BlogPost.objects.filter(status='published').first()
+        self.assertTrue(manifest[post.get_absolute_url()]['frozen'])
+        self.assertIn(f'blog.blogpost:{post.pk}', manifest[post.get_absolute_url()]['tags'])
+        # Renders a CSRF token
+        self.assertFalse(manifest['/contact/']['frozen'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/services/')
+        self.assertEqual(response['X-Page-Cache'], 'frozen')
+        self.assertNotEqual(self.client.get('/services/?q=web').get('X-Page-Cache'), 'frozen')
+
+    def test_unpublished_post_is_removed(self):
+        freeze_site()
+        post = BlogPost.objects.filter(status='published').first()
+        self.assertTrue(file_for(post.get_absolute_url()).exists())
+        post.status = 'draft'
+        post.save()
+        # What the post_save receiver schedules after commit
+        refreeze({f'blog.blogpost:{post.pk}', 'blog.blogpost'})
+        self.assertFalse(file_for(post.get_absolute_url()).exists())
+        self.assertNotIn(post.get_absolute_url(), load_manifest())
+
+
+@override_settings(STORAGES=UNHASHED_STATIC, SITEMAP_AUTO_REGENERATE=False, RELATED_AUTO_UPDATE=False)
+class AsyncViewTests(TransactionTestCase):
+    # The query pool's threads have their own connections, so the data has
+    # to be committed for them to see it
+
+    def setUp(self):
+        for command in ('setup_services_data', 'setup_portfolio_data', 'setup_blog_data',
+                        'rebuild_related'):
+            call_command(command, stdout=StringIO())
+        cache.clear()
+
+    def request(self, url):
+        # Marked as an internal render: not cached and not counted as a visit
+        request = RequestFactory().get(url, **{RENDER_ENVIRON: True})
+        request.user = AnonymousUser()
+        return request
+
+    def test_same_pages_as_sync_views(self):
+        post = BlogPost.objects.filter(status='published').first()
+        cases = [
+            ('/', pages_views.home, pages_views.ahome, {}),
+            ('/blog/', blog_views.blog_list, blog_views.ablog_list, {}),
+            ('/blog/?q=web', blog_views.blog_list, blog_views.ablog_list, {}),
+            (f'/blog/?category={post.category.slug}', blog_views.blog_list, blog_views.ablog_list, {}),
+            (post.get_absolute_url(), blog_views.blog_detail, blog_views.ablog_detail,
+             {'slug': post.slug}),
+            ('/services/?q=web', services_views.service_list, services_views.aservice_list, {}),
+            ('/portfolio/', portfolio_views.portfolio_list, portfolio_views.aportfolio_list, {}),
+        ]
+        for url, view, async_view, kwargs in cases:
+            with self.subTest(url=url):
+                expected = view(self.request(url), **kwargs)
+                response = async_to_sync(async_view)(self.request(url), **kwargs)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content.decode(), expected.content.decode())
+
+    def test_not_modified(self):
+        post = BlogPost.objects.filter(status='published').first()
+        etag = blog_views.blog_detail(self.request(post.get_absolute_url()), slug=post.slug)['ETag']
+        request = self.request(post.get_absolute_url())
+        request.META['HTTP_IF_NONE_MATCH'] = etag
+        response = async_to_sync(blog_views.ablog_detail)(request, slug=post.slug)
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_budget_counts_pooled_queries(self):
+        async def view(request):
+            # One query on the pool, one on the request's thread
+            await alist(BlogPost.objects.all())
+            await BlogPost.objects.acount()
+            return HttpResponse()
+        view.query_budget = 1
+
+        middleware = QueryBudgetMiddleware(view)
+        request = self.request('/')
+        request._query_budget_view = view
+        with self.assertRaisesRegex(QueryBudgetExceeded, '2 queries'):
+            async_to_sync(middleware)(request)
+
+
+# SITE_URL's host is not in ALLOWED_HOSTS here, as in development
+@override_settings(STORAGES=UNHASHED_STATIC, QUERY_BUDGET_STRICT=False)
+class LoadTestTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for command in ('setup_services_data', 'setup_portfolio_data', 'setup_blog_data',
+                        'rebuild_related'):
+            call_command(command, stdout=StringIO())
+
+    def setUp(self):
+        cache.clear()
+
+    def test_covers_every_public_pattern(self):
+        urls = endpoints()
+        self.assertEqual(missing_patterns(urls), [])
+        self.assertIn('blog:list?q', urls)
+        self.assertIn('blog:list?category', urls)
+
+    def test_report(self):
+        urls = {label: url for label, url in endpoints().items()
+                if label in ('blog:list', 'services:detail')}
+        report = load_test(urls, concurrency=1, requests=3)
+        for label in urls:
+            with self.subTest(label=label):
+                result = report['endpoints'][label]
+                self.assertEqual((result['requests'], result['errors']), (3, 0))
+                self.assertGreater(result['queries'], 0)
+                self.assertLessEqual(result['p50'], result['p99'])
+
+        baseline = {'endpoints': {'blog:list': {**report['endpoints']['blog:list'], 'queries': 0}}}
+        self.assertIn(('blog:list', 'queries', 0, report['endpoints']['blog:list']['queries'], True),
+                      compare(baseline, report))
+
+    def test_request_host(self):
+        with self.settings(SITE_URL='https://example.com', ALLOWED_HOSTS=['.example.com']):
+            self.assertEqual(request_host(), 'example.com')
+        with self.settings(SITE_URL='https://example.com', ALLOWED_HOSTS=['.example.org']):
+            self.assertEqual(request_host(), 'example.org')
+        with self.settings(ALLOWED_HOSTS=[], DEBUG=True):
+            self.assertEqual(request_host(), 'localhost')
+
+    def test_command_fails_when_an_endpoint_only_errors(self):
+        # Every request gets a 400 for its Host header
+        with mock.patch('core.freeze.request_host', return_value='unlisted.example'), \
+                tempfile.TemporaryDirectory() as root, self.assertRaises(CommandError):
+            call_command('load_test', endpoint=['pages:home'], requests=1, concurrency=1,
+                         output=f'{root}/report.json', stdout=StringIO())
+
+
+@override_settings(IMAGE_RENDITIONS_ASYNC=False, IMAGE_RENDITION_FORMATS=['webp'],
+                   SITEMAP_AUTO_REGENERATE=False, RELATED_AUTO_UPDATE=False)
+class RenditionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('setup_blog_data', stdout=StringIO())
+
+    def setUp(self):
+        cache.clear()
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.enterContext(self.settings(MEDIA_ROOT=root.name))
+
+    def upload(self, post, colour):
+        buffer = BytesIO()
+        Image.new('RGB', (700, 400), colour).save(buffer, 'JPEG')
+        post.featured_image = SimpleUploadedFile('cover.jpg', buffer.getvalue())
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        return post.featured_image.name
+
+    def test_replaced_image(self):
+        post = BlogPost.objects.first()
+        with mock.patch('core.images.refresh_pages') as refresh_pages:
+            first = self.upload(post, 'red')
+        # Pages rendered before the renditions existed are expired
+        refresh_pages.assert_called_once_with(post)
+        self.assertTrue(is_current(first))
+
+        second = self.upload(post, 'blue')
+        self.assertTrue(is_current(second))
+        self.assertFalse(default_storage.exists(manifest_name(first)))
+
+    def test_touched_image_is_stale(self):
+        name = self.upload(BlogPost.objects.first(), 'red')
+        path = default_storage.path(name)
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 60))
+        self.assertFalse(is_current(name))
@@ -38,11 +38,13 @@ THIRD_PARTY_APPS = [
 ]
 
 LOCAL_APPS = [
+    'core',
     'pages',
     'services',
     'contact',
     'blog',
     'portfolio',
+    'search',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -50,6 +52,8 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.freeze.FrozenPageMiddleware',
+    'core.query_budget.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -90,10 +94,61 @@ DATABASES = {
         'PORT': env('DB_PORT'),
         'OPTIONS': {
             'sslmode': 'disable',
-        }
+        },
+        # Connections are kept between requests (and between the async query
+        # pool's queries, see core.async_views) instead of opened for each;
+        # a broken one is noticed before it is reused
+        'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=60),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Cache - use a shared backend (e.g. rediscache://) in production so that
+# signal-driven invalidation reaches every worker
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Full-page cache lifetime in seconds for anonymous visitors (0 disables it);
+# entries are also expired whenever an object they were built from is saved
+PAGE_CACHE_TIMEOUT = env.int('PAGE_CACHE_TIMEOUT', default=60 * 60)
+
+# Homepage context cache lifetime in seconds (rebuilt on content changes)
+HOMEPAGE_CACHE_TIMEOUT = env.int('HOMEPAGE_CACHE_TIMEOUT', default=60 * 60 * 24)
+
+# Listing totals are cached until the model changes, and at most this long
+# (scheduled posts only appear in the count once it expires)
+PAGINATION_COUNT_TIMEOUT = env.int('PAGINATION_COUNT_TIMEOUT', default=60 * 5)
+
+# Rate limits for POST endpoints (core.ratelimit): token buckets of
+# "N/period" per client IP, per submitted email and shared by all clients.
+# Behind a reverse proxy set RATELIMIT_IP_HEADER=HTTP_X_FORWARDED_FOR
+RATELIMIT_ENABLED = env.bool('RATELIMIT_ENABLED', default=True)
+RATELIMIT_IP_HEADER = env('RATELIMIT_IP_HEADER', default=None)
+RATELIMITS = {
+    'contact_form': {'ip': '5/10m', 'email': '3/h', 'global': '60/m'},
+    'quick_contact': {'ip': '5/10m', 'email': '3/h', 'global': '60/m'},
+}
+
+# Query budgets (core.query_budget): in DEBUG every request is checked, and
+# N+1 patterns or exceeded budgets raise in views with a @query_budget (and
+# are logged elsewhere); in production a sample of requests is measured and
+# logged
+QUERY_BUDGET_STRICT = env.bool('QUERY_BUDGET_STRICT', default=DEBUG)
+QUERY_BUDGET_SAMPLE_RATE = env.float('QUERY_BUDGET_SAMPLE_RATE', default=0.01)
+QUERY_BUDGET_N_PLUS_ONE = env.int('QUERY_BUDGET_N_PLUS_ONE', default=3)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.query_budget': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'Africa/Nairobi'
@@ -110,14 +165,70 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Hashed, compressed file names so static assets can be cached forever
+# (STATICFILES_STORAGE is no longer read by Django 5.1+)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 WHITENOISE_USE_FINDERS = True
 WHITENOISE_AUTOREFRESH = True
 
+# Public URL of the site, for links built outside a request (sitemaps, emails)
+SITE_URL = env('SITE_URL', default='https://www.digital.fayvad.com')
+
+# Sitemaps (core.sitemaps) are written as gzipped shards of at most
+# SITEMAP_SHARD_SIZE URLs to SITEMAP_ROOT, which WhiteNoise serves from the
+# site root (autorefresh picks up regenerated files); saving content
+# regenerates the affected sections unless SITEMAP_AUTO_REGENERATE is off
+SITEMAP_ROOT = BASE_DIR / 'public'
+SITEMAP_SHARD_SIZE = env.int('SITEMAP_SHARD_SIZE', default=10000)
+SITEMAP_AUTO_REGENERATE = env.bool('SITEMAP_AUTO_REGENERATE', default=True)
+WHITENOISE_ROOT = SITEMAP_ROOT
+WHITENOISE_MIMETYPES = {'.gz': 'application/gzip'}
+
+# Related items (search.related): saving content refreshes the affected
+# lists on a background thread unless RELATED_AUTO_UPDATE is off
+RELATED_AUTO_UPDATE = env.bool('RELATED_AUTO_UPDATE', default=True)
+
+# Static export (core.freeze): freeze_site writes the public pages to
+# FREEZE_ROOT. With FREEZE_PAGES on, anonymous visitors are served those
+# files (by FrozenPageMiddleware, or nginx) and saving content re-freezes
+# the pages built from it
+FREEZE_ROOT = env('FREEZE_ROOT', default=str(BASE_DIR / 'frozen'))
+FREEZE_PAGES = env.bool('FREEZE_PAGES', default=False)
+
+# Route the busiest public views and the contact submissions to their async
+# variants (core.async_views). Only worth it when served by an ASGI server,
+# e.g. the asgi profile in docker-compose.yml
+ASYNC_VIEWS = env.bool('ASYNC_VIEWS', default=False)
+# Threads (each with its own database connection, per worker process) that
+# run the async views' independent queries at the same time; 0 runs them
+# one after another on the request's thread
+ASYNC_QUERY_WORKERS = env.int('ASYNC_QUERY_WORKERS', default=4)
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploaded images (core.optimize) are downscaled to fit IMAGE_MAX_DIMENSION,
+# stripped of EXIF and re-encoded as progressive JPEG (or WebP) at IMAGE_QUALITY
+IMAGE_MAX_DIMENSION = env.int('IMAGE_MAX_DIMENSION', default=2400)
+IMAGE_QUALITY = env.int('IMAGE_QUALITY', default=82)
+IMAGE_UPLOAD_FORMAT = env('IMAGE_UPLOAD_FORMAT', default='jpeg')
+
+# Responsive image renditions (core.images) - widths generated for uploaded
+# images, formats in order of preference (AVIF needs Pillow with AVIF
+# support) and encoder quality
+IMAGE_RENDITION_WIDTHS = [320, 640, 960, 1280, 1920]
+IMAGE_RENDITION_FORMATS = ['avif', 'webp']
+IMAGE_RENDITION_QUALITY = env.int('IMAGE_RENDITION_QUALITY', default=80)
+IMAGE_RENDITIONS_ASYNC = env.bool('IMAGE_RENDITIONS_ASYNC', default=True)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -129,6 +240,8 @@ CRISPY_TEMPLATE_PACK = "tailwind"
 EMAIL_BACKEND = env('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
 DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='services@digital.fayvad.com')
 CONTACT_EMAIL = env('CONTACT_EMAIL', default='services@digital.fayvad.com')
+# Seconds an SMTP call may block, well under the outbox's per-email lease
+EMAIL_TIMEOUT = env.int('EMAIL_TIMEOUT', default=30)
 
 if not DEBUG:
     # Production email settings
@@ -139,6 +252,20 @@ if not DEBUG:
     EMAIL_HOST_USER = env('EMAIL_HOST_USER')
     EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD')
 
+# Email outbox (contact.outbox) - emails per batch, and the backoff between
+# retries of a failed send: OUTBOX_RETRY_DELAY seconds, doubling each time up
+# to OUTBOX_MAX_RETRY_DELAY, until OUTBOX_MAX_ATTEMPTS attempts have failed
+OUTBOX_BATCH_SIZE = env.int('OUTBOX_BATCH_SIZE', default=50)
+OUTBOX_RETRY_DELAY = env.int('OUTBOX_RETRY_DELAY', default=60)
+OUTBOX_MAX_RETRY_DELAY = env.int('OUTBOX_MAX_RETRY_DELAY', default=3600)
+OUTBOX_MAX_ATTEMPTS = env.int('OUTBOX_MAX_ATTEMPTS', default=10)
+
+# Newsletter campaigns (contact.campaigns) - parallel SMTP connections, total
+# messages per second across them (0 for no limit) and subscribers per batch
+NEWSLETTER_WORKERS = env.int('NEWSLETTER_WORKERS', default=4)
+NEWSLETTER_RATE = env.float('NEWSLETTER_RATE', default=10)
+NEWSLETTER_CHUNK_SIZE = env.int('NEWSLETTER_CHUNK_SIZE', default=500)
+
 # Security settings for production
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
@@ -165,6 +292,9 @@ CSRF_TRUSTED_ORIGINS = env.list('CSRF_TRUSTED_ORIGINS', default=[
     'https://www.digital.fayvad.com',
 ])
 
+# Blog view counter - seconds between batched writes of buffered page views
+BLOG_VIEW_COUNT_FLUSH_INTERVAL = env.int('BLOG_VIEW_COUNT_FLUSH_INTERVAL', default=60)
+
 # CKEditor configuration
 CKEDITOR_CONFIGS = {
     'default': {
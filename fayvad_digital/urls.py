@@ -3,14 +3,6 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib.sitemaps.views import sitemap
-from pages.sitemaps import PagesSitemap
-from blog.sitemaps import BlogSitemap
-
-sitemaps = {
-    'pages': PagesSitemap,
-    'blog': BlogSitemap,
-}
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -19,8 +11,8 @@ urlpatterns = [
     path('contact/', include('contact.urls')),
     path('blog/', include('blog.urls')),
     path('portfolio/', include('portfolio.urls')),
-    path('sitemap.xml', sitemap, {'sitemaps': sitemaps},
-         name='django.contrib.sitemaps.views.sitemap'),
+    path('search/', include('search.urls')),
+    # sitemap.xml is a pre-generated file served by WhiteNoise (core.sitemaps)
 ]
 
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
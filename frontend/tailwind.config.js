@@ -0,0 +1,25 @@
+// Classes are collected from the templates and from the Python code that
+// renders markup (form widgets, template tags); anything else is purged.
+/** @type {import('tailwindcss').Config} */
+module.exports = {
+  content: [
+    './templates/**/*.html',
+    './*/templates/**/*.html',
+    './*/*.py',
+    './*/templatetags/*.py',
+  ],
+  theme: {
+    extend: {
+      colors: {
+        fayvad: {
+          navy: '#1B365D',
+          'navy-light': '#2C4A6B',
+          gold: '#D4AF37',
+          'gold-light': '#E6C86B',
+          teal: '#0EA5E9',
+        },
+      },
+    },
+  },
+  plugins: [],
+};
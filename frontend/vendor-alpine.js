@@ -0,0 +1,10 @@
+// Copies the pinned Alpine.js build from node_modules into static/dist
+const fs = require('fs');
+const path = require('path');
+
+const source = require.resolve('alpinejs/dist/cdn.min.js');
+const target = path.join(__dirname, '..', 'static', 'dist', 'alpine.min.js');
+
+fs.mkdirSync(path.dirname(target), { recursive: true });
+fs.copyFileSync(source, target);
+console.log(`Vendored Alpine.js ${require('alpinejs/package.json').version} -> ${path.relative(process.cwd(), target)}`);
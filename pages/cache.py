@@ -0,0 +1,106 @@
+"""
+Cached homepage context.
+
+The homepage content only changes when an editor saves a HomePage, Service,
+Portfolio, BlogPost or BlogCategory, so the context is built once, kept in the cache and
+rebuilt by signals after each change (see ``pages.signals``).
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from blog.models import BlogPost
+from portfolio.models import Portfolio
+from core.async_views import alist, gather
+from services.models import Service
+from .models import HomePage
+
+HOME_CONTEXT_KEY = 'pages:home:context'
+
+DEFAULT_STATS = [
+    {'number': '500+', 'label': 'SMEs Digitized'},
+    {'number': '50+', 'label': 'SACCOs Served'},
+    {'number': '98%', 'label': 'Client Satisfaction'},
+    {'number': '24/7', 'label': 'Expert Support'},
+]
+
+
+def home_querysets():
+    """The homepage's querysets, unevaluated"""
+    return {
+        'homepage': HomePage.objects.filter(is_active=True).order_by('pk')[:1],
+        # Featured services (top 3)
+        'featured_services': Service.objects.cards().filter(
+            is_active=True,
+            is_featured=True
+        ).order_by('order', 'name')[:3],
+        # Featured portfolio items, newest first (Meta.ordering, which the
+        # portfolio_public_idx index serves)
+        'featured_portfolio': Portfolio.objects.cards().filter(
+            show_in_portfolio=True,
+            featured=True
+        )[:3],
+        # Latest blog posts
+        'latest_blog_posts': BlogPost.objects.cards().filter(
+            status='published'
+        ).order_by('-published_at')[:3],
+    }
+
+
+def _home_context(results):
+    """Context dict from the evaluated ``home_querysets()``"""
+    homepage = results['homepage'][0] if results['homepage'] else None
+    
+    # Stats - use from homepage model or defaults
+    if homepage:
+        stats = [
+            {'number': homepage.stat_1_number, 'label': homepage.stat_1_label},
+            {'number': homepage.stat_2_number, 'label': homepage.stat_2_label},
+            {'number': homepage.stat_3_number, 'label': homepage.stat_3_label},
+            {'number': homepage.stat_4_number, 'label': homepage.stat_4_label},
+        ]
+    else:
+        stats = DEFAULT_STATS
+    
+    return {**results, 'homepage': homepage, 'stats': stats}
+
+
+def build_home_context():
+    """Run the homepage queries and return a fully evaluated context dict"""
+    return _home_context({
+        name: list(queryset) for name, queryset in home_querysets().items()
+    })
+
+
+async def abuild_home_context():
+    """``build_home_context()`` for async views"""
+    return _home_context(await gather(**{
+        name: alist(queryset) for name, queryset in home_querysets().items()
+    }))
+
+
+def get_home_context():
+    """Return the cached homepage context, building it on a miss"""
+    context = cache.get(HOME_CONTEXT_KEY)
+    if context is None:
+        context = warm_home_context()
+    return context
+
+
+async def aget_home_context():
+    """``get_home_context()`` for async views"""
+    context = await cache.aget(HOME_CONTEXT_KEY)
+    if context is None:
+        context = await abuild_home_context()
+        await cache.aset(HOME_CONTEXT_KEY, context, settings.HOMEPAGE_CACHE_TIMEOUT)
+    return context
+
+
+def warm_home_context():
+    """Rebuild the homepage context and store it in the cache"""
+    context = build_home_context()
+    cache.set(HOME_CONTEXT_KEY, context, settings.HOMEPAGE_CACHE_TIMEOUT)
+    return context
+
+
+def invalidate_home_context():
+    cache.delete(HOME_CONTEXT_KEY)
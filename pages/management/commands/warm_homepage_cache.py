@@ -0,0 +1,14 @@
+# pages/management/commands/warm_homepage_cache.py
+
+from django.core.management.base import BaseCommand
+from pages.cache import warm_home_context
+
+
+class Command(BaseCommand):
+    help = 'Builds the cached homepage context (run after each deploy)'
+
+    def handle(self, *args, **options):
+        warm_home_context()
+        self.stdout.write(
+            self.style.SUCCESS('✅ Homepage cache warmed')
+        )
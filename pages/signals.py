@@ -0,0 +1,25 @@
+# pages/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from blog.models import BlogCategory, BlogPost
+from portfolio.models import Portfolio
+from services.models import Service
+from .cache import invalidate_home_context, warm_home_context
+from .models import HomePage
+
+HOMEPAGE_MODELS = [HomePage, Service, Portfolio, BlogPost, BlogCategory]
+
+
+def refresh_home_context(sender, raw=False, **kwargs):
+    if raw:  # loaddata
+        return
+    invalidate_home_context()
+    # Rebuild once the change is committed so visitors never pay for the miss
+    transaction.on_commit(warm_home_context)
+
+
+for model in HOMEPAGE_MODELS:
+    post_save.connect(refresh_home_context, sender=model, dispatch_uid=f'home_save_{model._meta.label}')
+    post_delete.connect(refresh_home_context, sender=model, dispatch_uid=f'home_delete_{model._meta.label}')
@@ -6,7 +6,11 @@ class PagesSitemap(Sitemap):
     priority = 0.8
 
     def items(self):
-        return ['home', 'about', 'contact', 'services']
+        # pages:privacy and pages:terms have no templates yet
+        return [
+            'pages:home', 'pages:about', 'services:list', 'portfolio:list',
+            'blog:list', 'contact:form',
+        ]
 
     def location(self, item):
-        return reverse(item)
\ No newline at end of file
+        return reverse(item)
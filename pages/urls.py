@@ -1,11 +1,12 @@
 # apps/pages/urls.py
 from django.urls import path
+from core.async_views import variant
 from . import views
 
 app_name = 'pages'
 
 urlpatterns = [
-    path('', views.home, name='home'),
+    path('', variant(views.home, views.ahome), name='home'),
     path('about/', views.about, name='about'),
     path('privacy/', views.privacy_policy, name='privacy'),
     path('terms/', views.terms_of_service, name='terms'),
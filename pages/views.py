@@ -2,63 +2,36 @@
 
 from django.shortcuts import render
 from django.db.models import Q
-from .models import HomePage, AboutPage, TeamMember
+from core.async_views import arender
+from core.page_cache import cached_page, depends_on
+from core.query_budget import query_budget
 from services.models import Service
 from portfolio.models import Portfolio
-from blog.models import BlogPost
+from blog.models import BlogPost, BlogCategory
+from .models import HomePage, AboutPage, TeamMember
+from .cache import aget_home_context, get_home_context
 
+@query_budget(6)
+@cached_page
 def home(request):
     """Homepage view with dynamic content"""
     
-    # Get homepage content
-    try:
-        homepage = HomePage.objects.filter(is_active=True).first()
-    except HomePage.DoesNotExist:
-        homepage = None
-    
-    # Featured services (top 3)
-    featured_services = Service.objects.filter(
-        is_active=True, 
-        is_featured=True
-    ).order_by('order', 'name')[:3]
-    
-    # Featured portfolio items
-    featured_portfolio = Portfolio.objects.filter(
-        show_in_portfolio=True,
-        featured=True
-    ).order_by('-completion_date')[:3]
-    
-    # Latest blog posts
-    latest_blog_posts = BlogPost.objects.filter(
-        status='published'
-    ).order_by('-published_at')[:3]
-    
-    # Stats - use from homepage model or defaults
-    if homepage:
-        stats = [
-            {'number': homepage.stat_1_number, 'label': homepage.stat_1_label},
-            {'number': homepage.stat_2_number, 'label': homepage.stat_2_label},
-            {'number': homepage.stat_3_number, 'label': homepage.stat_3_label},
-            {'number': homepage.stat_4_number, 'label': homepage.stat_4_label},
-        ]
-    else:
-        stats = [
-            {'number': '500+', 'label': 'SMEs Digitized'},
-            {'number': '50+', 'label': 'SACCOs Served'},
-            {'number': '98%', 'label': 'Client Satisfaction'},
-            {'number': '24/7', 'label': 'Expert Support'},
-        ]
-    
-    context = {
-        'homepage': homepage,
-        'featured_services': featured_services,
-        'featured_portfolio': featured_portfolio,
-        'latest_blog_posts': latest_blog_posts,
-        'stats': stats,
-    }
+    # Served from the cache; rebuilt by signals when the content changes
+    context = get_home_context()
+    depends_on(request, HomePage, Service, Portfolio, BlogPost, BlogCategory)
     
     return render(request, 'pages/home.html', context)
 
+@query_budget(6)
+@cached_page
+async def ahome(request):
+    """``home`` for ASGI (see core.async_views)"""
+    context = await aget_home_context()
+    depends_on(request, HomePage, Service, Portfolio, BlogPost, BlogCategory)
+    return await arender(request, 'pages/home.html', context)
+
+@query_budget(6)
+@cached_page
 def about(request):
     """About page view"""
     
@@ -102,6 +75,8 @@ Today, we're proud to have helped over 500 SMEs and 50+ SACCOs transform their o
         'portfolio_count': portfolio_count,
     }
     
+    depends_on(request, AboutPage, TeamMember, Service, Portfolio)
+    
     return render(request, 'pages/about.html', context)
 
 def privacy_policy(request):
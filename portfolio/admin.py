@@ -1,6 +1,7 @@
 # Add to your admin.py file
 
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.html import format_html
 from .models import Portfolio, PortfolioCategory
 
@@ -10,9 +11,13 @@ class PortfolioCategoryAdmin(admin.ModelAdmin):
     list_editable = ['order', 'is_active']
     prepopulated_fields = {'slug': ('name',)}
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(item_count=Count('portfolio_items'))
+    
     def portfolio_count(self, obj):
-        return obj.portfolio_items.count()
+        return obj.item_count
     portfolio_count.short_description = 'Items'
+    portfolio_count.admin_order_field = 'item_count'
 
 @admin.register(Portfolio)
 class PortfolioAdmin(admin.ModelAdmin):
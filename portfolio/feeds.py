@@ -0,0 +1,52 @@
+from django.urls import reverse
+
+from core.feeds import AtomFeed, SiteFeed, absolute_url
+from .models import Portfolio, PortfolioCategory
+
+# Most recent case studies listed in a feed
+FEED_ITEMS = 20
+
+
+class CaseStudiesFeed(SiteFeed):
+    """Portfolio case studies, most recently completed first"""
+
+    title = 'Fayvad Digital Case Studies'
+    description = 'Recent projects delivered by Fayvad Digital.'
+    models = (Portfolio, PortfolioCategory)
+    state_fields = ('category__name', 'category__slug')
+
+    def link(self):
+        return absolute_url(reverse('portfolio:list'))
+
+    def source(self, obj):
+        return Portfolio.objects.filter(show_in_portfolio=True)
+
+    def items(self):
+        return (
+            self.source(None)
+            .select_related('category')
+            .only(
+                'title', 'slug', 'client_name', 'short_description', 'service_type',
+                'completion_date', 'created_at', 'updated_at', 'category__name',
+            )
+            .order_by('-completion_date', '-id')[:FEED_ITEMS]
+        )
+
+    def item_title(self, item):
+        return f'{item.title} - {item.client_name}'
+
+    def item_description(self, item):
+        return item.short_description
+
+    def item_pubdate(self, item):
+        return item.created_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_categories(self, item):
+        return [item.category.name, item.get_service_type_display()]
+
+
+class CaseStudiesAtomFeed(AtomFeed, CaseStudiesFeed):
+    pass
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+from core.migration_operations import AddIndexConcurrently
+
+# Listing indexes matching the filters and ordering the public views use
+INDEXES = [
+    models.Index(
+        condition=models.Q(("show_in_portfolio", True)),
+        fields=["-featured", "-completion_date", "-id"],
+        name="portfolio_public_idx",
+    ),
+]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("portfolio", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(model_name="portfolio", index=index)
+        for index in INDEXES
+    ]
@@ -18,6 +18,21 @@ class PortfolioCategory(models.Model):
     def __str__(self):
         return self.name
 
+class PortfolioQuerySet(models.QuerySet):
+    """Querysets for listing portfolio items without their case-study text"""
+
+    CARD_FIELDS = [
+        'title', 'slug', 'client_name', 'service_type', 'short_description',
+        'featured_image', 'completion_date', 'duration_months', 'client_rating',
+        'status', 'featured', 'show_in_portfolio', 'technologies_used',
+        'category', 'category__name', 'category__slug',
+    ]
+
+    def cards(self):
+        """Columns needed by portfolio cards (lists, related items, homepage)"""
+        return self.select_related('category').only(*self.CARD_FIELDS)
+
+
 class Portfolio(models.Model):
     """Portfolio/Case Study items"""
     
@@ -37,6 +52,9 @@ class Portfolio(models.Model):
         ('maintenance', 'Under Maintenance'),
     ]
     
+    # Unique ordering used for keyset pagination (featured items first)
+    PAGE_KEYS = ['-featured', '-completion_date', '-id']
+    
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     client_name = models.CharField(max_length=100)
@@ -80,10 +98,19 @@ class Portfolio(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = PortfolioQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-featured', '-completion_date']
         verbose_name = "Portfolio Item"
         verbose_name_plural = "Portfolio Items"
+        indexes = [
+            # Portfolio list (Meta.ordering plus the id tie-breaker) and homepage
+            models.Index(
+                fields=['-featured', '-completion_date', '-id'],
+                condition=models.Q(show_in_portfolio=True), name='portfolio_public_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.client_name}"
@@ -0,0 +1,20 @@
+"""
+Sitemaps for portfolio application.
+"""
+from django.contrib.sitemaps import Sitemap
+from .models import Portfolio
+
+
+class PortfolioSitemap(Sitemap):
+    """Sitemap for public portfolio items."""
+    changefreq = 'monthly'
+    priority = 0.7
+
+    def items(self):
+        return Portfolio.objects.filter(show_in_portfolio=True).only('slug', 'updated_at').order_by('pk')
+
+    def lastmod(self, obj):
+        return obj.updated_at
+
+    def location(self, obj):
+        return obj.get_absolute_url()
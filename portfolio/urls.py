@@ -1,12 +1,16 @@
 # Create portfolio/urls.py
 
 from django.urls import path
-from . import views
+from core.async_views import variant
+from core.feeds import feed_view
+from . import feeds, views
 
 app_name = 'portfolio'
 
 urlpatterns = [
-    path('', views.portfolio_list, name='list'),
+    path('', variant(views.portfolio_list, views.aportfolio_list), name='list'),
+    path('feed/', feed_view(feeds.CaseStudiesFeed()), name='feed'),
+    path('feed/atom/', feed_view(feeds.CaseStudiesAtomFeed()), name='feed_atom'),
     path('<slug:slug>/', views.portfolio_detail, name='detail'),
 ]
 
@@ -1,20 +1,20 @@
 # Create portfolio/views.py
 
 from django.shortcuts import render, get_object_or_404
-from django.core.paginator import Paginator
-from django.db.models import Q
+from core.async_views import alist, arender, gather
+from core.conditional import conditional_page, single_row
+from core.page_cache import cached_page, depends_on
+from core.pagination import KeysetPaginator
+from core.query_budget import query_budget
+from search.backend import matching
+from search.related import neighbour_ids, neighbours_updated, related_to
 from .models import Portfolio, PortfolioCategory
 
-def portfolio_list(request):
-    """Display all portfolio items with filtering"""
-    
-    # Get filter parameters
-    category_slug = request.GET.get('category')
-    service_type = request.GET.get('service')
-    search_query = request.GET.get('q')
+def listed_portfolios(category_slug, service_type, search_query):
+    """Public portfolio items for portfolio_list, filtered"""
     
     # Base queryset
-    portfolios = Portfolio.objects.filter(show_in_portfolio=True)
+    portfolios = Portfolio.objects.cards().filter(show_in_portfolio=True)
     
     # Apply filters
     if category_slug:
@@ -24,17 +24,25 @@ def portfolio_list(request):
         portfolios = portfolios.filter(service_type=service_type)
     
     if search_query:
-        portfolios = portfolios.filter(
-            Q(title__icontains=search_query) |
-            Q(client_name__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(technologies_used__icontains=search_query)
-        )
+        # Looked up in the site search index rather than scanning the text
+        portfolios = portfolios.filter(pk__in=matching(Portfolio, search_query))
+    
+    return portfolios
+
+@query_budget(5)
+@cached_page
+def portfolio_list(request):
+    """Display all portfolio items with filtering"""
+    
+    # Get filter parameters
+    category_slug = request.GET.get('category')
+    service_type = request.GET.get('service')
+    search_query = request.GET.get('q')
+    portfolios = listed_portfolios(category_slug, service_type, search_query)
     
     # Pagination
-    paginator = Paginator(portfolios, 12)  # 12 items per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(portfolios, 12, Portfolio.PAGE_KEYS)  # 12 items per page
+    page_obj = paginator.page(request.GET.get('cursor'))
     
     # Get categories and service types for filters
     categories = PortfolioCategory.objects.filter(is_active=True)
@@ -48,11 +56,58 @@ def portfolio_list(request):
         'current_category': category_slug,
         'current_service': service_type,
         'search_query': search_query,
-        'total_count': portfolios.count(),
+        'total_count': paginator.count,
     }
     
+    depends_on(request, Portfolio, PortfolioCategory)
+    
     return render(request, 'portfolio/portfolio_list.html', context)
 
+@query_budget(5)
+@cached_page
+async def aportfolio_list(request):
+    """``portfolio_list`` for ASGI (see core.async_views)"""
+    
+    category_slug = request.GET.get('category')
+    service_type = request.GET.get('service')
+    search_query = request.GET.get('q')
+    portfolios = listed_portfolios(category_slug, service_type, search_query)
+    
+    paginator = KeysetPaginator(portfolios, 12, Portfolio.PAGE_KEYS)  # 12 items per page
+    rows = await gather(
+        page_obj=paginator.apage(request.GET.get('cursor')),
+        total_count=paginator.acount(),
+        categories=alist(PortfolioCategory.objects.filter(is_active=True)),
+    )
+    
+    context = {
+        **rows,
+        'portfolios': rows['page_obj'].object_list,
+        'service_types': Portfolio.SERVICE_TYPES,
+        'current_category': category_slug,
+        'current_service': service_type,
+        'search_query': search_query,
+    }
+    
+    depends_on(request, Portfolio, PortfolioCategory)
+    
+    return await arender(request, 'portfolio/portfolio_list.html', context)
+
+def portfolio_state(request, slug):
+    """What a portfolio item's page is built from, in one query (see core.conditional)"""
+    public = Portfolio.objects.filter(show_in_portfolio=True)
+    return single_row(public.filter(slug=slug).annotate(
+        related_updated=neighbours_updated(Portfolio, public),
+        related_ids=neighbour_ids(Portfolio, public),
+    ).values(
+        # Categories have no updated_at, so the page's category fields stand in
+        'pk', 'updated_at', 'category__name', 'category__slug', 'related_updated',
+        'related_ids',
+    ))
+
+@query_budget(5)
+@cached_page
+@conditional_page(portfolio_state)
 def portfolio_detail(request, slug):
     """Display individual portfolio item"""
     
@@ -62,23 +117,24 @@ def portfolio_detail(request, slug):
         show_in_portfolio=True
     )
     
-    # Get related portfolio items (same service type, excluding current)
-    related_portfolios = Portfolio.objects.filter(
-        service_type=portfolio.service_type,
+    # Precomputed related items (service type, technologies and description similarity)
+    related_portfolios = related_to(portfolio, Portfolio.objects.cards().filter(
         show_in_portfolio=True
-    ).exclude(id=portfolio.id)[:3]
+    ))[:3]
     
     context = {
         'portfolio': portfolio,
         'related_portfolios': related_portfolios,
     }
     
+    depends_on(request, portfolio, portfolio.category, related_portfolios)
+    
     return render(request, 'portfolio/portfolio_detail.html', context)
 
 def featured_portfolio(request):
     """Get featured portfolio items for homepage"""
     
-    featured_items = Portfolio.objects.filter(
+    featured_items = Portfolio.objects.cards().filter(
         featured=True,
         show_in_portfolio=True
     )[:6]  # Show 6 featured items
@@ -0,0 +1,19 @@
+# search/admin.py
+
+from django.contrib import admin
+from .models import SearchDocument
+
+
+@admin.register(SearchDocument)
+class SearchDocumentAdmin(admin.ModelAdmin):
+    """Read-only view of the index; documents follow their objects' saves"""
+    list_display = ['title', 'kind', 'url', 'length', 'available_from', 'indexed_at']
+    list_filter = ['kind']
+    search_fields = ['title', 'url']
+    readonly_fields = [field.name for field in SearchDocument._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
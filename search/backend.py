@@ -0,0 +1,207 @@
+"""
+Site-wide search over blog posts, services and portfolio items.
+
+Documents and their term postings live in two tables. Each save rewrites a
+single document's postings, and a query is answered with one grouped scan
+of the postings for the query terms, ranked by TF-IDF and a per-type boost.
+``matching`` answers the ``?q=`` filters of the service and portfolio
+listings from the same postings.
+"""
+import math
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Ln
+from django.utils import timezone
+
+from .indexes import registry
+from .models import SearchDocument, SearchPosting
+from .text import highlight, tokenize
+
+SUMMARY_LENGTH = 1000
+MAX_TERM_LENGTH = SearchPosting._meta.get_field('term').max_length
+
+
+def build_postings(index, obj):
+    """Return ({term: weight}, total term count) for an instance"""
+    weights = defaultdict(float)
+    length = 0
+    for text, weight in index.fields(obj):
+        tokens = tokenize(text)
+        length += len(tokens)
+        for token in tokens:
+            weights[token[:MAX_TERM_LENGTH]] += weight
+    return weights, length or 1
+
+
+def document_defaults(index, obj, length):
+    return {
+        'kind': index.kind,
+        'title': index.title(obj)[:200],
+        'url': obj.get_absolute_url(),
+        'summary': index.summary(obj)[:SUMMARY_LENGTH],
+        'length': length,
+        'boost': index.boost,
+        'available_from': index.available_from(obj),
+    }
+
+
+def index_object(obj):
+    """Add, refresh or drop a single instance from the index"""
+    index = registry.get(type(obj))
+    if index is None:
+        return
+    if not index.is_public(obj):
+        remove_object(obj)
+        return
+
+    weights, length = build_postings(index, obj)
+    with transaction.atomic():
+        document, _ = SearchDocument.objects.update_or_create(
+            content_type=ContentType.objects.get_for_model(obj),
+            object_id=obj.pk,
+            defaults=document_defaults(index, obj, length),
+        )
+        document.postings.all().delete()
+        SearchPosting.objects.bulk_create(
+            SearchPosting(term=term, document=document, weight=weight)
+            for term, weight in weights.items()
+        )
+
+
+def remove_object(obj):
+    SearchDocument.objects.filter(
+        content_type=ContentType.objects.get_for_model(obj),
+        object_id=obj.pk,
+    ).delete()
+
+
+def rebuild(chunk_size=500, stdout=None):
+    """Re-index every public instance, streaming each model in chunks"""
+    total = 0
+    for model, index in registry.items():
+        content_type = ContentType.objects.get_for_model(model)
+        SearchDocument.objects.filter(content_type=content_type).delete()
+
+        batch = []
+        for obj in index.queryset().iterator(chunk_size=chunk_size):
+            batch.append(obj)
+            if len(batch) >= chunk_size:
+                total += _index_batch(index, content_type, batch)
+                batch = []
+        if batch:
+            total += _index_batch(index, content_type, batch)
+
+        if stdout:
+            stdout.write(f'Indexed {index.kind} documents')
+    return total
+
+
+def _index_batch(index, content_type, objects):
+    with transaction.atomic():
+        postings = {}
+        documents = []
+        for obj in objects:
+            weights, length = build_postings(index, obj)
+            documents.append(SearchDocument(
+                content_type=content_type,
+                object_id=obj.pk,
+                **document_defaults(index, obj, length),
+            ))
+            postings[obj.pk] = weights
+
+        SearchDocument.objects.bulk_create(documents)
+        # bulk_create only sets primary keys on some backends, so look them up
+        ids = dict(SearchDocument.objects.filter(
+            content_type=content_type, object_id__in=postings
+        ).values_list('object_id', 'pk'))
+        SearchPosting.objects.bulk_create(
+            [
+                SearchPosting(term=term, document_id=ids[object_id], weight=weight)
+                for object_id, weights in postings.items()
+                for term, weight in weights.items()
+            ],
+            batch_size=1000,
+        )
+    return len(documents)
+
+
+def query_terms(query):
+    return sorted(set(term[:MAX_TERM_LENGTH] for term in tokenize(query)))
+
+
+def matching(model, query):
+    """
+    Ids of ``model``'s documents with a word starting with each query term
+    ("develop" finds "development"), as a subquery for ``pk__in`` (so a
+    listing keeps its own order and pagination)
+    """
+    terms = query_terms(query)
+    postings = SearchPosting.objects.filter(
+        document__content_type=ContentType.objects.get_for_model(model)
+    )
+    if not terms:
+        return postings.none().values('document__object_id')
+    # One nested subquery per term: a posting can start with several terms
+    ids = None
+    for term in terms:
+        term_ids = postings.filter(term__startswith=term)
+        if ids is not None:
+            term_ids = term_ids.filter(document__object_id__in=ids)
+        ids = term_ids.values('document__object_id')
+    return ids
+
+
+def search(query):
+    """
+    Return a queryset of (document id, score) rows for documents containing
+    every query term, best matches first.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return SearchPosting.objects.none()
+
+    frequencies = dict(
+        SearchPosting.objects.filter(term__in=terms)
+        .values('term').annotate(df=Count('id')).values_list('term', 'df')
+    )
+    if len(frequencies) < len(terms):
+        return SearchPosting.objects.none()
+
+    total = SearchDocument.objects.count()
+    idf = {term: math.log(1 + total / df) for term, df in frequencies.items()}
+
+    now = timezone.now()
+    return (
+        SearchPosting.objects
+        .filter(term__in=terms)
+        .filter(Q(document__available_from__isnull=True) | Q(document__available_from__lte=now))
+        .values('document')
+        .annotate(
+            matched=Count('term', distinct=True),
+            tfidf=Sum(Case(
+                *[When(term=term, then=F('weight') * Value(weight)) for term, weight in idf.items()],
+                output_field=FloatField(),
+            )),
+        )
+        .filter(matched=len(terms))
+        .annotate(score=F('tfidf') * F('document__boost') / Ln(F('document__length') + 2))
+        .order_by('-score', 'document')
+    )
+
+
+def results(rows, query):
+    """Resolve a page of ranked rows into documents with highlighted snippets"""
+    rows = list(rows)
+    documents = SearchDocument.objects.in_bulk([row['document'] for row in rows])
+    hits = []
+    for row in rows:
+        document = documents.get(row['document'])
+        if document is None:
+            continue
+        document.score = row['score']
+        document.snippet = highlight(document.summary, query)
+        hits.append(document)
+    return hits
@@ -0,0 +1,175 @@
+"""
+Definitions of what each content type contributes to the site-wide index
+and to the related-items similarity scores (see ``search.related``).
+"""
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.text import slugify
+
+from blog.models import BlogPost
+from portfolio.models import Portfolio
+from services.models import Service
+
+# Relative weights for title / summary / body fields
+TITLE, SUMMARY, BODY = 1.0, 0.4, 0.2
+
+
+class ModelIndex:
+    """Base class describing how one model is indexed"""
+    model = None
+    kind = ''
+    boost = 1.0
+
+    # Fields read by related_text/related_labels; saves touching none of
+    # them leave the related items alone
+    related_fields = set()
+
+    def queryset(self):
+        """Instances that should be searchable"""
+        return self.model.objects.all()
+
+    def is_public(self, obj):
+        return True
+
+    def title(self, obj):
+        return obj.title
+
+    def fields(self, obj):
+        """(text, weight) pairs to index"""
+        raise NotImplementedError
+
+    def summary(self, obj):
+        return ''
+
+    def available_from(self, obj):
+        return None
+
+    def related_queryset(self):
+        """Public instances with just the fields used for similarity"""
+        return self.queryset().only(*self.related_fields)
+
+    def related_text(self, obj):
+        """Short text compared with TF-IDF cosine similarity"""
+        raise NotImplementedError
+
+    def related_labels(self, obj):
+        """Set of labels (tags, category, ...) compared by overlap"""
+        return set()
+
+
+class BlogPostIndex(ModelIndex):
+    model = BlogPost
+    kind = 'Blog'
+    related_fields = {'title', 'excerpt', 'tags', 'tag_list', 'category', 'status', 'published_at'}
+
+    def queryset(self):
+        return BlogPost.objects.filter(status='published')
+
+    def is_public(self, obj):
+        return obj.status == 'published'
+
+    def related_queryset(self):
+        # Scheduled posts are not shown yet, so they would only take up slots
+        return super().related_queryset().filter(published_at__lte=timezone.now())
+
+    def fields(self, obj):
+        return [
+            (obj.title, TITLE),
+            (obj.excerpt, SUMMARY),
+            (obj.tags, SUMMARY),
+            (strip_tags(obj.content), BODY),
+        ]
+
+    def summary(self, obj):
+        return f"{obj.excerpt} {strip_tags(obj.content)}"
+
+    def available_from(self, obj):
+        return obj.published_at
+
+    def related_text(self, obj):
+        return f"{obj.title} {obj.excerpt}"
+
+    def related_labels(self, obj):
+        labels = {f'tag:{slugify(tag)}' for tag in obj.tag_list}
+        if obj.category_id:
+            labels.add(f'category:{obj.category_id}')
+        return labels
+
+
+class ServiceIndex(ModelIndex):
+    model = Service
+    kind = 'Service'
+    boost = 1.2
+    related_fields = {'name', 'short_description', 'category', 'is_active'}
+
+    def queryset(self):
+        return Service.objects.filter(is_active=True)
+
+    def is_public(self, obj):
+        return obj.is_active
+
+    def title(self, obj):
+        return obj.name
+
+    def fields(self, obj):
+        return [
+            (obj.name, TITLE),
+            (obj.short_description, SUMMARY),
+            (obj.description, BODY),
+            (obj.features, BODY),
+            (obj.benefits, BODY),
+        ]
+
+    def summary(self, obj):
+        return f"{obj.short_description} {obj.description}"
+
+    def related_text(self, obj):
+        return f"{obj.name} {obj.short_description}"
+
+    def related_labels(self, obj):
+        return {f'category:{obj.category_id}'}
+
+
+class PortfolioIndex(ModelIndex):
+    model = Portfolio
+    kind = 'Portfolio'
+    related_fields = {
+        'title', 'short_description', 'service_type', 'technologies_used',
+        'category', 'show_in_portfolio',
+    }
+
+    def queryset(self):
+        return Portfolio.objects.filter(show_in_portfolio=True)
+
+    def is_public(self, obj):
+        return obj.show_in_portfolio
+
+    def fields(self, obj):
+        return [
+            (obj.title, TITLE),
+            (obj.client_name, SUMMARY),
+            (obj.short_description, SUMMARY),
+            (' '.join(str(tech) for tech in obj.technologies_used or []), SUMMARY),
+            (obj.description, BODY),
+            (obj.challenge, BODY),
+            (obj.solution, BODY),
+            (obj.results, BODY),
+        ]
+
+    def summary(self, obj):
+        return f"{obj.short_description} {obj.description}"
+
+    def related_text(self, obj):
+        return f"{obj.title} {obj.short_description}"
+
+    def related_labels(self, obj):
+        labels = {f'tech:{slugify(tech)}' for tech in obj.technologies_used or []}
+        labels.add(f'type:{obj.service_type}')
+        labels.add(f'category:{obj.category_id}')
+        return labels
+
+
+registry = {
+    index.model: index
+    for index in (BlogPostIndex(), ServiceIndex(), PortfolioIndex())
+}
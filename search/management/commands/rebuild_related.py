@@ -0,0 +1,17 @@
+# search/management/commands/rebuild_related.py
+
+from django.core.management.base import BaseCommand
+from search.related import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the related items shown on blog, service and portfolio detail pages'
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            self.style.SUCCESS('🔗 Computing related items...\n')
+        )
+        total = rebuild(stdout=self.stdout)
+        self.stdout.write(
+            self.style.SUCCESS(f'\n✅ Stored {total} related items')
+        )
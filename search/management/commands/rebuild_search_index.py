@@ -0,0 +1,25 @@
+# search/management/commands/rebuild_search_index.py
+
+from django.core.management.base import BaseCommand
+from search.backend import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the site-wide search index for blog posts, services and portfolio items'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of objects loaded and indexed per batch',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            self.style.SUCCESS('🔎 Rebuilding search index...\n')
+        )
+        total = rebuild(chunk_size=options['chunk_size'], stdout=self.stdout)
+        self.stdout.write(
+            self.style.SUCCESS(f'\n✅ Indexed {total} documents')
+        )
@@ -0,0 +1,72 @@
+# search/models.py
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """One searchable page (blog post, service or portfolio item)"""
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+
+    # Denormalised display data so results render without touching the source tables
+    kind = models.CharField(max_length=50)
+    title = models.CharField(max_length=200)
+    url = models.CharField(max_length=300)
+    summary = models.TextField(blank=True)
+
+    length = models.PositiveIntegerField(default=1, help_text="Number of indexed terms")
+    boost = models.FloatField(default=1.0)
+    available_from = models.DateTimeField(blank=True, null=True)
+    indexed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_type', 'object_id'], name='search_document_unique_object'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
+
+
+class SearchPosting(models.Model):
+    """Inverted index entry: a term and its weighted frequency in a document"""
+
+    term = models.CharField(max_length=64)
+    document = models.ForeignKey(SearchDocument, on_delete=models.CASCADE, related_name='postings')
+    weight = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['term', 'document'], name='search_posting_unique_term'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.term} ({self.weight})"
+
+
+class RelatedItem(models.Model):
+    """Precomputed neighbour of an object, ranked by similarity (see search.related)"""
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    related_object_id = models.PositiveBigIntegerField()
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['rank']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_type', 'object_id', 'related_object_id'],
+                name='search_related_unique_pair',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.object_id} -> {self.related_object_id} ({self.score:.3f})"
@@ -0,0 +1,240 @@
+"""
+Precomputed related items for blog posts, services and portfolio items.
+
+Every public object keeps its TOP_K most similar objects of the same type in
+``RelatedItem``. Similarity is the overlap of label sets (tags, category,
+technologies) plus the cosine of TF-IDF vectors built from the title and
+summary. Saving an object recomputes its own list and the lists it enters or
+drops out of, on a background thread after the transaction commits, since
+scoring it needs every object's vector; ``rebuild`` recomputes everything,
+including lists whose scores drifted as the IDF weights changed. Scheduled
+blog posts join the lists on their next save or rebuild after going live.
+"""
+import heapq
+import logging
+import math
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import CharField, F, Func, OuterRef, Subquery
+from django.db.models.functions import Cast
+
+from core.page_cache import invalidate
+
+from .indexes import registry
+from .models import RelatedItem
+from .text import tokenize
+
+logger = logging.getLogger(__name__)
+
+TOP_K = 6
+LABEL_WEIGHT = 0.5
+TEXT_WEIGHT = 0.5
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='related')
+
+
+class Corpus:
+    """Labels and unit TF-IDF vectors for every public instance of one model"""
+
+    def __init__(self, index):
+        self.objects = {obj.pk: obj for obj in index.related_queryset()}
+        self.labels = {pk: index.related_labels(obj) for pk, obj in self.objects.items()}
+
+        counts = {
+            pk: Counter(tokenize(index.related_text(obj)))
+            for pk, obj in self.objects.items()
+        }
+        df = Counter(term for terms in counts.values() for term in terms)
+        size = len(counts)
+        self.vectors = {}
+        for pk, terms in counts.items():
+            vector = {term: tf * math.log(1 + size / df[term]) for term, tf in terms.items()}
+            norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+            self.vectors[pk] = {term: weight / norm for term, weight in vector.items()}
+
+    def score(self, a, b):
+        labels_a, labels_b = self.labels[a], self.labels[b]
+        union = labels_a | labels_b
+        overlap = len(labels_a & labels_b) / len(union) if union else 0.0
+
+        vector_a, vector_b = self.vectors[a], self.vectors[b]
+        if len(vector_a) > len(vector_b):
+            vector_a, vector_b = vector_b, vector_a
+        cosine = sum(weight * vector_b.get(term, 0.0) for term, weight in vector_a.items())
+
+        return LABEL_WEIGHT * overlap + TEXT_WEIGHT * cosine
+
+    def neighbours(self, pk):
+        """[(related pk, score)] for the TOP_K best matches, best first"""
+        scored = (
+            (other, self.score(pk, other))
+            for other in self.objects if other != pk
+        )
+        # Ties go to the older object so rankings are stable between runs
+        return heapq.nlargest(
+            TOP_K, (item for item in scored if item[1] > 0),
+            key=lambda item: (item[1], -item[0]),
+        )
+
+
+def _write(content_type, lists):
+    """Replace the stored neighbours of each object in ``lists``"""
+    with transaction.atomic():
+        RelatedItem.objects.filter(
+            content_type=content_type, object_id__in=list(lists)
+        ).delete()
+        RelatedItem.objects.bulk_create(
+            [
+                RelatedItem(
+                    content_type=content_type, object_id=pk,
+                    related_object_id=related, score=score, rank=rank,
+                )
+                for pk, neighbours in lists.items()
+                for rank, (related, score) in enumerate(neighbours)
+            ],
+            batch_size=1000,
+        )
+
+
+def rebuild(stdout=None):
+    """Recompute the related items of every public instance"""
+    total = 0
+    for model, index in registry.items():
+        content_type = ContentType.objects.get_for_model(model)
+        corpus = Corpus(index)
+        lists = {pk: corpus.neighbours(pk) for pk in corpus.objects}
+        with transaction.atomic():
+            RelatedItem.objects.filter(content_type=content_type).delete()
+            _write(content_type, lists)
+        total += sum(len(neighbours) for neighbours in lists.values())
+        if stdout:
+            stdout.write(f'Related {index.kind} items: {len(lists)} objects')
+    return total
+
+
+def update_related(model, pk):
+    """Refresh the lists affected by object ``pk`` being saved, unpublished or deleted"""
+    index = registry.get(model)
+    if index is None:
+        return
+    content_type = ContentType.objects.get_for_model(model)
+    corpus = Corpus(index)
+
+    stored = defaultdict(list)
+    for object_id, related_id, score in RelatedItem.objects.filter(
+        content_type=content_type
+    ).order_by('object_id', 'rank').values_list('object_id', 'related_object_id', 'score'):
+        stored[object_id].append((related_id, score))
+
+    public = pk in corpus.objects
+    changed = {pk: corpus.neighbours(pk) if public else []}
+    for other in corpus.objects:
+        if other == pk:
+            continue
+        current = stored.get(other, [])
+        listed = any(related == pk for related, _ in current)
+        # Only lists that contain the object, or that it could now break into, move
+        if listed or (public and (
+            len(current) < TOP_K or corpus.score(other, pk) > current[-1][1]
+        )):
+            neighbours = corpus.neighbours(other)
+            if [related for related, _ in neighbours] != [related for related, _ in current]:
+                changed[other] = neighbours
+
+    _write(content_type, changed)
+    # Detail pages show the related items, so their cached copies are stale
+    for other in changed:
+        if other != pk:
+            invalidate(corpus.objects[other])
+
+
+def _update_logged(model, pk):
+    try:
+        update_related(model, pk)
+    except Exception:
+        logger.exception('Updating related items failed for %s %s', model._meta.label, pk)
+    finally:
+        # The worker thread has its own database connection
+        connection.close()
+
+
+def schedule(instance):
+    """Refresh the lists ``instance`` affects after commit"""
+    if type(instance) not in registry or not settings.RELATED_AUTO_UPDATE:
+        return
+    # Deleted instances lose their pk once the post_delete signals are sent
+    model, pk = type(instance), instance.pk
+    transaction.on_commit(lambda: _executor.submit(_update_logged, model, pk))
+
+
+def related_to(obj, queryset):
+    """
+    Filter ``queryset`` to the precomputed neighbours of ``obj``, best first,
+    in a single query against the related-items index.
+    """
+    neighbours = RelatedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk
+    )
+    return queryset.filter(
+        pk__in=neighbours.values('related_object_id')
+    ).annotate(
+        related_rank=Subquery(
+            neighbours.filter(related_object_id=OuterRef('pk')).values('rank')[:1]
+        )
+    ).order_by('related_rank')
+
+
+def neighbours_updated(model, queryset):
+    """
+    Subquery for annotating ``model`` rows: the newest ``updated_at`` among
+    each row's precomputed neighbours in ``queryset`` (None without any).
+    """
+    neighbours = RelatedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(model), object_id=OuterRef(OuterRef('pk'))
+    )
+    # A plain MAX() over the filtered rows, without GROUP BY or a sort
+    newest = Func(F('updated_at'), function='MAX')
+    return Subquery(
+        queryset.filter(pk__in=neighbours.values('related_object_id'))
+        .order_by().annotate(newest=newest).values('newest')
+    )
+
+
+class RankedIds(Func):
+    """
+    The rows' ``related_object_id`` values in rank order as one string. Like
+    the MAX() above, a plain function so the subquery has no GROUP BY.
+    SQLite before 3.44 cannot order GROUP_CONCAT, so there only the set of
+    ids shows.
+    """
+    output_field = CharField()
+
+    def __init__(self):
+        super().__init__(Cast('related_object_id', CharField()), F('rank'))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        ids, params = compiler.compile(self.source_expressions[0])
+        return f'GROUP_CONCAT({ids})', params
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        ids, id_params = compiler.compile(self.source_expressions[0])
+        rank, rank_params = compiler.compile(self.source_expressions[1])
+        return f"STRING_AGG({ids}, ',' ORDER BY {rank})", [*id_params, *rank_params]
+
+
+def neighbour_ids(model, queryset):
+    """
+    Subquery for annotating ``model`` rows: the ids of each row's precomputed
+    neighbours in ``queryset``, best first, as one string (None without any).
+    Goes with ``neighbours_updated``: replacing a neighbour with an older one
+    leaves the newest ``updated_at`` as it was.
+    """
+    neighbours = RelatedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(model), object_id=OuterRef('pk'),
+        related_object_id__in=queryset.values('pk'),
+    )
+    return Subquery(neighbours.order_by().annotate(ids=RankedIds()).values('ids'))
@@ -0,0 +1,25 @@
+# search/signals.py
+
+from django.db.models.signals import post_delete, post_save
+
+from .backend import index_object, remove_object
+from .indexes import registry
+from .related import schedule as schedule_related
+
+
+def update_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:  # loaddata
+        return
+    index_object(instance)
+    if update_fields is None or registry[sender].related_fields & set(update_fields):
+        schedule_related(instance)
+
+
+def remove_from_index(sender, instance, **kwargs):
+    remove_object(instance)
+    schedule_related(instance)
+
+
+for model in registry:
+    post_save.connect(update_index, sender=model, dispatch_uid=f'search_update_{model._meta.label}')
+    post_delete.connect(remove_from_index, sender=model, dispatch_uid=f'search_remove_{model._meta.label}')
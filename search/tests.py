@@ -0,0 +1,84 @@
+"""
+Tests for the search index's listing filters and the related-items index.
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from blog.models import BlogPost
+from portfolio.views import listed_portfolios
+from services.models import Service
+from services.views import listed_services
+
+from .models import RelatedItem
+from .related import update_related
+
+
+class ListingSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for command in ('setup_services_data', 'setup_portfolio_data'):
+            call_command(command, stdout=StringIO())
+
+    def test_every_term_must_match(self):
+        service = Service.objects.filter(is_active=True).first()
+        first_word = service.name.split()[0]
+        self.assertIn(service, listed_services(None, first_word.lower()))
+        self.assertNotIn(service, listed_services(None, f'{first_word} zzzunknown'))
+
+    def test_partial_words_match(self):
+        service = Service.objects.filter(is_active=True).first()
+        word = max(service.name.split(), key=len).lower()
+        self.assertIn(service, listed_services(None, word[:-2]))
+        self.assertIn(service, listed_services(None, word[:-2].upper()))
+
+    def test_filters_keep_listing_order(self):
+        matches = listed_portfolios(None, None, 'system')
+        self.assertTrue(matches)
+        self.assertEqual(list(matches), [item for item in listed_portfolios(None, None, None)
+                                         if item in matches])
+
+    def test_query_without_terms_matches_nothing(self):
+        self.assertFalse(listed_services(None, '!!'))
+
+
+class RelatedItemsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('setup_blog_data', stdout=StringIO())
+
+    def related_ids(self, post):
+        return set(RelatedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(BlogPost), object_id=post.pk,
+        ).values_list('related_object_id', flat=True))
+
+    def test_scheduled_posts_are_left_out(self):
+        post = BlogPost.objects.filter(status='published').first()
+        scheduled = BlogPost.objects.create(
+            title=post.title, excerpt=post.excerpt, content=post.content,
+            category=post.category, tags=post.tags, author=post.author,
+            status='published', published_at=timezone.now() + timedelta(days=1),
+        )
+        call_command('rebuild_related', stdout=StringIO())
+        self.assertNotIn(scheduled.pk, self.related_ids(post))
+        self.assertEqual(self.related_ids(scheduled), set())
+
+        # Live now; its next save lists it (the receiver runs this after commit)
+        BlogPost.objects.filter(pk=scheduled.pk).update(published_at=timezone.now())
+        update_related(BlogPost, scheduled.pk)
+        self.assertIn(scheduled.pk, self.related_ids(post))
+
+    def test_unpublished_post_leaves_lists(self):
+        post = BlogPost.objects.filter(status='published').first()
+        call_command('rebuild_related', stdout=StringIO())
+        listing = BlogPost.objects.get(pk=next(iter(self.related_ids(post))))
+        BlogPost.objects.filter(pk=post.pk).update(status='draft')
+        update_related(BlogPost, post.pk)
+        self.assertNotIn(post.pk, self.related_ids(listing))
+        self.assertEqual(self.related_ids(post), set())
@@ -0,0 +1,48 @@
+"""
+Text helpers shared by the site-wide and blog search backends.
+"""
+import re
+
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'how',
+    'in', 'is', 'it', 'of', 'on', 'or', 'the', 'to', 'what', 'with', 'your',
+}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """Lower-cased word tokens without stop words"""
+    return [
+        token for token in TOKEN_RE.findall((text or '').lower())
+        if token not in STOP_WORDS
+    ]
+
+
+def highlight(text, query, words=30):
+    """Return an HTML-safe snippet of ``text`` around the first query match"""
+    terms = set(tokenize(query))
+    tokens = strip_tags(text or '').split()
+    if not tokens:
+        return ''
+
+    def matches(token):
+        return any(word in terms for word in tokenize(token))
+
+    first = next((i for i, token in enumerate(tokens) if matches(token)), 0)
+    start = max(0, first - words // 3)
+    window = tokens[start:start + words]
+
+    parts = [
+        f'<mark>{escape(token)}</mark>' if matches(token) else escape(token)
+        for token in window
+    ]
+    snippet = ' '.join(parts)
+    if start > 0:
+        snippet = '… ' + snippet
+    if start + words < len(tokens):
+        snippet += ' …'
+    return mark_safe(snippet)
@@ -0,0 +1,31 @@
+# search/views.py
+
+from django.core.paginator import Paginator
+from django.shortcuts import render
+
+from core.query_budget import query_budget
+
+from .backend import results, search
+
+
+@query_budget(6)
+def site_search(request):
+    """Search blog posts, services and portfolio items from one box"""
+
+    search_query = request.GET.get('q', '').strip()
+    page_obj = None
+    hits = []
+
+    if search_query:
+        paginator = Paginator(search(search_query), 10)
+        page_obj = paginator.get_page(request.GET.get('page'))
+        hits = results(page_obj.object_list, search_query)
+
+    context = {
+        'search_query': search_query,
+        'page_obj': page_obj,
+        'results': hits,
+        'total_count': page_obj.paginator.count if page_obj else 0,
+    }
+
+    return render(request, 'search/results.html', context)
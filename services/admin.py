@@ -1,6 +1,7 @@
 # Add to your services/admin.py
 
 from django.contrib import admin
+from django.db.models import Count, Q
 from django.utils.html import format_html
 from .models import Service, ServiceCategory
 
@@ -12,9 +13,15 @@ class ServiceCategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
     list_editable = ['is_active']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            active_services=Count('service', filter=Q(service__is_active=True))
+        )
+    
     def service_count(self, obj):
-        return obj.service_set.filter(is_active=True).count()
+        return obj.active_services
     service_count.short_description = 'Active Services'
+    service_count.admin_order_field = 'active_services'
 
 @admin.register(Service)
 class ServiceAdmin(admin.ModelAdmin):
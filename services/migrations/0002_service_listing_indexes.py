@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+from core.migration_operations import AddIndexConcurrently
+
+# Listing indexes matching the filters and ordering the public views use
+INDEXES = [
+    models.Index(
+        condition=models.Q(("is_active", True)),
+        fields=["order", "name"],
+        name="service_active_idx",
+    ),
+    models.Index(
+        condition=models.Q(("is_active", True)),
+        fields=["category", "order", "name"],
+        name="service_category_active_idx",
+    ),
+    models.Index(
+        condition=models.Q(("is_active", True), ("is_featured", True)),
+        fields=["order", "name"],
+        name="service_featured_idx",
+    ),
+]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("services", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(model_name="service", index=index)
+        for index in INDEXES
+    ]
@@ -33,6 +33,20 @@ class ServiceCategory(models.Model):
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
 
+class ServiceQuerySet(models.QuerySet):
+    """Querysets for listing services without loading their long descriptions"""
+
+    CARD_FIELDS = [
+        'name', 'slug', 'short_description', 'features', 'price', 'setup_fee',
+        'billing_cycle', 'order', 'is_featured', 'is_active',
+        'category', 'category__name', 'category__slug',
+    ]
+
+    def cards(self):
+        """Columns needed by service cards (lists, related services, homepage)"""
+        return self.select_related('category').only(*self.CARD_FIELDS)
+
+
 class Service(models.Model):
     """Individual services offered"""
     
@@ -74,8 +88,26 @@ class Service(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ServiceQuerySet.as_manager()
+    
     class Meta:
         ordering = ['order', 'name']
+        indexes = [
+            # Service list and category pages
+            models.Index(
+                fields=['order', 'name'],
+                condition=models.Q(is_active=True), name='service_active_idx',
+            ),
+            models.Index(
+                fields=['category', 'order', 'name'],
+                condition=models.Q(is_active=True), name='service_category_active_idx',
+            ),
+            # Featured services on the homepage and service list
+            models.Index(
+                fields=['order', 'name'],
+                condition=models.Q(is_active=True, is_featured=True), name='service_featured_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.name
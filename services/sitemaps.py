@@ -0,0 +1,35 @@
+"""
+Sitemaps for services application.
+"""
+from django.contrib.sitemaps import Sitemap
+from .models import Service, ServiceCategory
+
+
+class ServiceSitemap(Sitemap):
+    """Sitemap for active services."""
+    changefreq = 'monthly'
+    priority = 0.9
+
+    def items(self):
+        return Service.objects.filter(is_active=True).only('slug', 'updated_at').order_by('pk')
+
+    def lastmod(self, obj):
+        return obj.updated_at
+
+    def location(self, obj):
+        return obj.get_absolute_url()
+
+
+class ServiceCategorySitemap(Sitemap):
+    """Sitemap for active service categories."""
+    changefreq = 'monthly'
+    priority = 0.7
+
+    def items(self):
+        return ServiceCategory.objects.filter(is_active=True).order_by('pk')
+
+    def lastmod(self, obj):
+        return obj.updated_at
+
+    def location(self, obj):
+        return obj.get_absolute_url()
@@ -1,11 +1,12 @@
 # apps/services/urls.py
 from django.urls import path
+from core.async_views import variant
 from . import views
 
 app_name = 'services'
 
 urlpatterns = [
-    path('', views.service_list, name='list'),
+    path('', variant(views.service_list, views.aservice_list), name='list'),
     path('category/<slug:slug>/', views.category_detail, name='category'),
     path('<slug:slug>/', views.service_detail, name='detail'),
 ]
@@ -1,30 +1,39 @@
 # Create services/views.py
 
 from django.shortcuts import render, get_object_or_404
-from django.core.paginator import Paginator
-from django.db.models import Q
+from core.async_views import alist, arender, gather
+from core.conditional import conditional_page, single_row
+from core.page_cache import cached_page, depends_on
+from core.query_budget import query_budget
+from search.backend import matching
+from search.related import neighbour_ids, neighbours_updated, related_to
 from .models import Service, ServiceCategory
 
-def service_list(request):
-    """Display all services with filtering"""
-    
-    # Get filter parameters
-    category_slug = request.GET.get('category')
-    search_query = request.GET.get('q')
+def listed_services(category_slug, search_query):
+    """Active services for service_list, filtered"""
     
     # Base queryset
-    services = Service.objects.filter(is_active=True).select_related('category')
+    services = Service.objects.cards().filter(is_active=True)
     
     # Apply filters
     if category_slug:
         services = services.filter(category__slug=category_slug)
     
     if search_query:
-        services = services.filter(
-            Q(name__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(features__icontains=search_query)
-        )
+        # Looked up in the site search index rather than scanning the text
+        services = services.filter(pk__in=matching(Service, search_query))
+    
+    return services
+
+@query_budget(6)
+@cached_page
+def service_list(request):
+    """Display all services with filtering"""
+    
+    # Get filter parameters
+    category_slug = request.GET.get('category')
+    search_query = request.GET.get('q')
+    services = listed_services(category_slug, search_query)
     
     # Get categories for filter dropdown
     categories = ServiceCategory.objects.filter(is_active=True)
@@ -41,8 +50,48 @@ def service_list(request):
         'total_count': services.count(),
     }
     
+    depends_on(request, Service, ServiceCategory)
+    
     return render(request, 'services/service_list.html', context)
 
+@query_budget(6)
+@cached_page
+async def aservice_list(request):
+    """``service_list`` for ASGI (see core.async_views)"""
+    
+    category_slug = request.GET.get('category')
+    search_query = request.GET.get('q')
+    services = listed_services(category_slug, search_query)
+    
+    rows = await gather(
+        services=alist(services),
+        categories=alist(ServiceCategory.objects.filter(is_active=True)),
+        featured_services=alist(services.filter(is_featured=True)[:3]),
+    )
+    
+    context = {
+        **rows,
+        'current_category': category_slug,
+        'search_query': search_query,
+        # Every matching service is listed, so no separate COUNT
+        'total_count': len(rows['services']),
+    }
+    
+    depends_on(request, Service, ServiceCategory)
+    
+    return await arender(request, 'services/service_list.html', context)
+
+def service_state(request, slug):
+    """What a service's page is built from, in one query (see core.conditional)"""
+    active = Service.objects.filter(is_active=True)
+    return single_row(active.filter(slug=slug).annotate(
+        related_updated=neighbours_updated(Service, active),
+        related_ids=neighbour_ids(Service, active),
+    ).values('pk', 'updated_at', 'category__updated_at', 'related_updated', 'related_ids'))
+
+@query_budget(5)
+@cached_page
+@conditional_page(service_state)
 def service_detail(request, slug):
     """Display individual service details"""
     
@@ -52,25 +101,28 @@ def service_detail(request, slug):
         is_active=True
     )
     
-    # Get related services (same category, excluding current)
-    related_services = Service.objects.filter(
-        category=service.category,
+    # Precomputed related services (category and description similarity)
+    related_services = related_to(service, Service.objects.cards().filter(
         is_active=True
-    ).exclude(id=service.id)[:3]
+    ))[:3]
     
     context = {
         'service': service,
         'related_services': related_services,
     }
     
+    depends_on(request, service, service.category, related_services)
+    
     return render(request, 'services/service_detail.html', context)
 
+@query_budget(5)
+@cached_page
 def category_detail(request, slug):
     """Display services from a specific category"""
     
     category = get_object_or_404(ServiceCategory, slug=slug, is_active=True)
     
-    services = Service.objects.filter(
+    services = Service.objects.cards().filter(
         category=category,
         is_active=True
     )
@@ -80,5 +132,7 @@ def category_detail(request, slug):
         'services': services,
     }
     
+    depends_on(request, category, Service)
+    
     return render(request, 'services/category_detail.html', context)
    
\ No newline at end of file